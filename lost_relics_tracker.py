@@ -1,17 +1,45 @@
 import tkinter as tk
 import customtkinter as ctk
-from tkinter import simpledialog, messagebox, filedialog
+from tkinter import simpledialog, messagebox, filedialog, ttk, font as tkfont
+import abc
+import argparse
+import asyncio
+import atexit
+import gc
+import gzip
+import heapq
+import importlib
+import math
+import mmap
+import multiprocessing
 import threading
 import json
 import os
+import queue
+import random
+import re
+import shutil
 import signal
+import sqlite3
+import struct
+import subprocess
 import sys
-from collections import defaultdict
+import tempfile
+import time
+import tracemalloc
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from collections import OrderedDict, defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import contextmanager
 from datetime import datetime, timezone, timedelta
-from typing import Any, Dict, List
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
 
 import requests
 import websocket
+from requests.adapters import HTTPAdapter
 from openpyxl import Workbook
 
 
@@ -32,21 +60,110 @@ try:
 except ImportError:
     pass
 
+# ---------------------------------------------------------------------------
+# Optional analytics dependencies
+# ---------------------------------------------------------------------------
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pa_compute
+    import pyarrow.feather as pa_feather
+except ImportError:
+    pa = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None
+
+# ---------------------------------------------------------------------------
+# Optional asyncio WebSocket client
+# ---------------------------------------------------------------------------
+try:
+    import websockets
+except ImportError:
+    websockets = None
+
 # ---------------------------------------------------------------------------
 # Config
 # ---------------------------------------------------------------------------
-WS_URL          = os.getenv("WS_URL", "ws://localhost:11991/")
-COINGECKO_URL   = "https://api.coingecko.com/api/v3/simple/price"
+WS_URL          = os.getenv("WS_URL", "ws://localhost:11991/")   # comma-separated, optionally label=url
+COINGECKO_URL   = os.getenv("COINGECKO_URL", "https://api.coingecko.com/api/v3/simple/price")
 APP_VERSION     = "0.2.4"
 RECONNECT_DELAY = 5
+RECONNECT_MAX   = 60
 LOG_DIR         = "run_logs"
 SETTINGS_FILE   = "settings.conf"
 CONFIG_FILE     = "non_blockchain_config.json"
 EXCLUDE_FILE    = "non_blockchain_exclude.json"
+API_HOST        = "127.0.0.1"
+API_PORT        = int(os.getenv("API_PORT", "11992"))
+SSE_KEEPALIVE   = 15
+SUMMARY_CACHE_SIZE = 32
+DAY_CACHE_SIZE     = 4
+RATE_FIELDS       = ("runs", "gold", "estimated_gold", "enj", "xp")
+RATE_WINDOWS      = (("15m", 900), ("1h", 3600))
+RATE_BUCKETS      = 60
+PRICE_CACHE_FILE  = "price_cache.json"
+PRICE_CURRENCIES  = ["usd", "php", "eur", "gbp"]
+PRICE_TTL         = 600
+PRICE_BACKOFF_BASE = 30
+PRICE_BACKOFF_MAX  = 1800
+PRICE_CACHE_POLL   = 5        # seconds between a viewer's checks of the writer's price cache
+PRICE_HISTORY_DIR  = "price_history"
+MARKET_VALUES_FILE = "market_values.jsonl"
+COLUMNAR_DAILY     = "lost_relics_daily.arrow"
+COLUMNAR_ITEMS     = "lost_relics_items.arrow"
+COLUMNAR_BUNDLE    = "lost_relics.npz"
+COLUMNAR_MANIFEST  = "lost_relics_manifest.json"
+ARCHIVE_DIR        = "archive"
+DROP_RATES_FILE    = "drop_rates.json"
+CONTAINER_EV_FILE  = "container_ev.json"
+SESSIONS_FILE      = "sessions.jsonl"
+SESSION_OPEN_FILE  = "session_open.json"
+SESSION_TOP_ITEMS  = 10
+TOP_DROPS_K        = 50         # most valuable single drops kept per day and kind
+ARCHIVE_MAGIC      = b"LRA1"
+ERROR_LOG_FILE       = "errors.jsonl"
+ERROR_LOG_MAX_BYTES  = 1024 * 1024
+ERROR_LOG_BACKUPS    = 3
+ERROR_REPEAT_WINDOW  = 600      # seconds a repeated message is counted instead of written
+ERROR_FLUSH_INTERVAL = 2
+MEMORY_DIAG_FILE     = "memory_diagnostics.jsonl"
+MEMORY_REPORT_FILE   = "memory_report.txt"
+MEMORY_DIAG_TOP      = 15
+SOAK_EVENTS_PER_DAY  = 1000
+SOAK_DAILY_GROWTH    = 256 * 1024    # traced bytes a simulated day may add once warmed up
+SNAPSHOT_FILE      = "snapshot.shm"
+SNAPSHOT_MAGIC     = b"LRS1"
+SNAPSHOT_CAPACITY  = 4 * 1024 * 1024
+SNAPSHOT_STALE     = 5          # seconds without a publish before the ingestion process counts as gone
+INGEST_STOP_FILE   = "ingest.stop"
+WRITER_LOCK_FILE   = "writer.lock"
 
 DEFAULT_TRACKED_NON_BLOCKCHAIN_ITEMS  = ["Deepsea Coffer", "Golden Grind Chest", "Frostfall Shard", "Axiom Sigil", "Enchanted Stone", "Waygate Orb", "Nature's Gift"]
 DEFAULT_EXCLUDED_NON_BLOCKCHAIN_ITEMS = ["Deepsea Coffer"]
 SKILLS           = {"Fishing", "Scavenging", "Titanfall", "Breach"}
+WEEKDAYS         = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
 TRANSPARENT_KEY  = "#010203"
 H_WINDOW_WIDTH   = 1400
 H_WINDOW_HEIGHT  = 250
@@ -65,28 +182,293 @@ FONT_FOOTER       = ("Roboto", 9)            # version / credit
 FONT_POPUP_TITLE  = ("Roboto", 16, "bold")   # popup window titles
 FONT_POPUP_BODY   = ("Roboto", 13)           # popup body text
 
+def _parse_utc_timestamp(value: Optional[str]) -> float:
+    if value:
+        try:
+            return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+        except ValueError:
+            pass
+    return time.time()
+
+
+def wilson_interval(hits: int, trials: int, z: float = 1.96) -> tuple:
+    if trials <= 0:
+        return 0.0, 0.0
+    p      = hits / trials
+    denom  = 1 + z * z / trials
+    centre = (p + z * z / (2 * trials)) / denom
+    half   = z * math.sqrt(p * (1 - p) / trials + z * z / (4 * trials * trials)) / denom
+    return max(centre - half, 0.0), min(centre + half, 1.0)
+
+
+def _pack_event(kind: str, event: Dict[str, Any]) -> dict:
+    # Compact copy of the game fields processing reads; the journal keeps it for rebuilds.
+    raw = {
+        "i":  event.get("AdventureInstance" if kind == "adventure" else "ContainerInstance"),
+        "n":  event.get("AdventureName" if kind == "adventure" else "Name"),
+        "t":  event.get("AdventureCompletedUtc" if kind == "adventure" else "OpenedUtc"),
+        "it": [[it.get("Name", "Unknown"), it.get("Amount", 1), it.get("MarketValue", 0),
+                1 if it.get("IsBlockchain", False) else 0] for it in event.get("Items", [])],
+    }
+    if kind == "adventure":
+        raw["d"] = event.get("TimeTaken", 0)
+        raw["x"] = event.get("ExperienceAmount", 0)
+        raw["s"] = [[xp.get("Type"), xp.get("Amount", 0)] for xp in event.get("Experience", [])
+                    if xp.get("Type") in SKILLS]
+    else:
+        raw["c"] = event.get("Count", 1)
+    return raw
+
+
+def _unpack_event(kind: str, raw: dict) -> Dict[str, Any]:
+    items = [{"Name": n, "Amount": a, "MarketValue": mv, "IsBlockchain": bool(bc)} for n, a, mv, bc in raw["it"]]
+    if kind == "adventure":
+        return {"AdventureInstance": raw["i"], "AdventureName": raw["n"], "AdventureCompletedUtc": raw["t"],
+                "TimeTaken": raw.get("d", 0), "ExperienceAmount": raw.get("x", 0),
+                "Experience": [{"Type": t, "Amount": a} for t, a in raw.get("s", [])], "Items": items}
+    return {"ContainerInstance": raw["i"], "Name": raw["n"], "OpenedUtc": raw["t"],
+            "Count": raw.get("c", 1), "Items": items}
+
+
+def _merge_drop_counts(into: dict, counts: dict):
+    for adv, entry in counts.items():
+        target = into.setdefault(adv, {"runs": 0, "items": {}})
+        target["runs"] += entry.get("runs", 0)
+        for item, (hits, amount) in entry.get("items", {}).items():
+            c = target["items"].setdefault(item, [0, 0])
+            c[0] += hits
+            c[1] += amount
+
+
+def _merge_container_stats(into: dict, stats: dict) -> dict:
+    # Per container type: openings, [sum, sum of squares] of the ENJ and gold value of one
+    # opening, and per item [openings it came in, total amount].
+    for name, entry in stats.items():
+        target = into.setdefault(name, {"opened": 0, "enj": [0.0, 0.0], "gold": [0, 0], "items": {}})
+        target["opened"] += entry.get("opened", 0)
+        for kind in ("enj", "gold"):
+            s, sq = entry.get(kind, (0, 0))
+            target[kind][0] += s
+            target[kind][1] += sq
+        for item, (hits, amount) in entry.get("items", {}).items():
+            c = target["items"].setdefault(item, [0, 0])
+            c[0] += hits
+            c[1] += amount
+    return into
+
+
+# ===========================================================================
+# ErrorLog  — buffered, deduplicated JSONL error log
+# ===========================================================================
+class ErrorLog:
+    # Lines go to a buffer that a background thread appends to errors.jsonl every couple of
+    # seconds. A message seen again within ERROR_REPEAT_WINDOW (numbers ignored, so
+    # "reconnecting in 5s" and "in 7s" match) is only counted; when the window ends the
+    # tally goes out as one line with "repeated": N. The file rotates by size.
+    # Only the process that writes run_logs appends to and rotates the file; in a viewer
+    # (writer=False) flushed lines stay in memory. Use get_error_log() for the shared instance.
+    MEMORY_LINES = 200
+    TAIL_BLOCK   = 64 * 1024
+
+    def __init__(self, path: str, writer: bool = True):
+        self.path      = path
+        self.writer    = writer
+        self.lock      = threading.Lock()
+        self._buffer: List[dict] = []
+        self._repeats: Dict[tuple, dict] = {}
+        self._memory: deque = deque(maxlen=self.MEMORY_LINES)
+
+    @staticmethod
+    def _stamp(ts: float) -> str:
+        return datetime.fromtimestamp(ts).isoformat(timespec="seconds")
+
+    def log(self, message: str, source: str = "tracker", level: str = "error"):
+        now = time.time()
+        key = (source, re.sub(r"\d+", "#", message))
+        with self.lock:
+            rep = self._repeats.get(key)
+            if rep and now - rep["first"] < ERROR_REPEAT_WINDOW:
+                rep["count"]  += 1
+                rep["last"]    = now
+                rep["message"] = message
+                return
+            if rep:
+                self._emit_repeat_locked(rep)
+            self._repeats[key] = {"first": now, "last": now, "count": 0,
+                                  "source": source, "level": level, "message": message}
+            self._buffer.append({"time": self._stamp(now), "level": level, "source": source, "message": message})
+
+    def _emit_repeat_locked(self, rep: dict):
+        if rep["count"]:
+            self._buffer.append({"time": self._stamp(rep["last"]), "level": rep["level"], "source": rep["source"],
+                                 "message": rep["message"], "repeated": rep["count"],
+                                 "since": self._stamp(rep["first"])})
+
+    def flush(self, expire_only: bool = False):
+        # At exit every open tally is written out; otherwise only those whose window ended.
+        now = time.time()
+        with self.lock:
+            for key, rep in list(self._repeats.items()):
+                if not expire_only or now - rep["first"] >= ERROR_REPEAT_WINDOW:
+                    self._emit_repeat_locked(rep)
+                    del self._repeats[key]
+            lines, self._buffer = self._buffer, []
+            if not lines:
+                return
+            if not self.writer:
+                self._memory.extend(lines)
+                return
+            data = "".join(json.dumps(line, ensure_ascii=False) + "\n" for line in lines)
+            try:
+                self._rotate_locked(len(data))
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(data)
+            except OSError:
+                pass
+
+    def _rotate_locked(self, incoming: int):
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            return
+        if size + incoming <= ERROR_LOG_MAX_BYTES:
+            return
+        base, ext = os.path.splitext(self.path)
+        for i in range(ERROR_LOG_BACKUPS - 1, 0, -1):
+            if os.path.exists(f"{base}.{i}{ext}"):
+                os.replace(f"{base}.{i}{ext}", f"{base}.{i + 1}{ext}")
+        os.replace(self.path, f"{base}.1{ext}")
+
+    def recent(self, limit: int = 200) -> List[dict]:
+        # Newest last: the tail of the current file, then of the backups while more are
+        # needed, plus a viewer's own lines.
+        self.flush(expire_only=True)
+        base, ext = os.path.splitext(self.path)
+        found: List[dict] = []
+        for path in [self.path] + [f"{base}.{i}{ext}" for i in range(1, ERROR_LOG_BACKUPS + 1)]:
+            if len(found) >= limit:
+                break
+            try:
+                lines = self._tail(path, limit - len(found))
+            except OSError:
+                continue
+            older = []
+            for line in lines:
+                try:
+                    older.append(json.loads(line))
+                except ValueError:
+                    continue
+            found = older + found
+        with self.lock:
+            if self._memory:
+                found = sorted(found + list(self._memory), key=lambda e: e.get("time", ""))
+        return found[-limit:]
+
+    def _tail(self, path: str, limit: int) -> List[bytes]:
+        # Last `limit` lines, read backwards in blocks.
+        with open(path, "rb") as f:
+            pos  = f.seek(0, os.SEEK_END)
+            data = b""
+            while pos > 0 and data.count(b"\n") <= limit:
+                step = min(self.TAIL_BLOCK, pos)
+                pos -= step
+                f.seek(pos)
+                data = f.read(step) + data
+        lines = data.splitlines()
+        if pos > 0:
+            lines = lines[1:]       # may start mid-line
+        return lines[-limit:]
+
+
+_error_logs: Dict[str, ErrorLog] = {}
+_error_logs_lock = threading.Lock()
+
+
+def get_error_log(directory: str, writer: bool = True) -> ErrorLog:
+    # One ErrorLog per file in this process, flushed by a single thread and at exit.
+    path = os.path.abspath(os.path.join(directory, ERROR_LOG_FILE))
+    with _error_logs_lock:
+        log = _error_logs.get(path)
+        if log is None:
+            log = _error_logs[path] = ErrorLog(path, writer)
+            if len(_error_logs) == 1:
+                threading.Thread(target=_run_error_log_flusher, daemon=True, name="error-log").start()
+        elif writer:
+            log.writer = True
+        return log
+
+
+def flush_error_logs(expire_only: bool = False):
+    with _error_logs_lock:
+        logs = list(_error_logs.values())
+    for log in logs:
+        log.flush(expire_only)
+
+
+def _run_error_log_flusher():
+    while True:
+        time.sleep(ERROR_FLUSH_INTERVAL)
+        flush_error_logs(expire_only=True)
+
+
+atexit.register(flush_error_logs)
+
+
 # ===========================================================================
 # DataManager
 # ===========================================================================
 class DataManager:
-    def __init__(self, log_dir: str, config_file: str, exclude_file: str):
+    def __init__(self, log_dir: str, config_file: str, exclude_file: str,
+                 settings: Optional[dict] = None, price_history: Optional["PriceHistory"] = None):
+        # Accounts tracked side by side pass in the shared settings dict and price history.
         self.log_dir = log_dir
+        self.config_file  = config_file
+        self.exclude_file = exclude_file
         os.makedirs(log_dir, mode=0o755, exist_ok=True)
-        self.lock = threading.RLock()
-        self.player_name = "Unknown Player"
-        self.seen_adventure_instances: set = set()
-        self.seen_container_instances: set = set()
-        self._loaded_from_log = False
+        self._init_state()
+        self.player_name   = "Unknown Player"
+        self.errors        = get_error_log(log_dir)
+        self.price_history = price_history or PriceHistory(os.path.join(log_dir, PRICE_HISTORY_DIR))
+        self.market_values = MarketValueSeries(os.path.join(log_dir, MARKET_VALUES_FILE))
+        self.archive       = LogArchive(os.path.join(log_dir, ARCHIVE_DIR))
+        self.drop_rates    = DropRateStore(os.path.join(log_dir, DROP_RATES_FILE))
+        self.container_ev  = DropRateStore(os.path.join(log_dir, CONTAINER_EV_FILE), _merge_container_stats)
         self.non_blockchain_items   = self.load_config(config_file,  DEFAULT_TRACKED_NON_BLOCKCHAIN_ITEMS)
         self.non_blockchain_exclude = self.load_config(exclude_file, DEFAULT_EXCLUDED_NON_BLOCKCHAIN_ITEMS)
-        self.settings = self.load_settings()
+        self.settings = settings if settings is not None else self.load_settings()
+        self.sessions = SessionIndex(log_dir, self.settings["sessions"].get("idle_minutes", 20) * 60)
         self.reset_daily_counters_locked(self.now_local().date())
         self.load_log()
+        self.catch_up_drop_rates()
+
+    def _init_state(self):
+        # In-memory state every variant needs, including the subclasses that skip
+        # __init__ (combined, attached, rebuild) because they have no files of their own.
+        self.lock = threading.RLock()
+        self.seen_adventure_instances: set = set()
+        self.seen_container_instances: set = set()
+        self._loaded_from_log = False
+        self._summary_cache: OrderedDict = OrderedDict()
+        self._summary_cache_lock = threading.Lock()
+        self._day_cache: OrderedDict = OrderedDict()    # date -> parked day state, see day_context_locked
+        self._log_seq      = 0                          # bumped per captured day log, see write_day_log
+        self._written_seq: Dict[str, int] = {}
+        self._write_lock   = threading.Lock()
+        self._compact_lock = threading.Lock()
+        self._settings_mtime = 0                        # settings.conf as last loaded or saved here
 
     # ------------------------------------------------------------------
     # Settings
     # ------------------------------------------------------------------
+    @staticmethod
+    def _settings_stamp() -> int:
+        try:
+            return os.stat(SETTINGS_FILE).st_mtime_ns
+        except OSError:
+            return 0
+
     def load_settings(self) -> dict:
+        self._settings_mtime = self._settings_stamp()
         default_settings = {
             "window_width":  246,
             "window_height": 600,
@@ -95,12 +477,45 @@ class DataManager:
             "gmt_offset":    0,
             "overlay_mode":  False,
             "layout_mode":   "vertical",
+            "archive": {
+                "after_days":     30,
+                "disk_budget_mb": 0,
+            },
+            "sessions": {
+                "idle_minutes": 20,
+            },
+            "ws_client": {
+                "mode":          "auto",   # auto | asyncio | thread
+                "ping_interval": 20,
+                "ping_timeout":  20,
+                "idle_timeout":  0,        # seconds without any message before reconnecting; 0 = off
+                "backoff_max":   RECONNECT_MAX,
+            },
+            "query_api": {
+                "enabled": True,
+                "port":    API_PORT,
+            },
+            # e.g. {"type": "sqlite", "path": "runs.db", "batch_size": 100, "flush_interval": 2,
+            #       "queue_size": 10000}; types: jsonl, influx, sqlite, webhook or "module:Class"
+            "sinks": [],
+            "alerts": [],       # rule strings, see parse_alert_rule
+            "memory_diagnostics": {
+                "enabled":          False,
+                "interval_minutes": 5,
+            },
             "show_totals": {
                 "runs":           True,
                 "gold":           True,
                 "estimated_gold": True,
                 "enj":            True,
             },
+            "show_rates": {
+                "runs":           False,
+                "gold":           False,
+                "estimated_gold": False,
+                "enj":            False,
+                "xp":             False,
+            },
             "show_sections": {
                 "adventures":   True,
                 "experience":   True,
@@ -126,15 +541,32 @@ class DataManager:
         return default_settings
 
     def save_settings(self, settings: dict):
+        # Replaced atomically: the writer and any viewer windows reload it when it changes.
+        tmp_path = f"{SETTINGS_FILE}.{os.getpid()}.tmp"
         try:
-            with open(SETTINGS_FILE, "w", encoding="utf-8") as f:
+            with open(tmp_path, "w", encoding="utf-8") as f:
                 json.dump(settings, f, indent=2)
+            os.replace(tmp_path, SETTINGS_FILE)
+            self._settings_mtime = self._settings_stamp()
         except Exception:
             pass
 
+    def settings_changed(self) -> bool:
+        # Saved by another process since this one last loaded or saved it.
+        return self._settings_stamp() != self._settings_mtime
+
+    def reload_settings(self):
+        # In place, since accounts share this dict.
+        loaded = self.load_settings()
+        with self.lock:
+            self.settings.clear()
+            self.settings.update(loaded)
+
+    clock = staticmethod(time.time)        # replaced by the soak benchmark's simulated clock
+
     def now_local(self) -> datetime:
         tz = timezone(timedelta(hours=self.settings.get("gmt_offset", 0)))
-        return datetime.now(tz)
+        return datetime.fromtimestamp(self.clock(), tz)
 
     # ------------------------------------------------------------------
     # Daily counters
@@ -153,7 +585,9 @@ class DataManager:
         self.total_enj_value      = 0.0
         self.gold_coins_total     = 0
         self.total_estimated_gold = 0
-        self.market_values        = {}
+        self.drop_counts          = {}
+        self.top_drops            = {"enj": [], "gold": []}    # min-heaps, see note_top_drop_locked
+        self.container_stats      = {}
         self.current_log_date     = today_date
         self.start_time           = datetime.now(timezone.utc)
 
@@ -172,14 +606,22 @@ class DataManager:
                 json.dump(defaults, f, indent=2)
         except Exception:
             pass
-        return defaults
+        return list(defaults)
+
+    def reload_item_lists(self):
+        # In place and under the lock: processing reads these lists under it, and the
+        # combined view holds the same list objects.
+        tracked = self.load_config(self.config_file,  DEFAULT_TRACKED_NON_BLOCKCHAIN_ITEMS)
+        exclude = self.load_config(self.exclude_file, DEFAULT_EXCLUDED_NON_BLOCKCHAIN_ITEMS)
+        with self.lock:
+            self.non_blockchain_items[:]   = tracked
+            self.non_blockchain_exclude[:] = exclude
 
     # ------------------------------------------------------------------
     # Log persistence
     # ------------------------------------------------------------------
-    def log_filepath(self) -> str:
-        today_str = self.now_local().strftime("%Y-%m-%d")
-        return os.path.join(self.log_dir, f"runs_{today_str}.json")
+    def log_filepath(self, date_str: Optional[str] = None) -> str:
+        return os.path.join(self.log_dir, f"runs_{date_str or self.current_log_date.isoformat()}.json")
 
     def load_log(self):
         path     = self.log_filepath()
@@ -199,134 +641,732 @@ class DataManager:
 
         if data:
             with self.lock:
-                self.counter               = data.get("runs", 0)
-                self.blockchain_totals.update(data.get("blockchain_totals", {}))
-                self.non_blockchain_totals.update(data.get("non_blockchain_totals", {}))
-                self.adventure_counts.update(data.get("adventure_counts", {}))
-                self.adventure_time_totals.update(data.get("adventure_time_totals", {}))
-                self.container_counts.update(data.get("container_counts", {}))
-                self.container_blockchain_totals.update(data.get("container_blockchain_totals", {}))
-                self.container_non_blockchain_totals.update(data.get("container_non_blockchain_totals", {}))
-                self.seen_container_instances = set(data.get("seen_container_instances", []))
-                self.total_character_xp    = data.get("total_character_xp", 0)
-                self.skill_xp_totals.update(data.get("skill_xp_totals", {}))
+                self._apply_day_data_locked(data)
                 self.player_name           = data.get("player_name", "Unknown Player")
-                self.total_enj_value       = data.get("total_enj_value", 0.0)
-                self.gold_coins_total      = data.get("gold_coins_total", 0)
-                self.total_estimated_gold  = data.get("total_estimated_gold", 0)
-                self.seen_adventure_instances = set(data.get("seen_adventure_instances", []))
                 self._loaded_from_log      = True
 
+    def _apply_day_data_locked(self, data: dict):
+        self.counter               = data.get("runs", 0)
+        self.blockchain_totals.update(data.get("blockchain_totals", {}))
+        self.non_blockchain_totals.update(data.get("non_blockchain_totals", {}))
+        self.adventure_counts.update(data.get("adventure_counts", {}))
+        self.adventure_time_totals.update(data.get("adventure_time_totals", {}))
+        self.container_counts.update(data.get("container_counts", {}))
+        self.container_blockchain_totals.update(data.get("container_blockchain_totals", {}))
+        self.container_non_blockchain_totals.update(data.get("container_non_blockchain_totals", {}))
+        self.seen_container_instances = set(data.get("seen_container_instances", []))
+        self.total_character_xp    = data.get("total_character_xp", 0)
+        self.skill_xp_totals.update(data.get("skill_xp_totals", {}))
+        self.total_enj_value       = data.get("total_enj_value", 0.0)
+        self.gold_coins_total      = data.get("gold_coins_total", 0)
+        self.total_estimated_gold  = data.get("total_estimated_gold", 0)
+        self.seen_adventure_instances = set(data.get("seen_adventure_instances", []))
+        self.drop_counts           = data.get("drop_counts", {})
+        self.container_stats       = data.get("container_stats", {})
+        for kind, entries in data.get("top_drops", {}).items():
+            self.top_drops[kind] = [list(e) for e in entries]
+            heapq.heapify(self.top_drops[kind])
+
     def save_log(self):
         with self.lock:
-            data = {
-                "runs":                    self.counter,
-                "blockchain_totals":       dict(self.blockchain_totals),
-                "non_blockchain_totals":   dict(self.non_blockchain_totals),
-                "adventure_counts":        dict(self.adventure_counts),
-                "adventure_time_totals":   dict(self.adventure_time_totals),
-                "container_counts":                dict(self.container_counts),
-                "container_blockchain_totals":     dict(self.container_blockchain_totals),
-                "container_non_blockchain_totals": dict(self.container_non_blockchain_totals),
-                "seen_container_instances":        list(self.seen_container_instances),
-                "total_character_xp":      self.total_character_xp,
-                "skill_xp_totals":         dict(self.skill_xp_totals),
-                "player_name":             self.player_name,
-                "total_enj_value":         self.total_enj_value,
-                "gold_coins_total":        self.gold_coins_total,
-                "total_estimated_gold":    self.total_estimated_gold,
-                "seen_adventure_instances": list(self.seen_adventure_instances),
-            }
-        path     = self.log_filepath()
+            date_str, data, seq = self.capture_day_locked()
+        self.write_day_log(date_str, data, seq)
+
+    def capture_day_locked(self) -> tuple:
+        self._log_seq += 1
+        return self.current_log_date.isoformat(), self.day_data_locked(), self._log_seq
+
+    def day_data_locked(self) -> dict:
+        return {
+            "runs":                    self.counter,
+            "blockchain_totals":       dict(self.blockchain_totals),
+            "non_blockchain_totals":   dict(self.non_blockchain_totals),
+            "adventure_counts":        dict(self.adventure_counts),
+            "adventure_time_totals":   dict(self.adventure_time_totals),
+            "container_counts":                dict(self.container_counts),
+            "container_blockchain_totals":     dict(self.container_blockchain_totals),
+            "container_non_blockchain_totals": dict(self.container_non_blockchain_totals),
+            "seen_container_instances":        list(self.seen_container_instances),
+            "total_character_xp":      self.total_character_xp,
+            "skill_xp_totals":         dict(self.skill_xp_totals),
+            "player_name":             self.player_name,
+            "total_enj_value":         self.total_enj_value,
+            "gold_coins_total":        self.gold_coins_total,
+            "total_estimated_gold":    self.total_estimated_gold,
+            "seen_adventure_instances": list(self.seen_adventure_instances),
+            "drop_counts":             {a: {"runs": e["runs"], "items": {i: list(c) for i, c in e["items"].items()}}
+                                        for a, e in self.drop_counts.items()},
+            "top_drops":               {k: [list(e) for e in heap] for k, heap in self.top_drops.items()},
+            "container_stats":         _merge_container_stats({}, self.container_stats),
+        }
+
+    def write_day_log(self, date_str: str, data: dict, seq: int = 0):
+        # Logs are captured under the lock but written outside it; `seq` (from capture_day_locked)
+        # keeps a slower writer from replacing a newer capture of the same day.
+        path     = self.log_filepath(date_str)
         tmp_path = path + ".tmp"
+        with self._write_lock:
+            if seq and seq < self._written_seq.get(date_str, 0):
+                return
+            self._written_seq[date_str] = max(seq, self._written_seq.get(date_str, 0))
+            try:
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(data, f, indent=2)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, path)
+            except Exception:
+                pass
+
+    # ------------------------------------------------------------------
+    # Events that belong to another day
+    # ------------------------------------------------------------------
+    DAY_FIELDS = (
+        "counter", "blockchain_totals", "non_blockchain_totals", "adventure_counts",
+        "adventure_time_totals", "container_counts", "container_blockchain_totals",
+        "container_non_blockchain_totals", "total_character_xp", "skill_xp_totals",
+        "total_enj_value", "gold_coins_total", "total_estimated_gold", "drop_counts", "top_drops",
+        "container_stats",
+        "seen_adventure_instances", "seen_container_instances", "current_log_date", "start_time",
+    )
+
+    def event_day(self, utc_value):
+        # Local day of an event timestamp; today when the timestamp is missing or unreadable.
+        if utc_value:
+            try:
+                return datetime.fromisoformat(str(utc_value).replace("Z", "+00:00")).astimezone(
+                    timezone(timedelta(hours=self.settings.get("gmt_offset", 0)))
+                ).date()
+            except Exception:
+                pass
+        return self.current_log_date
+
+    def _park_day_locked(self) -> dict:
+        return {f: getattr(self, f) for f in self.DAY_FIELDS}
+
+    def _unpark_day_locked(self, state: dict):
+        for f, v in state.items():
+            setattr(self, f, v)
+
+    def _load_day_state_locked(self, day) -> dict:
+        # Fresh counters for `day`, overlaid with its log (loose or archived) if one exists.
+        self.reset_daily_counters_locked(day)
+        self.seen_adventure_instances = set()
+        self.seen_container_instances = set()
+        files = self._day_log_files(day.isoformat(), day.isoformat())
+        if files:
+            try:
+                self._apply_day_data_locked(self._read_day_log(files[0][1]))
+            except Exception as e:
+                self.save_error_log(f"Could not load {files[0][1]} for a late event: {e}")
+        return self._park_day_locked()
+
+    @contextmanager
+    def day_context_locked(self, day):
+        # Temporarily swaps `day`'s counters in place of today's so the normal processing
+        # and persistence code applies to it. A few recent days stay parked in an LRU so a
+        # replayed tail of yesterday does not re-read its log for every event.
+        if day == self.current_log_date:
+            yield
+            return
+        today = self._park_day_locked()
+        state = self._day_cache.pop(day, None)
+        if state is None:
+            state = self._load_day_state_locked(day)
+        self._unpark_day_locked(state)
         try:
-            with open(tmp_path, "w", encoding="utf-8") as f:
-                json.dump(data, f, indent=2)
-                f.flush()
-                os.fsync(f.fileno())
-            os.replace(tmp_path, path)
-        except Exception:
-            pass
+            yield
+        finally:
+            self._day_cache[day] = self._park_day_locked()
+            while len(self._day_cache) > DAY_CACHE_SIZE:
+                self._day_cache.popitem(last=False)
+            self._unpark_day_locked(today)
+
+    def switch_day_locked(self, day):
+        # Daily reset. Picks up anything early events already recorded for the new day.
+        self.close_day_drop_counts_locked()
+        self._day_cache[self.current_log_date] = self._park_day_locked()
+        while len(self._day_cache) > DAY_CACHE_SIZE:
+            self._day_cache.popitem(last=False)
+        state = self._day_cache.pop(day, None)
+        if state is None:
+            state = self._load_day_state_locked(day)
+        self._unpark_day_locked(state)
+
+    # ------------------------------------------------------------------
+    # Snapshot of today's state
+    # ------------------------------------------------------------------
+    def snapshot(self) -> dict:
+        with self.lock:
+            return dict(
+                player_name        = self.player_name,
+                log_date           = self.current_log_date.isoformat(),
+                counter            = self.counter,
+                total_enj_value    = self.total_enj_value,
+                gold_coins_total   = self.gold_coins_total,
+                total_estimated_gold=self.total_estimated_gold,
+                adventure_counts   = dict(self.adventure_counts),
+                adventure_time_totals = dict(self.adventure_time_totals),
+                total_character_xp = self.total_character_xp,
+                skill_xp_totals    = dict(self.skill_xp_totals),
+                blockchain_totals  = dict(self.blockchain_totals),
+                non_blockchain_totals=dict(self.non_blockchain_totals),
+                non_blockchain_items =set(self.non_blockchain_items),
+                container_counts               = dict(self.container_counts),
+                container_blockchain_totals    = dict(self.container_blockchain_totals),
+                container_non_blockchain_totals= dict(self.container_non_blockchain_totals),
+                start_time         = self.start_time,
+            )
 
     # ------------------------------------------------------------------
     # Adventure processing
     # ------------------------------------------------------------------
-    def process_adventure_locked(self, adventure: Dict[str, Any]):
+    def process_adventure_locked(self, adventure: Dict[str, Any]) -> dict:
         self.counter += 1
         adv_name = adventure.get("AdventureName", "Unknown")
         self.adventure_counts[adv_name] += 1
         self.adventure_time_totals[adv_name] += adventure.get("TimeTaken", 0)
         self.total_character_xp += adventure.get("ExperienceAmount", 0)
+        ts = _parse_utc_timestamp(adventure.get("AdventureCompletedUtc"))
 
         for xp in adventure.get("Experience", []):
             if xp.get("Type") in SKILLS:
                 self.skill_xp_totals[xp["Type"]] += xp.get("Amount", 0)
 
+        drops = self.drop_counts.setdefault(adv_name, {"runs": 0, "items": {}})
+        drops["runs"] += 1
+        dropped = set()
+
         estimated_gold = 0
+        gold_coins     = 0
+        enj_value      = 0.0
+        items: Dict[str, int] = {}
         for item in adventure.get("Items", []):
             name   = item.get("Name", "Unknown")
             amount = item.get("Amount", 1)
             mv     = item.get("MarketValue", 0)
+            items[name] = items.get(name, 0) + amount
+
+            counts = drops["items"].setdefault(name, [0, 0])   # [runs it dropped in, total amount]
+            if name not in dropped:
+                counts[0] += 1
+                dropped.add(name)
+            counts[1] += amount
 
             if name == "Gold Coins":
-                self.gold_coins_total += amount
+                gold_coins            += amount
                 estimated_gold        += amount
+            elif mv:
+                self.market_values.record(name, mv, ts)
 
             if item.get("IsBlockchain", False):
                 self.blockchain_totals[name] += amount
                 if mv:
-                    self.market_values[name]  = mv
-                    self.total_enj_value      += (mv / 100.0) * amount
+                    enj_value                += (mv / 100.0) * amount
+                    self.note_top_drop_locked("enj", (mv / 100.0) * amount, ts, name, amount, adv_name, "adventure")
             else:
                 if name in self.non_blockchain_items:
                     self.non_blockchain_totals[name] += amount
                 if name not in self.non_blockchain_exclude:
                     estimated_gold += amount * mv
+                    if mv and name != "Gold Coins":
+                        self.note_top_drop_locked("gold", amount * mv, ts, name, amount, adv_name, "adventure")
 
+        self.gold_coins_total     += gold_coins
+        self.total_enj_value      += enj_value
         self.total_estimated_gold += estimated_gold
+        if self.current_log_date.isoformat() <= self.drop_rates.through:
+            # Late run for a day already folded into the all-time counters.
+            self.drop_rates.add_counts({adv_name: {"runs": 1, "items": {i: [1, a] for i, a in items.items()}}})
+        return {
+            "kind":  "adventure",
+            "time":  ts,
+            "name":  adv_name,
+            "count": 1,
+            "duration": adventure.get("TimeTaken", 0),
+            "xp":    adventure.get("ExperienceAmount", 0),
+            "gold":  gold_coins,
+            "estimated_gold": estimated_gold,
+            "enj":   enj_value,
+            "items": items,
+            "raw":   _pack_event("adventure", adventure),
+        }
 
-    def process_container_locked(self, container: Dict[str, Any]):
+    def process_container_locked(self, container: Dict[str, Any]) -> dict:
         name  = container.get("Name", "Unknown")
         count = container.get("Count", 1)
         self.container_counts[name] += count
+        ts = _parse_utc_timestamp(container.get("OpenedUtc"))
 
+        estimated_gold = 0
+        gold_coins     = 0
+        enj_value      = 0.0
+        items: Dict[str, int] = {}
         for item in container.get("Items", []):
             iname  = item.get("Name", "Unknown")
             amount = item.get("Amount", 1)
             mv     = item.get("MarketValue", 0)
+            items[iname] = items.get(iname, 0) + amount
 
             if iname == "Gold Coins":
-                self.gold_coins_total += amount
+                gold_coins += amount
+            elif mv:
+                self.market_values.record(iname, mv, ts)
 
             if item.get("IsBlockchain", False):
                 self.container_blockchain_totals[iname] += amount
                 if mv:
-                    self.market_values[iname] = mv
-                    self.total_enj_value += (mv / 100.0) * amount
+                    enj_value += (mv / 100.0) * amount
+                    self.note_top_drop_locked("enj", (mv / 100.0) * amount, ts, iname, amount, name, "container")
             else:
                 if iname != "Gold Coins":
                     if iname in self.non_blockchain_items:
                         self.container_non_blockchain_totals[iname] += amount
                     if iname not in self.non_blockchain_exclude:
-                        self.total_estimated_gold += amount * mv
+                        estimated_gold += amount * mv
+                        if mv:
+                            self.note_top_drop_locked("gold", amount * mv, ts, iname, amount, name, "container")
+
+        self.gold_coins_total     += gold_coins
+        self.total_enj_value      += enj_value
+        self.total_estimated_gold += estimated_gold
+        self.note_container_value_locked(name, count, enj_value, gold_coins + estimated_gold, items)
+        return {
+            "kind":  "container",
+            "time":  ts,
+            "name":  name,
+            "count": count,
+            "duration": 0,
+            "xp":    0,
+            "gold":  gold_coins,
+            "estimated_gold": estimated_gold,
+            "enj":   enj_value,
+            "items": items,
+            "raw":   _pack_event("container", container),
+        }
 
     # ------------------------------------------------------------------
-    # Error log
+    # Per-run journal
     # ------------------------------------------------------------------
-    def save_error_log(self, message: str):
-        now  = datetime.now()
-        ts   = now.strftime("%Y-%m-%d %H:%M:%S")
-        path = os.path.join(self.log_dir, f"error_{now.strftime('%Y-%m-%d')}.txt")
+    def journal_filepath(self, date_str: str) -> str:
+        return os.path.join(self.log_dir, f"journal_{date_str}.jsonl")
+
+    def append_journal(self, record: dict, date_str: Optional[str] = None):
+        date_str = date_str or self.current_log_date.isoformat()
         try:
-            with open(path, "a", encoding="utf-8") as f:
-                f.write(f"[{ts}] {message}\n")
+            with open(self.journal_filepath(date_str), "a", encoding="utf-8") as f:
+                f.write(json.dumps(record) + "\n")
         except Exception:
             pass
 
+    def write_journal(self, date_str: str, records: List[dict]):
+        path     = self.journal_filepath(date_str)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps(record) + "\n")
+        os.replace(tmp_path, path)
+
+    def iter_journal(self, date_str: str):
+        try:
+            with open(self.journal_filepath(date_str), "r", encoding="utf-8") as f:
+                lines = f.readlines()
+        except OSError:
+            source = self.archive.find(os.path.basename(self.journal_filepath(date_str)))
+            if source is None:
+                return
+            try:
+                lines = self.archive.read(*source).decode("utf-8").splitlines()
+            except Exception:
+                return
+        for line in lines:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue
+
+    # ------------------------------------------------------------------
+    # Drop rates
+    # ------------------------------------------------------------------
+    def close_day_drop_counts_locked(self):
+        # Called before a daily reset: folds the finished day into the all-time stores.
+        self.drop_rates.merge_day(self.current_log_date.isoformat(), self.drop_counts)
+        self.container_ev.merge_day(self.current_log_date.isoformat(), self.container_stats)
+
+    def catch_up_drop_rates(self):
+        # Days that ended while the tracker was closed are merged from their logs, once.
+        today = self.current_log_date.isoformat()
+        for store, field in ((self.drop_rates, "drop_counts"), (self.container_ev, "container_stats")):
+            start = store.through
+            if start:
+                start = (datetime.strptime(start, "%Y-%m-%d").date() + timedelta(days=1)).isoformat()
+            for date_part, source in self._day_log_files(start or "0000-00-00", today):
+                if date_part >= today:
+                    break
+                try:
+                    counts = self._read_day_log(source).get(field, {})
+                except Exception:
+                    continue
+                store.merge_day(date_part, counts)
+
+    def drop_count_totals(self, scope: str = "all") -> dict:
+        with self.lock:
+            today = {a: {"runs": e["runs"], "items": {i: list(c) for i, c in e["items"].items()}}
+                     for a, e in self.drop_counts.items()}
+        return today if scope == "today" else self.drop_rates.combined(today)
+
+    def drop_rate_table(self, scope: str = "all") -> List[dict]:
+        rows = []
+        for adv, entry in self.drop_count_totals(scope).items():
+            runs = entry["runs"]
+            for item, (hits, amount) in entry["items"].items():
+                lo, hi = wilson_interval(hits, runs)
+                rows.append({
+                    "adventure": adv, "item": item, "runs": runs, "hits": hits,
+                    "rate": hits / runs if runs else 0.0, "ci_low": lo, "ci_high": hi,
+                    "per_run": amount / runs if runs else 0.0,
+                })
+        return rows
+
+    # ------------------------------------------------------------------
+    # Container value
+    # ------------------------------------------------------------------
+    def note_container_value_locked(self, name: str, count: int, enj: float, gold: int, items: Dict[str, int]):
+        # A stack opened at once (Count > 1) counts as `count` openings of equal value, and an
+        # item as having come in at most `amount` of them; both are exact for single openings.
+        count = max(count, 1)
+        delta = {name: {
+            "opened": count,
+            "enj":    [enj,  enj * enj / count],
+            "gold":   [gold, gold * gold / count],
+            "items":  {i: [min(count, a), a] for i, a in items.items()},
+        }}
+        _merge_container_stats(self.container_stats, delta)
+        if self.current_log_date.isoformat() <= self.container_ev.through:
+            # Late opening for a day already folded into the all-time stats.
+            self.container_ev.add_counts(delta)
+
+    def container_stat_totals(self, scope: str = "all") -> dict:
+        with self.lock:
+            today = _merge_container_stats({}, self.container_stats)
+        return today if scope == "today" else self.container_ev.combined(today)
+
+    def container_ev_table(self, scope: str = "all") -> List[dict]:
+        # Mean value of one opening with its sample standard deviation and the standard
+        # error of the mean; items are listed by average amount per opening.
+        rows = []
+        for name, entry in self.container_stat_totals(scope).items():
+            n = entry["opened"]
+            if not n:
+                continue
+            row = {"container": name, "opened": n}
+            for kind in ("enj", "gold"):
+                total, squares = entry[kind]
+                mean = total / n
+                var  = max(squares - n * mean * mean, 0.0) / (n - 1) if n > 1 else 0.0
+                row[f"ev_{kind}"] = mean
+                row[f"sd_{kind}"] = math.sqrt(var)
+                row[f"se_{kind}"] = math.sqrt(var / n)
+            row["items"] = sorted(
+                ({"item": i, "rate": hits / n, "per_open": amount / n} for i, (hits, amount) in entry["items"].items()),
+                key=lambda r: -r["per_open"])
+            rows.append(row)
+        return rows
+
+    # ------------------------------------------------------------------
+    # Most valuable drops
+    # ------------------------------------------------------------------
+    def note_top_drop_locked(self, kind: str, value: float, ts: float, item: str, amount: int,
+                             source: str, source_kind: str):
+        # Per-day bounded min-heap of [value, time, item, amount, source, kind] lists: plain
+        # lists compare element-wise, survive JSON, and the smallest kept drop sits at [0].
+        heap  = self.top_drops[kind]
+        entry = [value, ts, item, amount, source, source_kind]
+        if len(heap) < TOP_DROPS_K:
+            heapq.heappush(heap, entry)
+        elif entry > heap[0]:
+            heapq.heapreplace(heap, entry)
+
+    def top_drops_range(self, start_date: str, end_date: str, kind: str = "enj", k: int = 20) -> List[dict]:
+        # Merges the per-day heaps saved in each day log; runs and journals are not read.
+        today = self.current_log_date.isoformat()
+        pools = []
+        for date_part, source in self._day_log_files(start_date, end_date):
+            if date_part == today:
+                continue
+            try:
+                pools.append(self._read_day_log(source).get("top_drops", {}).get(kind, []))
+            except Exception:
+                continue
+        if start_date <= today <= end_date:
+            pools.append(self.top_drops_today(kind))
+        best = heapq.nlargest(k, (tuple(e) for pool in pools for e in pool))
+        return [{"value": v, "time": t, "item": i, "amount": a, "source": s, "source_kind": sk}
+                for v, t, i, a, s, sk in best]
+
+    def top_drops_today(self, kind: str) -> list:
+        with self.lock:
+            return [list(e) for e in self.top_drops[kind]]
+
+    # ------------------------------------------------------------------
+    # Error log
+    # ------------------------------------------------------------------
+    def save_error_log(self, message: str, source: str = "tracker"):
+        self.errors.log(message, source)
+
+    # ------------------------------------------------------------------
+    # Memory diagnostics
+    # ------------------------------------------------------------------
+    def memory_counts(self) -> Dict[str, int]:
+        # Entries held by the structures that grow with play; see MemoryDiagnostics.
+        sessions = self.sessions
+        with self.lock:
+            return {
+                "seen_adventure_instances": len(getattr(self, "seen_adventure_instances", ())),
+                "seen_container_instances": len(getattr(self, "seen_container_instances", ())),
+                "parked_days":       len(self._day_cache),
+                "summary_cache":     len(self._summary_cache),
+                "drop_count_items":  sum(len(e["items"]) for e in self.drop_counts.values()),
+                "top_drops":         sum(len(heap) for heap in self.top_drops.values()),
+                "container_types":   len(self.container_stats),
+                "market_value_samples": self.market_values.sample_count(),
+                "sessions_closed":   len(sessions.closed),
+            }
+
     # ------------------------------------------------------------------
     # Summarize across date range
     # ------------------------------------------------------------------
-    def summarize_logs(self, start_date: str, end_date: str) -> dict:
+    # (date, source) pairs in date order. A source is a loose file path, or an
+    # (archive path, member) tuple for days that were compacted into an archive.
+    def _day_log_files(self, start_date: str, end_date: str) -> List[tuple]:
+        files = dict(self.archive.members("runs_", start_date, end_date))
+        for fname in os.listdir(self.log_dir):
+            if fname.startswith("runs_") and fname.endswith(".json"):
+                date_part = fname[5:-5]
+                if start_date <= date_part <= end_date:
+                    files[date_part] = os.path.join(self.log_dir, fname)
+        return sorted(files.items())
+
+    def _read_day_log(self, source) -> dict:
+        if isinstance(source, tuple):
+            return json.loads(self.archive.read(*source))
+        try:
+            with open(source, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            # Compacted between listing and reading.
+            archived = self.archive.find(os.path.basename(source))
+            if archived is None:
+                raise
+            return json.loads(self.archive.read(*archived))
+
+    def _source_stamp(self, source) -> tuple:
+        path = source[0] if isinstance(source, tuple) else source
+        return path, os.stat(path).st_mtime_ns
+
+    # ------------------------------------------------------------------
+    # Compaction of old days into monthly archives
+    # ------------------------------------------------------------------
+    def disk_usage(self) -> int:
+        total = 0
+        for dirpath, _, fnames in os.walk(self.log_dir):
+            for fname in fnames:
+                try:
+                    total += os.path.getsize(os.path.join(dirpath, fname))
+                except OSError:
+                    pass
+        return total
+
+    def compact_logs(self) -> int:
+        # Packs days older than archive.after_days into run_logs/archive/runs_YYYY-MM.lra.
+        # Over the disk budget, everything but today is packed. Returns days archived.
+        if not self._compact_lock.acquire(blocking=False):
+            return 0
+        try:
+            cfg      = self.settings.get("archive", {})
+            today    = self.now_local().date()
+            cutoff   = (today - timedelta(days=max(int(cfg.get("after_days", 30)), 1))).isoformat()
+            budget   = int(cfg.get("disk_budget_mb", 0)) * 1024 * 1024
+            archived = self._compact_before(cutoff)
+            if budget and self.disk_usage() > budget:
+                archived += self._compact_before(today.isoformat())
+                usage = self.disk_usage()
+                if usage > budget:
+                    self.save_error_log(
+                        f"run_logs uses {usage / 1048576:.1f} MB, over the {budget // 1048576} MB budget "
+                        f"even after archiving every past day.")
+            return archived
+        finally:
+            self._compact_lock.release()
+
+    def _compact_before(self, cutoff: str) -> int:
+        today  = self.current_log_date.isoformat()
+        months = defaultdict(dict)
+        for fname in os.listdir(self.log_dir):
+            if fname.startswith("runs_") and fname.endswith(".json"):
+                date_part = fname[5:-5]
+            elif fname.startswith("journal_") and fname.endswith(".jsonl"):
+                date_part = fname[8:-6]
+            else:
+                continue
+            if date_part < cutoff and date_part != today:
+                months[date_part[:7]][fname] = os.path.join(self.log_dir, fname)
+
+        archived = 0
+        for month, members in sorted(months.items()):
+            blobs = {}
+            for fname, path in members.items():
+                try:
+                    if fname.endswith(".json"):
+                        # Instance ids stay in: a late event or replay for an archived day
+                        # loads them back through _load_day_state_locked and is not counted twice.
+                        data = self._read_day_log(path)
+                        blobs[fname] = json.dumps(data, separators=(",", ":")).encode("utf-8")
+                    else:
+                        with open(path, "rb") as f:
+                            blobs[fname] = f.read()
+                except Exception as e:
+                    self.save_error_log(f"Skipping {path} during archiving: {e}")
+            if not blobs:
+                continue
+            try:
+                self.archive.add(month, blobs)
+            except Exception as e:
+                self.save_error_log(f"Archiving {month} failed: {e}")
+                continue
+            for fname in blobs:
+                loose = members[fname]
+                for path in (loose, loose + ".tmp"):
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
+            archived += sum(1 for fname in blobs if fname.endswith(".json"))
+        return archived
+
+    # ------------------------------------------------------------------
+    # Rebuilding history from the raw run data in the journals
+    # ------------------------------------------------------------------
+    def _journal_raws(self, date_str: str, data: dict) -> Optional[list]:
+        # [(kind, raw)] for the day, or None when the journal does not cover every logged run.
+        raws   = [(r["kind"], r["raw"]) for r in self.iter_journal(date_str) if "raw" in r]
+        runs   = sum(1 for kind, _ in raws if kind == "adventure")
+        opened = sum(raw.get("c", 1) for kind, raw in raws if kind == "container")
+        if runs != data.get("runs", 0) or opened != sum(data.get("container_counts", {}).values()):
+            return None
+        return raws
+
+    def _raw_day(self, raw: dict, fallback: str) -> str:
+        return self.event_day(raw["t"]).isoformat() if raw.get("t") else fallback
+
+    def rebuild_history(self, progress=None, cancel_event=None) -> Optional[dict]:
+        # Recomputes every day whose journal holds raw data for all of its runs, using the
+        # current item configs and GMT offset. Days logged before raw data was kept are left
+        # as they are, apart from runs that move onto them. Nothing is written until every
+        # day is computed, so cancelling (returns None) leaves the logs untouched.
+        self.reload_item_lists()
+        today = self.current_log_date.isoformat()
+        files = [(d, src) for d, src in self._day_log_files("0000-00-00", "9999-12-31") if d != today]
+        steps = len(files) + 1
+        done  = 0
+
+        def step() -> bool:
+            nonlocal done
+            done += 1
+            if progress:
+                progress(done, steps)
+            return not (cancel_event and cancel_event.is_set())
+
+        events: Dict[str, list] = defaultdict(list)
+        kept:   Dict[str, dict] = {}           # days without complete raw data, as logged
+        for date_part, source in files:
+            try:
+                data = self._read_day_log(source)
+            except Exception as e:
+                raise RuntimeError(f"Could not read the log for {date_part}: {e}")
+            raws = self._journal_raws(date_part, data)
+            if raws is None:
+                kept[date_part] = data
+            else:
+                events.setdefault(date_part, [])
+                for kind, raw in raws:
+                    events[self._raw_day(raw, date_part)].append((kind, raw))
+            if not step():
+                return None
+
+        with self.lock:
+            # Today's runs that now belong to another day join that day's rebuild.
+            today_raws = self._journal_raws(today, self.day_data_locked())
+            for kind, raw in today_raws or []:
+                day = self._raw_day(raw, today)
+                if day != today:
+                    events[day].append((kind, raw))
+            player  = self.player_name
+            tracked = list(self.non_blockchain_items)
+            exclude = list(self.non_blockchain_exclude)
+
+        tasks = [(day, kept.get(day), evs, tracked, exclude, player)
+                 for day, evs in sorted(events.items()) if day != today and (evs or day not in kept)]
+        steps += len(tasks)
+        results = []
+        if tasks:
+            with ProcessPoolExecutor(max_workers=min(len(tasks), os.cpu_count() or 1)) as pool:
+                futures = [pool.submit(_rebuild_day, task) for task in tasks]
+                for future in as_completed(futures):
+                    results.append(future.result())
+                    if not step():
+                        for f in futures:
+                            f.cancel()
+                        return None
+
+        for day, data, records in results:
+            self.write_day_log(day, data)
+            if day in kept:
+                for record in records:
+                    self.append_journal(record, day)
+            else:
+                self.write_journal(day, records)
+
+        rebuilt = len(results)
+        with self.lock:
+            # Today is live: rebuilt under the lock from its journal as it stands now.
+            moved_in = events.get(today, [])
+            if today_raws is not None:
+                own  = [(k, r) for k, r in self._journal_raws(today, self.day_data_locked()) or []
+                        if self._raw_day(r, today) == today]
+                base = None
+            else:
+                own, base = [], self.day_data_locked()
+            if base is None or moved_in:
+                _, data, records = _rebuild_day((today, base, own + moved_in, self.non_blockchain_items,
+                                                 self.non_blockchain_exclude, self.player_name))
+                self._log_seq += 1
+                self.write_day_log(today, data, self._log_seq)
+                if base is None:
+                    self.write_journal(today, records)
+                else:
+                    for record in records:
+                        self.append_journal(record, today)
+                start_time = self.start_time
+                self._unpark_day_locked(self._load_day_state_locked(self.current_log_date))
+                self.start_time = start_time
+                rebuilt += 1
+            self._day_cache.clear()
+            self.drop_rates.reset()
+            self.container_ev.reset()
+            self.catch_up_drop_rates()
+        with self._summary_cache_lock:
+            self._summary_cache.clear()
+        return {"rebuilt": rebuilt, "kept": sorted(kept)}
+
+    def summarize_logs(
+        self,
+        start_date: str,
+        end_date: str,
+        currency: Optional[str] = None,
+        progress=None,
+        cancel_event: Optional[threading.Event] = None,
+    ) -> dict:
         summary = {
             "Total Runs":           0,
             "Total Gold Coins":     0,
@@ -341,31 +1381,131 @@ class DataManager:
             "Container Counts":                defaultdict(int),
             "Container Blockchain Totals":     defaultdict(int),
             "Container Non-Blockchain Totals": defaultdict(int),
+            "Daily Metrics":        {"Date": []},
         }
+        if currency:
+            summary["Fiat Currency"]    = currency.lower()
+            summary["Total Fiat Value"] = 0.0
+            summary["Unpriced Days"]    = 0
+        gmt_offset = self.settings.get("gmt_offset", 0)
         try:
-            for fname in os.listdir(self.log_dir):
-                if fname.startswith("runs_") and fname.endswith(".json"):
-                    date_part = fname[5:-5]
-                    if start_date <= date_part <= end_date:
-                        with open(os.path.join(self.log_dir, fname), "r", encoding="utf-8") as f:
-                            data = json.load(f)
-                        summary["Total Runs"]           += data.get("runs", 0)
-                        summary["Total Gold Coins"]     += data.get("gold_coins_total", 0)
-                        summary["Total Estimated Gold"] += data.get("total_estimated_gold", 0)
-                        summary["Total ENJ Value"]      += data.get("total_enj_value", 0.0)
-                        summary["Total Character XP"]   += data.get("total_character_xp", 0)
-                        for k, v in data.get("skill_xp_totals",     {}).items(): summary["Skill XP Totals"][k]       += v
-                        for k, v in data.get("adventure_counts",    {}).items(): summary["Adventure Counts"][k]      += v
-                        for k, v in data.get("adventure_time_totals", {}).items(): summary["Adventure Time Totals"][k] += v
-                        for k, v in data.get("blockchain_totals",   {}).items(): summary["Blockchain Totals"][k]     += v
-                        for k, v in data.get("non_blockchain_totals",{}).items():summary["Non-Blockchain Totals"][k] += v
-                        for k, v in data.get("container_counts",                {}).items(): summary["Container Counts"][k]                += v
-                        for k, v in data.get("container_blockchain_totals",     {}).items(): summary["Container Blockchain Totals"][k]     += v
-                        for k, v in data.get("container_non_blockchain_totals", {}).items(): summary["Container Non-Blockchain Totals"][k] += v
+            files = self._day_log_files(start_date, end_date)
+            for done, (date_part, path) in enumerate(files, 1):
+                if cancel_event and cancel_event.is_set():
+                    summary["_cancelled"] = True
+                    break
+                if progress:
+                    progress(done, len(files))
+                data = self._read_day_log(path)
+                summary["Total Runs"]           += data.get("runs", 0)
+                summary["Total Gold Coins"]     += data.get("gold_coins_total", 0)
+                summary["Total Estimated Gold"] += data.get("total_estimated_gold", 0)
+                summary["Total ENJ Value"]      += data.get("total_enj_value", 0.0)
+                if currency:
+                    price = self.price_history.price_for_day(currency, date_part, gmt_offset)
+                    if price is None:
+                        summary["Unpriced Days"] += 1
+                    else:
+                        summary["Total Fiat Value"] += data.get("total_enj_value", 0.0) * price
+                summary["Total Character XP"]   += data.get("total_character_xp", 0)
+                for k, v in data.get("skill_xp_totals",     {}).items(): summary["Skill XP Totals"][k]       += v
+                for k, v in data.get("adventure_counts",    {}).items(): summary["Adventure Counts"][k]      += v
+                for k, v in data.get("adventure_time_totals", {}).items(): summary["Adventure Time Totals"][k] += v
+                for k, v in data.get("blockchain_totals",   {}).items(): summary["Blockchain Totals"][k]     += v
+                for k, v in data.get("non_blockchain_totals",{}).items():summary["Non-Blockchain Totals"][k] += v
+                for k, v in data.get("container_counts",                {}).items(): summary["Container Counts"][k]                += v
+                for k, v in data.get("container_blockchain_totals",     {}).items(): summary["Container Blockchain Totals"][k]     += v
+                for k, v in data.get("container_non_blockchain_totals", {}).items(): summary["Container Non-Blockchain Totals"][k] += v
+                self._append_daily_metrics(summary["Daily Metrics"], date_part, data)
         except Exception as e:
             summary["_error"] = str(e)
         return summary
 
+    def _append_daily_metrics(self, daily: dict, date_part: str, data: dict):
+        # Column-per-metric lists; metrics first seen mid-range are back-filled with zeros.
+        row = {
+            "Runs":           data.get("runs", 0),
+            "Gold Coins":     data.get("gold_coins_total", 0),
+            "Estimated Gold": data.get("total_estimated_gold", 0),
+            "ENJ Value":      data.get("total_enj_value", 0.0),
+            "Character XP":   data.get("total_character_xp", 0),
+        }
+        row.update({f"{k} XP": v for k, v in data.get("skill_xp_totals", {}).items()})
+        row.update({f"{k} Time (s)": v for k, v in data.get("adventure_time_totals", {}).items()})
+        n = len(daily["Date"])
+        for key in row:
+            if key not in daily:
+                daily[key] = [0] * n
+        for key, col in daily.items():
+            if key != "Date":
+                col.append(row.get(key, 0))
+        daily["Date"].append(date_part)
+
+    def summary_statistics(self, summary: dict) -> Optional[dict]:
+        # Vectorized per-day stats over every logged day in the summary; None without numpy.
+        daily = summary.get("Daily Metrics")
+        if np is None or not daily or not daily["Date"]:
+            return None
+        names   = [k for k in daily if k != "Date"]
+        values  = np.array([daily[k] for k in names], dtype=np.float64)      # metrics x days
+        dates   = np.array(daily["Date"], dtype="datetime64[D]")
+        p50, p90 = np.percentile(values, [50, 90], axis=1)
+        best    = values.argmax(axis=1)
+        worst   = values.argmin(axis=1)
+        weekday = (dates.astype(np.int64) + 3) % 7                           # 1970-01-01 was a Thursday
+        onehot  = (weekday[None, :] == np.arange(7)[:, None]).astype(np.float64)
+        counts  = onehot.sum(axis=1)
+        wk_mean = np.divide(values @ onehot.T, counts, out=np.full((len(names), 7), np.nan), where=counts > 0)
+        mean    = values.mean(axis=1)
+        std     = values.std(axis=1)
+        return {
+            "days": len(daily["Date"]),
+            "weekday_days": counts.astype(int).tolist(),
+            "metrics": {
+                name: {
+                    "mean":       float(mean[i]),
+                    "median":     float(p50[i]),
+                    "p90":        float(p90[i]),
+                    "std":        float(std[i]),
+                    "best":       float(values[i, best[i]]),
+                    "best_date":  daily["Date"][best[i]],
+                    "worst":      float(values[i, worst[i]]),
+                    "worst_date": daily["Date"][worst[i]],
+                    "weekday":    [None if np.isnan(v) else float(v) for v in wk_mean[i]],
+                }
+                for i, name in enumerate(names)
+            },
+        }
+
+    # Same as summarize_logs, memoized on the range plus the mtime of every file it covers.
+    def summarize_logs_cached(
+        self,
+        start_date: str,
+        end_date: str,
+        currency: Optional[str] = None,
+        progress=None,
+        cancel_event: Optional[threading.Event] = None,
+    ) -> dict:
+        try:
+            key = (start_date, end_date, currency, self.price_history.version(), frozenset(
+                self._source_stamp(source) for _, source in self._day_log_files(start_date, end_date)
+            ))
+        except OSError:
+            return self.summarize_logs(start_date, end_date, currency, progress, cancel_event)
+
+        with self._summary_cache_lock:
+            if key in self._summary_cache:
+                self._summary_cache.move_to_end(key)
+                return self._summary_cache[key]
+
+        summary = self.summarize_logs(start_date, end_date, currency, progress, cancel_event)
+        if "_error" not in summary and "_cancelled" not in summary:
+            with self._summary_cache_lock:
+                self._summary_cache[key] = summary
+                while len(self._summary_cache) > SUMMARY_CACHE_SIZE:
+                    self._summary_cache.popitem(last=False)
+        return summary
+
     def format_summary(self, summary: dict, start_date: str, end_date: str) -> str:
         if "_error" in summary:
             return f"Error summarizing logs: {summary['_error']}"
@@ -381,6 +1521,13 @@ class DataManager:
             f"Total Gold Coins: {summary['Total Gold Coins']:,}",
             f"Total Estimated Gold: {summary['Total Estimated Gold']:,}",
             f"Total ENJ Value: {summary['Total ENJ Value']:.2f}",
+        ]
+        if "Total Fiat Value" in summary:
+            cur = summary["Fiat Currency"].upper()
+            lines.append(f"Total ENJ Value ({cur}, at daily prices): {summary['Total Fiat Value']:,.2f}")
+            if summary["Unpriced Days"]:
+                lines.append(f"  ({summary['Unpriced Days']} day(s) without a recorded price)")
+        lines += [
             f"Total Character XP: {summary['Total Character XP']:,}\n",
             "Daily Averages:",
             f"  Avg Runs/Day: {summary['Total Runs'] / elapsed_days:.2f}",
@@ -390,6 +1537,19 @@ class DataManager:
         ]
         for skill, xp in summary["Skill XP Totals"].items():
             lines.append(f"  Avg {skill} XP/Day: {xp / elapsed_days:.0f}")
+
+        stats = self.summary_statistics(summary)
+        if stats:
+            lines.append(f"\nPer-Day Statistics ({stats['days']:,} logged day(s)):")
+            for name, st in stats["metrics"].items():
+                fmt = ",.2f" if name == "ENJ Value" else ",.0f"
+                lines.append(f"  {name}: median {st['median']:{fmt}} · p90 {st['p90']:{fmt}} · σ {st['std']:{fmt}}")
+                lines.append(f"    best {st['best']:{fmt}} ({st['best_date']}) · worst {st['worst']:{fmt}} ({st['worst_date']})")
+            lines.append("\nWeekday Averages (Runs · Est. Gold · ENJ):")
+            runs, gold, enj = (stats["metrics"][k]["weekday"] for k in ("Runs", "Estimated Gold", "ENJ Value"))
+            for i, day in enumerate(WEEKDAYS):
+                if stats["weekday_days"][i]:
+                    lines.append(f"  {day}: {runs[i]:,.1f} · {gold[i]:,.0f} · {enj[i]:,.2f}")
         lines.append("\nSkill XP Totals:")
         for k, v in summary["Skill XP Totals"].items():   lines.append(f"  {k}: {v:,}")
         lines.append("\nAdventures:")
@@ -410,10 +1570,21 @@ class DataManager:
         for k, v in summary["Container Non-Blockchain Totals"].items(): lines.append(f"  {k}: {v:,}")
         return "\n".join(lines)
 
-    def export_summary_to_excel(self, summary: dict, start_date: str, end_date: str):
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "Summary Report"
+    def export_to_excel(
+        self,
+        file_path: str,
+        summary: dict,
+        start_date: str,
+        end_date: str,
+        include_runs: bool = False,
+        progress=None,
+        cancel_event: Optional[threading.Event] = None,
+    ) -> bool:
+        # Streams rows through a write-only workbook, one day file at a time, so memory
+        # stays flat however long the range is. Safe to call off the Tk thread.
+        # Returns False if cancelled; nothing is written in that case.
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet("Summary Report")
         ws.append(["Lost Relics Adventure Report"])
         ws.append([f"From {start_date} to {end_date}"])
         ws.append([])
@@ -422,6 +1593,8 @@ class DataManager:
         ws.append(["Total Gold Coins",     summary["Total Gold Coins"]])
         ws.append(["Total Estimated Gold", summary["Total Estimated Gold"]])
         ws.append(["Total ENJ Value",      summary["Total ENJ Value"]])
+        if "Total Fiat Value" in summary:
+            ws.append([f"Total ENJ Value ({summary['Fiat Currency'].upper()})", round(summary["Total Fiat Value"], 2)])
         ws.append(["Total Character XP",   summary["Total Character XP"]])
         ws.append([])
         for section, label in [
@@ -443,67 +1616,692 @@ class DataManager:
                     ws.append([k, v])
             ws.append([])
 
-        file_path = filedialog.asksaveasfilename(
-            defaultextension=".xlsx",
-            filetypes=[("Excel Files", "*.xlsx")],
-            title="Save Report As",
-        )
-        if file_path:
-            wb.save(file_path)
-            messagebox.showinfo("Export Successful", f"Report saved to {file_path}")
+        stats = self.summary_statistics(summary)
+        if stats:
+            st_ws = wb.create_sheet("Statistics")
+            st_ws.append([f"Per-day statistics over {stats['days']} logged day(s)"])
+            st_ws.append(["Metric", "Mean", "Median", "P90", "Std Dev",
+                          "Best", "Best Day", "Worst", "Worst Day"] + WEEKDAYS)
+            for name, st in stats["metrics"].items():
+                st_ws.append([name, st["mean"], st["median"], st["p90"], st["std"],
+                              st["best"], st["best_date"], st["worst"], st["worst_date"]] + st["weekday"])
+
+        files      = self._day_log_files(start_date, end_date)
+        total      = len(files) * (2 if include_runs else 1)
+        done       = 0
+        currency   = summary.get("Fiat Currency")
+        gmt_offset = self.settings.get("gmt_offset", 0)
+        skills     = sorted(SKILLS)
+
+        def step():
+            nonlocal done
+            done += 1
+            if progress:
+                progress(done, total)
+            if cancel_event and cancel_event.is_set():
+                for sheet in wb.worksheets:
+                    try:
+                        sheet.close()
+                        sheet._writer.cleanup()
+                    except Exception:
+                        pass
+                return False
+            return True
+
+        day_ws = wb.create_sheet("Per Day")
+        header = ["Date", "Runs", "Gold Coins", "Estimated Gold", "ENJ Value"]
+        if currency:
+            header.append(f"ENJ Value ({currency.upper()})")
+        day_ws.append(header + ["Character XP"] + [f"{sk} XP" for sk in skills] + ["Adventure Time (s)"])
+        for date_part, path in files:
+            try:
+                data = self._read_day_log(path)
+            except Exception:
+                data = {}
+            enj = data.get("total_enj_value", 0.0)
+            row = [date_part, data.get("runs", 0), data.get("gold_coins_total", 0),
+                   data.get("total_estimated_gold", 0), round(enj, 4)]
+            if currency:
+                price = self.price_history.price_for_day(currency, date_part, gmt_offset)
+                row.append(round(enj * price, 2) if price is not None else None)
+            row.append(data.get("total_character_xp", 0))
+            row += [data.get("skill_xp_totals", {}).get(sk, 0) for sk in skills]
+            row.append(sum(data.get("adventure_time_totals", {}).values()))
+            day_ws.append(row)
+            if not step():
+                return False
+
+        if include_runs:
+            run_ws = wb.create_sheet("Per Run")
+            run_ws.append(["Date", "Time (UTC)", "Type", "Name", "Count", "Duration (s)",
+                           "Character XP", "Gold Coins", "Estimated Gold", "ENJ Value"])
+            for date_part, _ in files:
+                for rec in self.iter_journal(date_part):
+                    run_ws.append([
+                        date_part,
+                        datetime.fromtimestamp(rec.get("time", 0), timezone.utc).strftime("%Y-%m-%d %H:%M:%S"),
+                        rec.get("kind", ""), rec.get("name", ""), rec.get("count", 1),
+                        rec.get("duration", 0), rec.get("xp", 0), rec.get("gold", 0),
+                        rec.get("estimated_gold", 0), round(rec.get("enj", 0.0), 4),
+                    ])
+                if not step():
+                    return False
+
+        wb.save(file_path)
+        return True
 
 
 # ===========================================================================
-# WebSocketClient
+# History rebuild workers
 # ===========================================================================
-class WebSocketClient:
-    def __init__(
-        self,
-        url: str,
-        on_adventure,   
-        on_player,      
-        on_container,   
-        on_status,      
-        stop_event: threading.Event,
-        reconnect_delay: int = RECONNECT_DELAY,
-    ):
-        self.url             = url
-        self.on_adventure    = on_adventure
-        self.on_player       = on_player
-        self.on_container    = on_container
-        self.on_status       = on_status
-        self.stop_event      = stop_event
-        self.reconnect_delay = reconnect_delay
-        self._ws             = None
+class _RebuildSink:
+    # Stands in for the market value series and drop-rate store while rebuilding:
+    # prices were sampled live, and a rebuilt day is never a late day.
+    through = ""
+
+    def record(self, *args):
+        pass
+
+
+class _DayRebuilder(DataManager):
+    # DataManager's processing rules without its files, settings or threads.
+    def __init__(self, day, tracked: List[str], exclude: List[str], base: Optional[dict], player_name: str):
+        self._init_state()
+        self.non_blockchain_items   = tracked
+        self.non_blockchain_exclude = exclude
+        self.market_values = self.drop_rates = self.container_ev = _RebuildSink()
+        self.player_name   = player_name
+        self.reset_daily_counters_locked(day)
+        if base:
+            self._apply_day_data_locked(base)
+
+
+def _rebuild_day(task: tuple) -> tuple:
+    # Runs in a worker process: (day, base log or None, [(kind, raw)], tracked, exclude, player).
+    day_str, base, events, tracked, exclude, player_name = task
+    day = _DayRebuilder(datetime.strptime(day_str, "%Y-%m-%d").date(), tracked, exclude, base, player_name)
+    records = []
+    for kind, raw in sorted(events, key=lambda e: _parse_utc_timestamp(e[1].get("t"))):
+        seen = day.seen_adventure_instances if kind == "adventure" else day.seen_container_instances
+        if raw["i"] in seen:
+            continue
+        seen.add(raw["i"])
+        event = _unpack_event(kind, raw)
+        records.append(day.process_adventure_locked(event) if kind == "adventure"
+                       else day.process_container_locked(event))
+    return day_str, day.day_data_locked(), records
 
-    # ------------------------------------------------------------------
-    # Public
-    # ------------------------------------------------------------------
-    def run(self):
-        while not self.stop_event.is_set():
-            self.on_status("Connecting…")
-            try:
-                self._ws = websocket.WebSocketApp(
-                    self.url,
-                    on_open    = self._on_open,
-                    on_message = self._on_message,
-                    on_error   = self._on_error,
-                    on_close   = self._on_close,
-                )
-                self._ws.run_forever()
-            except Exception as e:
-                self.on_status(f"WS error: {e}")
 
-            if self.stop_event.is_set():
-                break
+# ===========================================================================
+# DropRateStore  — all-time (adventure, item) counters for closed days
+# ===========================================================================
+class DropRateStore:
+    # `merge` folds one day's counts into the running totals; the container value stats
+    # (_merge_container_stats) use the same store with their own merge.
+    def __init__(self, path: str, merge=_merge_drop_counts):
+        self.path    = path
+        self.merge   = merge
+        self.lock    = threading.Lock()
+        self.through = ""          # last day merged
+        self.counts: dict = {}
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.through = data.get("through", "")
+            self.counts  = data.get("counts", {})
+        except Exception:
+            pass
 
-            self.on_status(f"Disconnected — reconnecting in {self.reconnect_delay}s…")
-            self.stop_event.wait(self.reconnect_delay)
+    def merge_day(self, date_str: str, counts: dict):
+        with self.lock:
+            if date_str <= self.through:
+                return
+            self.merge(self.counts, counts)
+            self.through = date_str
+            self._save_locked()
 
-    def close(self):
-        if self._ws:
-            try:
-                self._ws.close()
+    def reset(self):
+        with self.lock:
+            self.through, self.counts = "", {}
+            self._save_locked()
+
+    def add_counts(self, counts: dict):
+        with self.lock:
+            self.merge(self.counts, counts)
+            self._save_locked()
+
+    def combined(self, today: dict) -> dict:
+        merged: dict = {}
+        with self.lock:
+            self.merge(merged, self.counts)
+        self.merge(merged, today)
+        return merged
+
+    def _save_locked(self):
+        tmp_path = self.path + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"through": self.through, "counts": self.counts}, f)
+            os.replace(tmp_path, self.path)
+        except Exception:
+            pass
+
+
+# ===========================================================================
+# SessionIndex  — play sessions split on idle gaps
+# ===========================================================================
+class SessionIndex:
+    # Closed sessions are one JSON line each in SESSIONS_FILE; the session in progress
+    # lives in SESSION_OPEN_FILE so a restart picks it up again.
+    def __init__(self, directory: str, idle_seconds: float):
+        self.path      = os.path.join(directory, SESSIONS_FILE)
+        self.open_path = os.path.join(directory, SESSION_OPEN_FILE)
+        self.idle      = idle_seconds
+        self.lock      = threading.Lock()
+        self.closed: List[dict] = []
+        self.current: Optional[dict] = None
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        self.closed.append(json.loads(line))
+                    except ValueError:
+                        continue
+            self.closed.sort(key=lambda s: s["start"])
+        except Exception:
+            pass
+        try:
+            with open(self.open_path, "r", encoding="utf-8") as f:
+                self.current = json.load(f)
+        except Exception:
+            pass
+
+    @staticmethod
+    def _new(start: float, end: float) -> dict:
+        return {"start": start, "end": end, "runs": 0, "containers": 0, "adventure_time": 0,
+                "gold": 0, "estimated_gold": 0, "enj": 0.0, "xp": 0, "items": {}}
+
+    @staticmethod
+    def _fold(session: dict, record: dict):
+        end   = record["time"]
+        begin = end - record.get("duration", 0)
+        session["start"] = min(session["start"], begin)
+        session["end"]   = max(session["end"], end)
+        if record.get("kind") == "adventure":
+            session["runs"]           += 1
+            session["adventure_time"] += record.get("duration", 0)
+        else:
+            session["containers"] += record.get("count", 1)
+        for key in ("gold", "estimated_gold", "enj", "xp"):
+            session[key] += record.get(key, 0)
+        items = session["items"]
+        for name, amount in record.get("items", {}).items():
+            if name != "Gold Coins":
+                items[name] = items.get(name, 0) + amount
+
+    @staticmethod
+    def _trim(session: dict):
+        session["items"] = dict(heapq.nlargest(SESSION_TOP_ITEMS, session["items"].items(), key=lambda kv: kv[1]))
+
+    def set_idle(self, idle_seconds: float):
+        with self.lock:
+            self.idle = idle_seconds
+
+    def add(self, record: dict):
+        end   = record["time"]
+        begin = end - record.get("duration", 0)
+        with self.lock:
+            cur = self.current
+            if cur is not None and end < cur["start"] - self.idle:
+                self._backfill_locked(record)
+                return
+            if cur is None or begin > cur["end"] + self.idle:
+                if cur is not None:
+                    self._close_locked()
+                self.current = cur = self._new(begin, end)
+            self._fold(cur, record)
+            self._save_open_locked()
+
+    def expire(self, now: float):
+        # Close the open session once nothing has happened for longer than the idle threshold.
+        with self.lock:
+            if self.current is not None and now - self.current["end"] > self.idle:
+                self._close_locked()
+
+    def sessions(self, start: Optional[float] = None, end: Optional[float] = None) -> List[dict]:
+        self.expire(time.time())
+        with self.lock:
+            found = [dict(s, open=False) for s in self.closed]
+            if self.current is not None:
+                cur = dict(self.current, open=True)
+                self._trim(cur)
+                found.append(cur)
+        return [dict(s, duration=s["end"] - s["start"]) for s in found
+                if (start is None or s["end"] >= start) and (end is None or s["start"] < end)]
+
+    def _close_locked(self):
+        session, self.current = self.current, None
+        self._trim(session)
+        self.closed.append(session)
+        try:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(session) + "\n")
+            os.remove(self.open_path)
+        except Exception:
+            pass
+
+    def _backfill_locked(self, record: dict):
+        # Event older than the open session: fold it into the closed session it belongs to
+        # (or a new one) and rewrite the index. Only happens for late deliveries.
+        end   = record["time"]
+        begin = end - record.get("duration", 0)
+        target = None
+        for session in reversed(self.closed):
+            if session["start"] - self.idle <= end and begin <= session["end"] + self.idle:
+                target = session
+                break
+        if target is None:
+            target = self._new(begin, end)
+            self.closed.append(target)
+        self._fold(target, record)
+        self._trim(target)
+        self.closed.sort(key=lambda s: s["start"])
+        tmp_path = self.path + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                for session in self.closed:
+                    f.write(json.dumps(session) + "\n")
+            os.replace(tmp_path, self.path)
+        except Exception:
+            pass
+
+    def _save_open_locked(self):
+        tmp_path = self.open_path + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.current, f)
+            os.replace(tmp_path, self.open_path)
+        except Exception:
+            pass
+
+
+# ===========================================================================
+# LogArchive  — monthly compressed day logs with an offset index
+# ===========================================================================
+class LogArchive:
+    # File layout: ARCHIVE_MAGIC, independently compressed members, JSON index
+    # {"codec", "members": {name: [offset, length]}}, then FOOTER (index offset, magic).
+    FOOTER = struct.Struct("<Q4s")
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.lock      = threading.Lock()
+        self._indexes: Dict[str, tuple] = {}
+
+    def archive_path(self, month: str) -> str:
+        return os.path.join(self.directory, f"runs_{month}.lra")
+
+    @staticmethod
+    def _member_date(name: str) -> str:
+        return name.split("_", 1)[1].split(".", 1)[0]
+
+    def _index(self, path: str) -> dict:
+        st = os.stat(path)
+        with self.lock:
+            cached = self._indexes.get(path)
+            if cached and cached[0] == st.st_mtime_ns:
+                return cached[1]
+        with open(path, "rb") as f:
+            f.seek(-self.FOOTER.size, os.SEEK_END)
+            offset, magic = self.FOOTER.unpack(f.read(self.FOOTER.size))
+            if magic != ARCHIVE_MAGIC:
+                raise ValueError(f"{path} is not a run log archive")
+            f.seek(offset)
+            index = json.loads(f.read(st.st_size - self.FOOTER.size - offset))
+        with self.lock:
+            self._indexes[path] = (st.st_mtime_ns, index)
+        return index
+
+    def members(self, prefix: str, start_date: str, end_date: str) -> List[tuple]:
+        found = []
+        try:
+            fnames = sorted(os.listdir(self.directory))
+        except OSError:
+            return found
+        for fname in fnames:
+            if not (fname.startswith("runs_") and fname.endswith(".lra")):
+                continue
+            month = fname[5:-4]
+            if not (start_date[:7] <= month <= end_date[:7]):
+                continue
+            path = os.path.join(self.directory, fname)
+            try:
+                index = self._index(path)
+            except Exception:
+                continue
+            for name in index["members"]:
+                if name.startswith(prefix) and start_date <= self._member_date(name) <= end_date:
+                    found.append((self._member_date(name), (path, name)))
+        return found
+
+    def find(self, name: str) -> Optional[tuple]:
+        path = self.archive_path(self._member_date(name)[:7])
+        try:
+            return (path, name) if name in self._index(path)["members"] else None
+        except Exception:
+            return None
+
+    def read(self, path: str, name: str) -> bytes:
+        index          = self._index(path)
+        offset, length = index["members"][name]
+        with open(path, "rb") as f:
+            f.seek(offset)
+            blob = f.read(length)
+        return self._decompress(index.get("codec", "gzip"), blob)
+
+    @staticmethod
+    def _decompress(codec: str, blob: bytes) -> bytes:
+        if codec == "zstd":
+            if zstandard is None:
+                raise RuntimeError("archive is zstd-compressed but zstandard is not installed")
+            return zstandard.ZstdDecompressor().decompress(blob)
+        return gzip.decompress(blob)
+
+    def add(self, month: str, blobs: Dict[str, bytes]):
+        # Rewrites the month's archive with `blobs` added (replacing same-named members).
+        # Existing members are copied without recompressing.
+        os.makedirs(self.directory, mode=0o755, exist_ok=True)
+        path    = self.archive_path(month)
+        members: Dict[str, bytes] = {}
+        codec   = "zstd" if zstandard is not None else "gzip"
+        if os.path.isfile(path):
+            index = self._index(path)
+            codec = index.get("codec", codec)
+            with open(path, "rb") as f:
+                for name, (offset, length) in index["members"].items():
+                    f.seek(offset)
+                    members[name] = f.read(length)
+        for name, raw in blobs.items():
+            if codec == "zstd":
+                members[name] = zstandard.ZstdCompressor(level=10).compress(raw)
+            else:
+                members[name] = gzip.compress(raw, compresslevel=9)
+
+        tmp_path = path + ".tmp"
+        index    = {"codec": codec, "members": {}}
+        with open(tmp_path, "wb") as f:
+            f.write(ARCHIVE_MAGIC)
+            for name in sorted(members):
+                index["members"][name] = [f.tell(), len(members[name])]
+                f.write(members[name])
+            index_offset = f.tell()
+            f.write(json.dumps(index, separators=(",", ":")).encode("utf-8"))
+            f.write(self.FOOTER.pack(index_offset, ARCHIVE_MAGIC))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+
+# ===========================================================================
+# ColumnarExporter  — typed daily / per-item tables for bulk analytics
+# ===========================================================================
+class ColumnarExporter:
+    ITEM_SECTIONS = [
+        ("blockchain_totals",               "blockchain"),
+        ("non_blockchain_totals",           "non_blockchain"),
+        ("container_blockchain_totals",     "container_blockchain"),
+        ("container_non_blockchain_totals", "container_non_blockchain"),
+        ("adventure_counts",                "adventure"),
+        ("container_counts",                "container"),
+    ]
+
+    def __init__(self, dm: DataManager):
+        self.dm     = dm
+        self.skills = sorted(SKILLS)
+
+    def pick_format(self, fmt: Optional[str] = None) -> str:
+        if fmt == "arrow" and pa is None:
+            raise RuntimeError("Arrow export needs pyarrow (pip install pyarrow).")
+        if fmt == "npz" and np is None:
+            raise RuntimeError("NumPy export needs numpy (pip install numpy).")
+        if fmt:
+            return fmt
+        if pa is not None:
+            return "arrow"
+        if np is not None:
+            return "npz"
+        raise RuntimeError("Columnar export needs pyarrow or numpy.")
+
+    def daily_columns(self) -> List[str]:
+        return (["date", "runs", "gold_coins", "estimated_gold", "enj_value", "character_xp"]
+                + [f"xp_{sk.lower()}" for sk in self.skills] + ["adventure_seconds"])
+
+    # ------------------------------------------------------------------
+    # Public
+    # ------------------------------------------------------------------
+    def export(self, out_dir: str, fmt: Optional[str] = None, progress=None,
+               cancel_event: Optional[threading.Event] = None) -> Optional[dict]:
+        # Re-reads only days whose source stamp differs from the manifest of the last
+        # export: new days, today, and past days rewritten by late events, a rebuild or
+        # compaction. Days whose source is gone are dropped. Returns None if cancelled;
+        # nothing is written then.
+        fmt = self.pick_format(fmt)
+        os.makedirs(out_dir, exist_ok=True)
+        if fmt == "arrow":
+            old_daily, old_items = self._read_arrow(out_dir)
+        else:
+            old_daily, old_items = self._read_npz(out_dir)
+        manifest = self._read_manifest(out_dir, fmt) if old_daily is not None else None
+        if manifest is None:
+            old_daily = old_items = None    # no manifest to diff against: rebuild
+            manifest  = {}
+
+        sources = self.dm._day_log_files("0000-00-00", "9999-99-99")
+        stamps  = {date_part: self._stamp(source) for date_part, source in sources}
+        files   = [(d, source) for d, source in sources if manifest.get(d) != stamps[d]]
+        redo    = (set(manifest) - set(stamps)) | {d for d, _ in files}
+
+        daily = {c: [] for c in self.daily_columns()}
+        items = {"date": [], "category": [], "item": [], "amount": []}
+        for done, (date_part, path) in enumerate(files, 1):
+            if cancel_event and cancel_event.is_set():
+                return None
+            if progress:
+                progress(done, len(files))
+            try:
+                data = self.dm._read_day_log(path)
+            except Exception:
+                continue
+            day = datetime.strptime(date_part, "%Y-%m-%d").date()
+            daily["date"].append(day)
+            daily["runs"].append(data.get("runs", 0))
+            daily["gold_coins"].append(data.get("gold_coins_total", 0))
+            daily["estimated_gold"].append(data.get("total_estimated_gold", 0))
+            daily["enj_value"].append(float(data.get("total_enj_value", 0.0)))
+            daily["character_xp"].append(data.get("total_character_xp", 0))
+            for sk in self.skills:
+                daily[f"xp_{sk.lower()}"].append(data.get("skill_xp_totals", {}).get(sk, 0))
+            daily["adventure_seconds"].append(sum(data.get("adventure_time_totals", {}).values()))
+            for key, category in self.ITEM_SECTIONS:
+                for name, amount in data.get(key, {}).items():
+                    items["date"].append(day)
+                    items["category"].append(category)
+                    items["item"].append(name)
+                    items["amount"].append(amount)
+
+        if fmt == "arrow":
+            paths, total = self._write_arrow(out_dir, redo, old_daily, old_items, daily, items)
+        else:
+            paths, total = self._write_npz(out_dir, redo, old_daily, old_items, daily, items)
+        self._write_manifest(out_dir, fmt, stamps)
+        return {"format": fmt, "days_written": len(daily["date"]), "total_days": total, "paths": paths}
+
+    # ------------------------------------------------------------------
+    # Manifest of exported sources
+    # ------------------------------------------------------------------
+    def _stamp(self, source) -> Optional[list]:
+        # The day's file and mtime as the manager reports them (one pair per account in the
+        # combined view), in the form JSON stores them. An archived day uses the archive's
+        # mtime, so rewriting a month's archive re-exports that month.
+        try:
+            return json.loads(json.dumps(self.dm._source_stamp(source)))
+        except OSError:
+            return None     # moved while listing: re-read it
+
+    def _read_manifest(self, out_dir: str, fmt: str) -> Optional[dict]:
+        try:
+            with open(os.path.join(out_dir, COLUMNAR_MANIFEST), "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except Exception:
+            return None
+        return data.get("days") if data.get("format") == fmt else None
+
+    def _write_manifest(self, out_dir: str, fmt: str, stamps: dict):
+        path = os.path.join(out_dir, COLUMNAR_MANIFEST)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump({"format": fmt, "days": stamps}, f)
+        os.replace(path + ".tmp", path)
+
+    # ------------------------------------------------------------------
+    # Arrow IPC (Feather v2, uncompressed so it can be memory-mapped)
+    # ------------------------------------------------------------------
+    def _arrow_schemas(self):
+        daily = pa.schema(
+            [("date", pa.date32())]
+            + [(c, pa.float64() if c == "enj_value" else pa.int64()) for c in self.daily_columns()[1:]]
+        )
+        items = pa.schema([("date", pa.date32()), ("category", pa.string()),
+                           ("item", pa.string()), ("amount", pa.int64())])
+        return daily, items
+
+    def _read_arrow(self, out_dir: str) -> tuple:
+        daily_schema, items_schema = self._arrow_schemas()
+        try:
+            daily = pa_feather.read_table(os.path.join(out_dir, COLUMNAR_DAILY), memory_map=False)
+            items = pa_feather.read_table(os.path.join(out_dir, COLUMNAR_ITEMS), memory_map=False)
+        except Exception:
+            return None, None
+        if not daily.schema.equals(daily_schema) or not items.schema.equals(items_schema):
+            return None, None   # layout changed: rebuild from scratch
+        return {"date": daily["date"].to_pylist(), "_table": daily}, {"_table": items}
+
+    def _write_arrow(self, out_dir, redo, old_daily, old_items, daily, items) -> tuple:
+        daily_schema, items_schema = self._arrow_schemas()
+        redo_dates = pa.array([datetime.strptime(d, "%Y-%m-%d").date() for d in sorted(redo)], pa.date32())
+        tables = []
+        for old, new, schema, fname in ((old_daily, daily, daily_schema, COLUMNAR_DAILY),
+                                        (old_items, items, items_schema, COLUMNAR_ITEMS)):
+            table = pa.table(new, schema=schema)
+            if old is not None:
+                kept  = old["_table"].filter(pa_compute.invert(
+                    pa_compute.is_in(old["_table"]["date"], value_set=redo_dates)))
+                table = pa.concat_tables([kept, table]).sort_by("date")
+            path = os.path.join(out_dir, fname)
+            pa_feather.write_feather(table, path + ".tmp", compression="uncompressed")
+            os.replace(path + ".tmp", path)
+            tables.append((path, table))
+        return [p for p, _ in tables], tables[0][1].num_rows
+
+    # ------------------------------------------------------------------
+    # NumPy .npz bundle
+    # ------------------------------------------------------------------
+    def _read_npz(self, out_dir: str) -> tuple:
+        try:
+            with np.load(os.path.join(out_dir, COLUMNAR_BUNDLE), allow_pickle=False) as bundle:
+                cols = {k: bundle[k] for k in bundle.files}
+        except Exception:
+            return None, None
+        daily = {c[6:]: v for c, v in cols.items() if c.startswith("daily_")}
+        items = {c[6:]: v for c, v in cols.items() if c.startswith("items_")}
+        if sorted(daily) != sorted(self.daily_columns()):
+            return None, None
+        return daily, items
+
+    def _write_npz(self, out_dir, redo, old_daily, old_items, daily, items) -> tuple:
+        def typed(name, values):
+            if name == "date":
+                return np.array(values, dtype="datetime64[D]")
+            if name in ("category", "item"):
+                return np.array(values, dtype=str) if values else np.array([], dtype="<U1")
+            if name == "enj_value":
+                return np.array(values, dtype=np.float64)
+            return np.array(values, dtype=np.int64)
+
+        bundle = {}
+        for prefix, old, new in (("daily_", old_daily, daily), ("items_", old_items, items)):
+            keep = None
+            if old is not None:
+                keep = ~np.isin(old["date"], np.array(sorted(redo), dtype="datetime64[D]"))
+            for name, values in new.items():
+                arr = typed(name, values)
+                if keep is not None:
+                    arr = np.concatenate([old[name][keep], arr])
+                bundle[prefix + name] = arr
+            order = np.argsort(bundle[prefix + "date"], kind="stable")
+            for name in new:
+                bundle[prefix + name] = bundle[prefix + name][order]
+        path = os.path.join(out_dir, COLUMNAR_BUNDLE)
+        with open(path + ".tmp", "wb") as f:
+            np.savez(f, **bundle)
+        os.replace(path + ".tmp", path)
+        return [path], len(bundle["daily_date"])
+
+
+# ===========================================================================
+# WebSocketClient
+# ===========================================================================
+class WebSocketClient:
+    def __init__(
+        self,
+        url: str,
+        on_adventure,   
+        on_player,      
+        on_container,   
+        on_status,      
+        stop_event: threading.Event,
+        reconnect_delay: int = RECONNECT_DELAY,
+        on_error = None,
+    ):
+        self.url             = url
+        self.on_adventure    = on_adventure
+        self.on_player       = on_player
+        self.on_container    = on_container
+        self.on_status       = on_status
+        self.on_error        = on_error or (lambda text: None)
+        self.stop_event      = stop_event
+        self.reconnect_delay = reconnect_delay
+        self._ws             = None
+        self.stats           = {"connects": 0, "messages": 0, "bytes": 0, "cpu_seconds": 0.0}
+
+    # ------------------------------------------------------------------
+    # Public
+    # ------------------------------------------------------------------
+    def run(self):
+        while not self.stop_event.is_set():
+            self.on_status("Connecting…")
+            try:
+                self._ws = websocket.WebSocketApp(
+                    self.url,
+                    on_open    = self._on_open,
+                    on_message = self._on_message,
+                    on_error   = self._on_error,
+                    on_close   = self._on_close,
+                )
+                self._ws.run_forever()
+            except Exception as e:
+                self.on_status(f"WS error: {e}")
+                self.on_error(f"WS error: {e}")
+
+            if self.stop_event.is_set():
+                break
+
+            self.on_status(f"Disconnected — reconnecting in {self.reconnect_delay}s…")
+            self.stop_event.wait(self.reconnect_delay)
+
+    def close(self):
+        if self._ws:
+            try:
+                self._ws.close()
             except Exception:
                 pass
 
@@ -511,9 +2309,19 @@ class WebSocketClient:
     # Internal WebSocketApp callbacks
     # ------------------------------------------------------------------
     def _on_open(self, ws):
+        self.stats["connects"] += 1
         self.on_status("Connected")
 
     def _on_message(self, ws, raw: str):
+        started = time.thread_time()
+        try:
+            self._dispatch(raw)
+        finally:
+            self.stats["messages"]    += 1
+            self.stats["bytes"]       += len(raw)
+            self.stats["cpu_seconds"] += time.thread_time() - started
+
+    def _dispatch(self, raw: str):
         try:
             msg = json.loads(raw)
         except json.JSONDecodeError:
@@ -538,20 +2346,1901 @@ class WebSocketClient:
 
     def _on_error(self, ws, error):
         self.on_status(f"WS error: {error}")
+        self.on_error(f"WS error: {error}")
 
     def _on_close(self, ws, code, msg):
         self.on_status(f"Connection closed (code={code})")
+        if not self.stop_event.is_set():
+            self.on_error(f"Connection closed (code={code})")
+
+
+class AsyncWebSocketClient(WebSocketClient):
+    # Same callbacks as WebSocketClient, on one asyncio loop with heartbeats. Pings catch a
+    # half-open socket; the idle timeout catches a client that is connected but silent.
+    # Reconnects back off exponentially with equal jitter. Stats add stall counts and the
+    # last/max time-to-detect (last sign of life -> stall declared) and time-to-recover
+    # (drop -> connected again), in seconds.
+    def __init__(self, *args, ping_interval: float = 20, ping_timeout: float = 20,
+                 idle_timeout: float = 0, backoff_max: float = RECONNECT_MAX, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.ping_interval = ping_interval
+        self.ping_timeout  = ping_timeout
+        self.idle_timeout  = idle_timeout
+        self.backoff_max   = backoff_max
+        self._loop         = None
+        self._wake         = None
+        self._last_seen    = 0.0            # last message or pong
+        self._last_message = 0.0
+        self._stalled      = None
+        self.stats.update(stalls=0, time_to_detect=None, time_to_recover=None,
+                          max_time_to_detect=0.0, max_time_to_recover=0.0)
+
+    # ------------------------------------------------------------------
+    # Public
+    # ------------------------------------------------------------------
+    def run(self):
+        asyncio.run(self._main())
+
+    def close(self):
+        loop, wake = self._loop, self._wake
+        if loop is not None and wake is not None:
+            try:
+                loop.call_soon_threadsafe(wake.set)
+            except RuntimeError:
+                pass        # loop already finished
+
+    # ------------------------------------------------------------------
+    # Internal
+    # ------------------------------------------------------------------
+    def _record(self, key: str, seconds: float):
+        self.stats[key] = round(seconds, 3)
+        self.stats[f"max_{key}"] = max(self.stats[f"max_{key}"], round(seconds, 3))
+
+    async def _main(self):
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        attempt, down_since = 0, None
+        while not self.stop_event.is_set():
+            self.on_status("Connecting…")
+            reason, connected = None, False
+            try:
+                async with websockets.connect(self.url, ping_interval=None, open_timeout=10,
+                                              close_timeout=2, max_size=None) as ws:
+                    connected, attempt = True, 0
+                    self.stats["connects"] += 1
+                    if down_since is not None:
+                        self._record("time_to_recover", time.monotonic() - down_since)
+                        down_since = None
+                    self.on_status("Connected")
+                    reason = await self._session(ws)
+            except Exception as e:
+                reason = f"WS error: {e}"
+
+            if self.stop_event.is_set() or self._wake.is_set():
+                break
+            if connected:
+                down_since = time.monotonic()
+            self.on_error(reason or "Disconnected")
+
+            delay  = min(self.backoff_max, self.reconnect_delay * 2 ** attempt)
+            delay  = delay / 2 + random.uniform(0, delay / 2)
+            attempt += 1
+            self.on_status(f"{reason or 'Disconnected'} — reconnecting in {delay:.0f}s…")
+            try:
+                await asyncio.wait_for(self._wake.wait(), delay)
+                break
+            except asyncio.TimeoutError:
+                pass
+
+    async def _session(self, ws) -> Optional[str]:
+        # Pumps messages until the socket closes or stalls; returns why it ended.
+        self._last_seen = self._last_message = time.monotonic()
+        self._stalled   = None
+        tasks = [asyncio.create_task(self._heartbeat(ws)), asyncio.create_task(self._watch_close(ws))]
+        try:
+            while True:
+                try:
+                    raw = await asyncio.wait_for(ws.recv(), self.idle_timeout or None)
+                except asyncio.TimeoutError:
+                    self._stall(f"no data for {self.idle_timeout:.0f}s", self._last_message)
+                    break
+                self._last_seen = self._last_message = time.monotonic()
+                self._on_message(ws, raw)
+        except websockets.ConnectionClosed as e:
+            if self._stalled is None and not self._wake.is_set():
+                return f"Connection closed (code={e.rcvd.code if e.rcvd else 'none'})"
+        finally:
+            for task in tasks:
+                task.cancel()
+        return self._stalled and f"Stalled: {self._stalled}"
+
+    def _stall(self, why: str, since: float):
+        # `since`: last message for an idle stall, last message or pong for a ping timeout.
+        if self._stalled is None:
+            self._stalled = why
+            self.stats["stalls"] += 1
+            self._record("time_to_detect", time.monotonic() - since)
+
+    async def _heartbeat(self, ws):
+        while True:
+            await asyncio.sleep(self.ping_interval)
+            try:
+                pong = await ws.ping()
+                await asyncio.wait_for(pong, self.ping_timeout)
+            except asyncio.TimeoutError:
+                self._stall(f"no pong within {self.ping_timeout:.0f}s", self._last_seen)
+                await ws.close()
+                return
+            except websockets.ConnectionClosed:
+                return
+            self._last_seen = time.monotonic()
+
+    async def _watch_close(self, ws):
+        await self._wake.wait()
+        await ws.close()
+
+
+def make_ws_client(cfg: dict, **kwargs) -> WebSocketClient:
+    # settings["ws_client"]["mode"]: "asyncio" needs the optional websockets package;
+    # "auto" uses it when installed and falls back to the websocket-client thread.
+    mode = cfg.get("mode", "auto")
+    if mode == "asyncio" or (mode == "auto" and websockets is not None):
+        if websockets is not None:
+            return AsyncWebSocketClient(
+                ping_interval = float(cfg.get("ping_interval", 20)),
+                ping_timeout  = float(cfg.get("ping_timeout", 20)),
+                idle_timeout  = float(cfg.get("idle_timeout", 0)),
+                backoff_max   = float(cfg.get("backoff_max", RECONNECT_MAX)),
+                **kwargs,
+            )
+    return WebSocketClient(**kwargs)
+
+
+# ===========================================================================
+# RateTracker  — rolling runs/gold/ENJ/XP per hour
+# ===========================================================================
+class RateMeter:
+    # Ring of fixed-width time buckets with a running total: O(1) per update,
+    # O(buckets) per read, so history is never rescanned.
+    def __init__(self, window: int, buckets: int = RATE_BUCKETS):
+        self.window = window
+        self.span   = window / buckets
+        self.slots  = [-1] * buckets                       # bucket epoch held by each slot
+        self.sums   = [[0.0] * len(RATE_FIELDS) for _ in range(buckets)]
+        self.total  = [0.0] * len(RATE_FIELDS)
+
+    def _clear(self, slot: int):
+        for i, v in enumerate(self.sums[slot]):
+            self.total[i] -= v
+        self.sums[slot]  = [0.0] * len(RATE_FIELDS)
+        self.slots[slot] = -1
+
+    def add(self, ts: float, values: tuple, now: float):
+        n, idx, now_idx = len(self.slots), int(ts // self.span), int(now // self.span)
+        if idx <= now_idx - n:
+            return
+        slot = idx % n
+        if self.slots[slot] != idx:
+            self._clear(slot)
+            self.slots[slot] = idx
+        for i, v in enumerate(values):
+            self.sums[slot][i] += v
+            self.total[i]      += v
+
+    def totals(self, now: float) -> list:
+        n, now_idx = len(self.slots), int(now // self.span)
+        for slot, idx in enumerate(self.slots):
+            if idx != -1 and idx <= now_idx - n:
+                self._clear(slot)
+        return list(self.total)
+
+
+class RateTracker:
+    def __init__(self):
+        self.lock     = threading.Lock()
+        self.started  = time.time()
+        self.meters   = {label: RateMeter(seconds) for label, seconds in RATE_WINDOWS}
+        self.session  = [0.0] * len(RATE_FIELDS)
+
+    def add(self, record: dict):
+        now    = time.time()
+        ts     = min(record.get("time", now), now)
+        values = (1 if record.get("kind") == "adventure" else 0, record.get("gold", 0),
+                  record.get("estimated_gold", 0), record.get("enj", 0.0), record.get("xp", 0))
+        with self.lock:
+            for meter in self.meters.values():
+                meter.add(ts, values, now)
+            if ts >= self.started:
+                for i, v in enumerate(values):
+                    self.session[i] += v
+
+    def rates(self) -> Dict[str, Dict[str, float]]:
+        # Per-hour rates; windows younger than the session are divided by the time actually covered.
+        now = time.time()
+        with self.lock:
+            elapsed = max(now - self.started, 60.0)
+            result  = {field: {} for field in RATE_FIELDS}
+            for label, meter in self.meters.items():
+                hours = min(meter.window, elapsed) / 3600
+                for field, total in zip(RATE_FIELDS, meter.totals(now)):
+                    result[field][label] = total / hours
+            for field, total in zip(RATE_FIELDS, self.session):
+                result[field]["session"] = total / (elapsed / 3600)
+        return result
+
+
+# ===========================================================================
+# Accounts  — several game clients tracked from one process
+# ===========================================================================
+def parse_ws_endpoints(value: str) -> List[tuple]:
+    # "ws://localhost:11991/, alt=ws://localhost:11993/" -> [(label, url), ...]. Unlabelled
+    # endpoints are named after their port; labels double as run_logs/<label> directory names.
+    endpoints, used = [], set()
+    for part in value.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        label, sep, url = part.partition("=")
+        if not sep or "://" in label:
+            label, url = "", part
+        label = re.sub(r"[^A-Za-z0-9_-]", "_", label.strip())
+        if not label:
+            try:
+                label = f"port{urlparse(url.strip()).port}"
+            except ValueError:
+                label = f"account{len(endpoints) + 1}"
+        base, n = label, 2
+        while label in used:
+            label, n = f"{base}_{n}", n + 1
+        used.add(label)
+        endpoints.append((label, url.strip()))
+    return endpoints or [("main", "ws://localhost:11991/")]
+
+
+def _merge_totals(into: dict, data: dict):
+    # Sums one account's day log (or snapshot) into `into`: numbers add, dicts of numbers add
+    # per key, sets union. Anything else (instance ids, names, dates) is left to the caller.
+    for key, value in data.items():
+        if key.startswith("seen_"):
+            continue
+        if key == "drop_counts":
+            _merge_drop_counts(into.setdefault(key, {}), value)
+        elif key == "container_stats":
+            _merge_container_stats(into.setdefault(key, {}), value)
+        elif key == "top_drops":
+            for kind, entries in value.items():
+                into.setdefault(key, {}).setdefault(kind, []).extend(entries)
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            into[key] = into.get(key, 0) + value
+        elif isinstance(value, dict):
+            target = into.setdefault(key, {})
+            for k, v in value.items():
+                if isinstance(v, (int, float)):
+                    target[k] = target.get(k, 0) + v
+        elif isinstance(value, set):
+            into[key] = into.get(key, set()) | value
+
+
+class Account:
+    # One game client: its endpoint, data namespace, rate meters and connection.
+    def __init__(self, label: str, url: str, dm: DataManager):
+        self.label     = label
+        self.url       = url
+        self.dm        = dm
+        self.rates     = RateTracker()
+        self.status    = "—"
+        self.ws_client = None
+        self.ws_thread = None
+
+    def usage(self, disk: bool = True) -> dict:
+        with self.dm.lock:
+            runs, player, cached = self.dm.counter, self.dm.player_name, len(self.dm._day_cache)
+        usage = dict(
+            self.ws_client.stats if self.ws_client else {},
+            label       = self.label,
+            url         = self.url,
+            player      = player,
+            status      = self.status,
+            alive       = bool(self.ws_thread and self.ws_thread.is_alive()),
+            runs_today  = runs,
+            cached_days = cached,
+        )
+        if disk:
+            usage["disk_bytes"] = self.dm.disk_usage()
+        return usage
+
+
+def account_usage(accounts: List[Account]) -> List[dict]:
+    # Per-account connection and storage figures for the Accounts window and /api/accounts.
+    return [acct.usage() for acct in accounts]
+
+
+class CombinedRates:
+    def __init__(self, trackers: List[RateTracker]):
+        self.trackers = trackers
+
+    def rates(self) -> Dict[str, Dict[str, float]]:
+        total: Dict[str, Dict[str, float]] = {}
+        for tracker in self.trackers:
+            for field, windows in tracker.rates().items():
+                for label, value in windows.items():
+                    total.setdefault(field, {})[label] = total.get(field, {}).get(label, 0.0) + value
+        return total
+
+
+class SessionView(SessionIndex):
+    # Read-only index for attached windows: an idle session is closed in memory only.
+    def _close_locked(self):
+        session, self.current = self.current, None
+        self._trim(session)
+        self.closed.append(session)
+
+
+class CombinedSessions:
+    def __init__(self, accounts: List[Account]):
+        self.accounts = accounts
+
+    def set_idle(self, idle_seconds: float):
+        for acct in self.accounts:
+            acct.dm.sessions.set_idle(idle_seconds)
+
+    def expire(self, now: float):
+        for acct in self.accounts:
+            acct.dm.sessions.expire(now)
+
+    def sessions(self, start: Optional[float] = None, end: Optional[float] = None) -> List[dict]:
+        found = [dict(sess, account=acct.label) for acct in self.accounts
+                 for sess in acct.dm.sessions.sessions(start, end)]
+        return sorted(found, key=lambda sess: sess["start"])
+
+
+class CombinedDataManager(DataManager):
+    # Read-only union of every account for the combined dashboard and aggregate summaries.
+    # Days are merged by date, so summaries, statistics and exports work unchanged.
+    def __init__(self, accounts: List[Account], log_dir: str):
+        primary = accounts[0].dm
+        self._init_state()
+        self.accounts      = accounts
+        self.log_dir       = log_dir
+        self.settings      = primary.settings
+        self.price_history = primary.price_history
+        self.market_values = primary.market_values
+        self.errors        = primary.errors
+        self.non_blockchain_items   = primary.non_blockchain_items
+        self.non_blockchain_exclude = primary.non_blockchain_exclude
+        self.sessions      = CombinedSessions(accounts)
+
+    @property
+    def current_log_date(self):
+        return self.accounts[0].dm.current_log_date
+
+    @property
+    def player_name(self) -> str:
+        return " + ".join(acct.dm.player_name for acct in self.accounts)
+
+    def snapshot(self) -> dict:
+        merged: dict = {}
+        start_times = []
+        for acct in self.accounts:
+            snap = acct.dm.snapshot()
+            start_times.append(snap["start_time"])
+            _merge_totals(merged, snap)
+        merged.update(player_name=self.player_name, log_date=self.current_log_date.isoformat(),
+                      start_time=min(start_times))
+        return merged
+
+    def _day_log_files(self, start_date: str, end_date: str) -> List[tuple]:
+        days: Dict[str, list] = defaultdict(list)
+        for acct in self.accounts:
+            for date_part, source in acct.dm._day_log_files(start_date, end_date):
+                days[date_part].append((acct.dm, source))
+        return [(d, tuple(sources)) for d, sources in sorted(days.items())]
+
+    def _read_day_log(self, sources) -> dict:
+        merged: dict = {}
+        for dm, source in sources:
+            _merge_totals(merged, dm._read_day_log(source))
+        return merged
+
+    def _source_stamp(self, sources) -> tuple:
+        return tuple(dm._source_stamp(source) for dm, source in sources)
+
+    def iter_journal(self, date_str: str):
+        for acct in self.accounts:
+            yield from acct.dm.iter_journal(date_str)
+
+    def drop_count_totals(self, scope: str = "all") -> dict:
+        merged: dict = {}
+        for acct in self.accounts:
+            _merge_drop_counts(merged, acct.dm.drop_count_totals(scope))
+        return merged
+
+    def container_stat_totals(self, scope: str = "all") -> dict:
+        merged: dict = {}
+        for acct in self.accounts:
+            _merge_container_stats(merged, acct.dm.container_stat_totals(scope))
+        return merged
+
+    def top_drops_today(self, kind: str) -> list:
+        return [e for acct in self.accounts for e in acct.dm.top_drops_today(kind)]
+
+    def disk_usage(self) -> int:
+        return sum(acct.dm.disk_usage() for acct in self.accounts)
+
+    def compact_logs(self) -> int:
+        return sum(acct.dm.compact_logs() for acct in self.accounts)
+
+    def memory_counts(self) -> Dict[str, int]:
+        counts: Dict[str, int] = defaultdict(int)
+        for acct in self.accounts:
+            for key, value in acct.dm.memory_counts().items():
+                counts[key] += value
+        counts["summary_cache"] += len(self._summary_cache)
+        return dict(counts)
+
+    def rebuild_history(self, progress=None, cancel_event=None) -> Optional[dict]:
+        result = {"rebuilt": 0, "kept": []}
+        n = len(self.accounts)
+        for i, acct in enumerate(self.accounts):
+            part = acct.dm.rebuild_history(
+                progress=progress and (lambda d, t, i=i: progress(i * t + d, n * t)), cancel_event=cancel_event)
+            if part is None:
+                return None
+            result["rebuilt"] += part["rebuilt"]
+            result["kept"] = sorted(set(result["kept"]) | set(part["kept"]))
+        return result
+
+
+# ===========================================================================
+# Snapshot channel  — ingestion process → UI process (--ingest / --attach)
+# ===========================================================================
+class SnapshotPublisher:
+    # Writer side of run_logs/snapshot.shm: a fixed-size mmap'd file holding the latest JSON
+    # payload behind a seqlock header. The sequence is odd while a write is in progress; a
+    # reader copies the payload and keeps it only if the sequence was even and unchanged.
+    HEADER = struct.Struct("<4sIQQ")    # magic, capacity, sequence, payload length
+
+    def __init__(self, path: str, capacity: int = SNAPSHOT_CAPACITY):
+        self.path  = path
+        self._lock = threading.Lock()
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            # Never shrink or recreate the file: attached readers keep their mapping of it.
+            size = max(os.fstat(fd).st_size, self.HEADER.size + capacity)
+            os.ftruncate(fd, size)
+            self._mm = mmap.mmap(fd, size)
+        finally:
+            os.close(fd)
+        self.capacity = size - self.HEADER.size
+        magic, _, seq, _ = self.HEADER.unpack_from(self._mm, 0)
+        # Carry on from the previous writer's sequence so readers never see it go backwards.
+        self._seq = seq + (seq & 1) if magic == SNAPSHOT_MAGIC else 0
+
+    def publish(self, payload: dict) -> bool:
+        data = json.dumps(payload, default=_json_default, separators=(",", ":")).encode("utf-8")
+        if len(data) > self.capacity:
+            return False
+        with self._lock:
+            mm = self._mm
+            self._seq += 1
+            struct.pack_into("<Q", mm, 8, self._seq)
+            mm[self.HEADER.size:self.HEADER.size + len(data)] = data
+            self._seq += 1
+            self.HEADER.pack_into(mm, 0, SNAPSHOT_MAGIC, self.capacity, self._seq, len(data))
+        return True
+
+    def close(self):
+        with self._lock:
+            self._mm.close()
+
+
+class SnapshotReader:
+    # Read-only side; never blocks the writer. Returns the last good payload while a write
+    # is in progress or before the first one.
+    def __init__(self, path: str):
+        self.path     = path
+        self._mm      = None
+        self._seq     = -1
+        self._payload: Optional[dict] = None
+
+    def _attach(self) -> bool:
+        try:
+            with open(self.path, "rb") as f:
+                size = os.fstat(f.fileno()).st_size
+                if size <= SnapshotPublisher.HEADER.size:
+                    return False
+                self._mm = mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ)
+            return True
+        except (OSError, ValueError):
+            return False
+
+    def read(self) -> Optional[dict]:
+        if self._mm is None and not self._attach():
+            return self._payload
+        header = SnapshotPublisher.HEADER
+        for _ in range(100):
+            magic, capacity, seq, length = header.unpack_from(self._mm, 0)
+            if magic != SNAPSHOT_MAGIC or seq == self._seq:
+                return self._payload
+            if capacity != len(self._mm) - header.size:
+                # A writer started with a larger capacity; map the grown file.
+                self.close()
+                if not self._attach():
+                    return self._payload
+                continue
+            if seq & 1 or length > capacity:
+                time.sleep(0.001)
+                continue
+            data = self._mm[header.size:header.size + length]
+            if header.unpack_from(self._mm, 0)[2] != seq:
+                continue
+            try:
+                self._payload = json.loads(data)
+            except ValueError:
+                continue
+            self._seq = seq
+            break
+        return self._payload
+
+    def close(self):
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+
+
+def spawn_self(args: List[str]):
+    # Starts another detached tracker process. Frozen builds re-run the executable itself;
+    # from source, this script.
+    cmd = [sys.executable] + ([] if getattr(sys, "frozen", False) else [os.path.abspath(sys.argv[0])])
+    kwargs = {}
+    if os.name == "nt":
+        kwargs["creationflags"] = subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP
+    else:
+        kwargs["start_new_session"] = True
+    subprocess.Popen(cmd + args, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                     stderr=subprocess.DEVNULL, close_fds=True, **kwargs)
+
+
+class WriterLock:
+    # Single-writer election for a run_logs folder: an exclusive, non-blocking OS lock on
+    # writer.lock, held for as long as the process writes the logs. The OS releases it when
+    # that process exits or dies, so a leftover file never blocks the next start.
+    def __init__(self, path: str):
+        self.path = path
+        self._fh  = None
+
+    @property
+    def held(self) -> bool:
+        return self._fh is not None
+
+    def acquire(self) -> bool:
+        if self._fh:
+            return True
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        fh = os.fdopen(os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644), "r+b")
+        try:
+            if fcntl is not None:
+                fcntl.flock(fh.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            elif msvcrt is not None:
+                msvcrt.locking(fh.fileno(), msvcrt.LK_NBLCK, 1)
+        except OSError:
+            fh.close()
+            return False
+        try:
+            fh.truncate(0)
+            fh.write(str(os.getpid()).encode())       # informational; readers use the snapshot's pid
+            fh.flush()
+        except OSError:
+            pass
+        self._fh = fh
+        return True
+
+    def release(self):
+        if not self._fh:
+            return
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._fh.fileno(), fcntl.LOCK_UN)
+            elif msvcrt is not None:
+                self._fh.seek(0)
+                msvcrt.locking(self._fh.fileno(), msvcrt.LK_UNLCK, 1)
+        except OSError:
+            pass
+        self._fh.close()
+        self._fh = None
+
+
+class IngestControl:
+    # The UI's handle on a separate ingestion process: reads what it publishes, starts one
+    # when none is running and asks it to stop through a marker file it polls for.
+    def __init__(self, log_dir: str):
+        self.reader    = SnapshotReader(os.path.join(log_dir, SNAPSHOT_FILE))
+        self.stop_path = os.path.join(log_dir, INGEST_STOP_FILE)
+
+    def read(self) -> Optional[dict]:
+        return self.reader.read()
+
+    def alive(self) -> bool:
+        payload = self.reader.read()
+        return bool(payload) and time.time() - payload.get("published_at", 0) < SNAPSHOT_STALE
+
+    def start(self):
+        if self.alive():
+            return
+        try:
+            os.remove(self.stop_path)
+        except OSError:
+            pass
+        spawn_self(["--ingest"])
+
+    def stop(self):
+        with open(self.stop_path, "w", encoding="utf-8") as f:
+            f.write(str(os.getpid()))
+
+    def close(self):
+        self.reader.close()
+
+
+class PublishedRates:
+    def __init__(self):
+        self.latest: Dict[str, Dict[str, float]] = {}
+
+    def rates(self) -> Dict[str, Dict[str, float]]:
+        return self.latest
+
+
+class AttachedDataManager(DataManager):
+    # One account as seen from an attached UI: today's figures come from the ingestion
+    # process's snapshot, history from the logs it writes. Nothing here writes to run_logs.
+    def __init__(self, log_dir: str, config_file: str, exclude_file: str,
+                 settings: Optional[dict] = None, price_history: Optional["PriceHistory"] = None):
+        os.makedirs(log_dir, mode=0o755, exist_ok=True)
+        self._init_state()
+        self.log_dir       = log_dir
+        self.config_file   = config_file
+        self.exclude_file  = exclude_file
+        self.player_name   = "Unknown Player"
+        self.errors        = get_error_log(log_dir, writer=False)
+        self.price_history = price_history or PriceHistory(os.path.join(log_dir, PRICE_HISTORY_DIR))
+        self.market_values = MarketValueSeries(os.path.join(log_dir, MARKET_VALUES_FILE))
+        self.archive       = LogArchive(os.path.join(log_dir, ARCHIVE_DIR))
+        self.drop_rates    = DropRateStore(os.path.join(log_dir, DROP_RATES_FILE))
+        self.container_ev  = DropRateStore(os.path.join(log_dir, CONTAINER_EV_FILE), _merge_container_stats)
+        self.non_blockchain_items   = self.load_config(config_file,  DEFAULT_TRACKED_NON_BLOCKCHAIN_ITEMS)
+        self.non_blockchain_exclude = self.load_config(exclude_file, DEFAULT_EXCLUDED_NON_BLOCKCHAIN_ITEMS)
+        self.settings      = settings if settings is not None else self.load_settings()
+        self._published: Optional[dict] = None
+        self._sessions: Optional[SessionIndex] = None
+        self._sessions_stamp = None
+        self.reset_daily_counters_locked(self.now_local().date())
+
+    @property
+    def sessions(self) -> SessionIndex:
+        # The ingestion process appends to the session files; re-read them only when they change.
+        stamp = []
+        for name in (SESSIONS_FILE, SESSION_OPEN_FILE):
+            try:
+                st = os.stat(os.path.join(self.log_dir, name))
+                stamp.append((st.st_mtime_ns, st.st_size))
+            except OSError:
+                stamp.append(None)
+        idle = self.settings["sessions"].get("idle_minutes", 20) * 60
+        if self._sessions is None or stamp != self._sessions_stamp:
+            self._sessions, self._sessions_stamp = SessionView(self.log_dir, idle), stamp
+        self._sessions.set_idle(idle)
+        return self._sessions
+
+    def apply_published(self, entry: dict):
+        snap = dict(entry["snapshot"])
+        snap["start_time"]           = datetime.fromisoformat(snap["start_time"])
+        snap["non_blockchain_items"] = set(snap["non_blockchain_items"])
+        day = datetime.strptime(snap["log_date"], "%Y-%m-%d").date()
+        with self.lock:
+            if day != self.current_log_date:
+                # Yesterday was folded into the all-time drop rates by the ingestion process.
+                self.drop_rates   = DropRateStore(os.path.join(self.log_dir, DROP_RATES_FILE))
+                self.container_ev = DropRateStore(os.path.join(self.log_dir, CONTAINER_EV_FILE),
+                                                  _merge_container_stats)
+            self._published       = snap
+            self.player_name      = snap["player_name"]
+            self.counter          = snap["counter"]
+            self.current_log_date = day
+            self.drop_counts      = entry.get("drop_counts", {})
+            self.container_stats  = entry.get("container_stats", {})
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            if self._published is None:
+                return super().snapshot()
+            return dict(self._published)
+
+    def compact_logs(self) -> int:
+        return 0      # the ingestion process compacts on start and at each daily reset
+
+    def top_drops_today(self, kind: str) -> list:
+        try:
+            return self._read_day_log(self.log_filepath()).get("top_drops", {}).get(kind, [])
+        except (OSError, ValueError):
+            return []
+
+    def rebuild_history(self, progress=None, cancel_event=None) -> Optional[dict]:
+        raise RuntimeError("the logs belong to the tracker process that writes them. Close or stop it, "
+                           "then rebuild from the window that takes over.")
+
+
+class AttachedAccount(Account):
+    def __init__(self, label: str, url: str, dm: AttachedDataManager):
+        super().__init__(label, url, dm)
+        self.rates     = PublishedRates()
+        self.published: dict = {}
+
+    def apply_published(self, entry: Optional[dict], live: bool):
+        if entry:
+            self.published    = entry
+            self.rates.latest = entry.get("rates", {})
+            self.dm.apply_published(entry)
+        self.status = entry["status"] if entry and live else "tracking process not running"
+
+    def usage(self, disk: bool = True) -> dict:
+        usage = dict(self.published.get("usage", {}), label=self.label, url=self.url, status=self.status)
+        usage.setdefault("player", self.dm.player_name)
+        usage.setdefault("runs_today", 0)
+        usage.setdefault("cached_days", 0)
+        usage["alive"] = usage.get("alive", False) and self.status != "tracking process not running"
+        if disk:
+            usage["disk_bytes"] = self.dm.disk_usage()
+        return usage
+
+
+def attached_accounts() -> List[AttachedAccount]:
+    # Read-only view of every account's logs, laid out as TrackerCore writes them.
+    endpoints = parse_ws_endpoints(WS_URL)
+    history   = PriceHistory(os.path.join(LOG_DIR, PRICE_HISTORY_DIR))
+    settings  = None
+    accounts: List[AttachedAccount] = []
+    for label, url in endpoints:
+        log_dir  = LOG_DIR if len(endpoints) == 1 else os.path.join(LOG_DIR, label)
+        dm       = AttachedDataManager(log_dir, CONFIG_FILE, EXCLUDE_FILE, settings=settings, price_history=history)
+        settings = dm.settings
+        accounts.append(AttachedAccount(label, url, dm))
+    return accounts
+
+
+# ===========================================================================
+# Event sinks  — accepted runs and containers fanned out to other stores
+# ===========================================================================
+class EventSink(abc.ABC):
+    # Plugin interface. write_batch() runs on the sink's own thread and may block or raise;
+    # the batch is retried and nothing else waits on it. Register new kinds in SINK_TYPES,
+    # or name a class as "package.module:ClassName" in settings.conf.
+    def __init__(self, cfg: dict):
+        self.cfg = cfg
+
+    @abc.abstractmethod
+    def write_batch(self, records: List[dict]):
+        ...
+
+    def close(self):
+        pass
+
+
+class JsonlSink(EventSink):
+    def write_batch(self, records: List[dict]):
+        with open(self.cfg["path"], "a", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps(record, separators=(",", ":")) + "\n")
+
+
+class InfluxLineSink(EventSink):
+    # InfluxDB line protocol, one point per event and one per dropped item, for `influx write`
+    # or Telegraf's file input.
+    @staticmethod
+    def _tag(value) -> str:
+        return re.sub(r"([ ,=])", r"\\\1", str(value))
+
+    def write_batch(self, records: List[dict]):
+        lines = []
+        for r in records:
+            ts   = int(r["time"] * 1e9)
+            tags = f"account={self._tag(r['account'])},name={self._tag(r['name'])}"
+            lines.append(
+                f"lost_relics_{r['kind']},{tags} count={r.get('count', 1)}i,duration={r['duration']},"
+                f"gold={r['gold']}i,estimated_gold={r['estimated_gold']}i,enj={r['enj']},xp={r['xp']}i {ts}")
+            for item, amount in r["items"].items():
+                lines.append(f"lost_relics_item,{tags},source={r['kind']},item={self._tag(item)} "
+                             f"amount={amount}i {ts}")
+        with open(self.cfg["path"], "a", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+
+
+class SqliteSink(EventSink):
+    def __init__(self, cfg: dict):
+        super().__init__(cfg)
+        self._db = None         # opened on the sink thread; sqlite connections stay on theirs
+
+    def write_batch(self, records: List[dict]):
+        if self._db is None:
+            self._db = sqlite3.connect(self.cfg["path"])
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS events (time REAL, account TEXT, kind TEXT, name TEXT, "
+                "count INTEGER, duration REAL, gold INTEGER, estimated_gold INTEGER, enj REAL, "
+                "xp INTEGER, items TEXT)")
+        with self._db:
+            self._db.executemany(
+                "INSERT INTO events VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(r["time"], r["account"], r["kind"], r["name"], r.get("count", 1), r["duration"],
+                  r["gold"], r["estimated_gold"], r["enj"], r["xp"], json.dumps(r["items"]))
+                 for r in records])
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+
+
+class WebhookSink(EventSink):
+    # POSTs each batch as a JSON array. Only localhost targets are accepted.
+    def __init__(self, cfg: dict):
+        super().__init__(cfg)
+        if urlparse(cfg["url"]).hostname not in ("localhost", "127.0.0.1", "::1"):
+            raise ValueError(f"webhook sink must point at localhost, not {cfg['url']}")
+        self._session = requests.Session()
+
+    def write_batch(self, records: List[dict]):
+        resp = self._session.post(self.cfg["url"], json=records, timeout=self.cfg.get("timeout", 5))
+        resp.raise_for_status()
+
+
+SINK_TYPES = {
+    "jsonl":    JsonlSink,
+    "influx":   InfluxLineSink,
+    "sqlite":   SqliteSink,
+    "webhook":  WebhookSink,
+}
+
+
+def _sink_class(kind: str) -> type:
+    if kind in SINK_TYPES:
+        return SINK_TYPES[kind]
+    module, sep, name = kind.partition(":")
+    if not sep:
+        raise ValueError(f"unknown sink type {kind!r}")
+    cls = getattr(importlib.import_module(module), name)
+    if not (isinstance(cls, type) and issubclass(cls, EventSink)):
+        raise TypeError(f"{kind} is not an EventSink subclass")
+    return cls
+
+
+class SinkRunner:
+    # One sink behind a bounded queue and its own thread. offer() never blocks: when the
+    # queue is full the event is dropped and counted.
+    def __init__(self, name: str, sink: EventSink, queue_size: int, batch_size: int, flush_interval: float):
+        self.name           = name
+        self.sink           = sink
+        self.queue: "queue.Queue" = queue.Queue(maxsize=max(queue_size, 1))
+        self.batch_size     = max(batch_size, 1)
+        self.flush_interval = flush_interval
+        self.stop_event     = threading.Event()
+        self.stats = {"delivered": 0, "dropped": 0, "failures": 0, "batches": 0, "last_error": "",
+                      "last_flush": None, "last_lag": None, "max_lag": 0.0}
+        self._pending: List[tuple] = []
+        self._thread = threading.Thread(target=self._run, daemon=True, name=f"sink-{name}")
+
+    def start(self):
+        self._thread.start()
+
+    def offer(self, record: dict):
+        try:
+            self.queue.put_nowait((time.time(), record))
+        except queue.Full:
+            self.stats["dropped"] += 1
+
+    def _run(self):
+        backoff = 0.0
+        while True:
+            deadline = None
+            while len(self._pending) < self.batch_size:
+                if self._pending and deadline is None:
+                    deadline = time.monotonic() + self.flush_interval
+                timeout = 0.5 if deadline is None else deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    self._pending.append(self.queue.get(timeout=timeout))
+                except queue.Empty:
+                    if self.stop_event.is_set():
+                        break
+            if self._pending:
+                backoff = self._flush(backoff)
+            elif self.stop_event.is_set():
+                return
+            if backoff and self.stop_event.wait(backoff):
+                return
+
+    def _flush(self, backoff: float) -> float:
+        # The batch stays pending until it is written, so a failing sink backs off and
+        # retries the same events; new ones queue up (and eventually drop) behind it.
+        try:
+            self.sink.write_batch([record for _, record in self._pending])
+        except Exception as e:
+            self.stats["failures"]  += 1
+            self.stats["last_error"] = f"{type(e).__name__}: {e}"
+            return min(max(backoff * 2, 1.0), 60.0)
+        now = time.time()
+        lag = now - self._pending[0][0]
+        self.stats["delivered"] += len(self._pending)
+        self.stats["batches"]   += 1
+        self.stats["last_flush"] = now
+        self.stats["last_lag"]   = lag
+        self.stats["max_lag"]    = max(self.stats["max_lag"], lag)
+        self._pending = []
+        return 0.0
+
+    def snapshot(self) -> dict:
+        pending = list(self._pending)
+        oldest  = pending[0][0] if pending else None
+        if oldest is None:
+            with self.queue.mutex:
+                oldest = self.queue.queue[0][0] if self.queue.queue else None
+        return dict(self.stats, name=self.name, queued=self.queue.qsize() + len(pending),
+                    oldest_age=time.time() - oldest if oldest else 0.0)
+
+    def stop(self, timeout: float):
+        self.stop_event.set()
+        self._thread.join(timeout)
+        try:
+            self.sink.close()
+        except Exception:
+            pass
+
+
+class SinkPipeline:
+    def __init__(self, configs: List[dict], on_error=None):
+        self.runners: List[SinkRunner] = []
+        for i, cfg in enumerate(configs):
+            if not cfg.get("enabled", True):
+                continue
+            name = cfg.get("name") or f"{cfg.get('type', 'sink')}{i + 1}"
+            try:
+                sink = _sink_class(cfg["type"])(cfg)
+            except Exception as e:
+                if on_error:
+                    on_error(f"Sink {name} not started: {type(e).__name__}: {e}")
+                continue
+            self.runners.append(SinkRunner(name, sink, int(cfg.get("queue_size", 10_000)),
+                                           int(cfg.get("batch_size", 100)), float(cfg.get("flush_interval", 2.0))))
+
+    def start(self):
+        for runner in self.runners:
+            runner.start()
+
+    def publish(self, account: str, record: dict):
+        if not self.runners:
+            return
+        event = {k: v for k, v in record.items() if k != "raw"}
+        event["account"] = account
+        for runner in self.runners:
+            runner.offer(event)
+
+    def stats(self) -> List[dict]:
+        return [runner.snapshot() for runner in self.runners]
+
+    def stop(self, timeout: float = 3.0):
+        # Flushes what is queued, giving up on sinks still stuck after `timeout`.
+        for runner in self.runners:
+            runner.stop_event.set()
+        for runner in self.runners:
+            runner.stop(timeout)
+
+
+# ===========================================================================
+# Alerts  — goal and threshold rules checked as events arrive
+# ===========================================================================
+ALERT_TOTALS = {
+    # metric -> (DataManager attribute for today, session field)
+    "runs":           ("counter",              "runs"),
+    "containers":     ("container_counts",     "containers"),
+    "gold":           ("gold_coins_total",     "gold"),
+    "estimated_gold": ("total_estimated_gold", "estimated_gold"),
+    "enj":            ("total_enj_value",      "enj"),
+    "xp":             ("total_character_xp",   "xp"),
+}
+ALERT_SCOPES = ("today", "session") + tuple(label for label, _ in RATE_WINDOWS)
+ALERT_OPS    = {">=": lambda a, b: a >= b, ">": lambda a, b: a > b,
+                "<=": lambda a, b: a <= b, "<": lambda a, b: a < b}
+_ALERT_RE    = re.compile(r"^\s*(?P<left>.+?)\s*(?P<op>>=|<=|>|<)\s*(?P<value>-?\d+(?:\.\d+)?)\s*$")
+
+
+def parse_alert_rule(text: str) -> dict:
+    # "<metric> [scope] <op> <value>", e.g. "item:Waygate Orb >= 50", "enj today > 25",
+    # "runs 1h < 20", "idle >= 10". Metrics: runs, containers, gold, estimated_gold, enj, xp,
+    # item:<name>, adventure:<name>, container:<name> and idle (minutes since the last run).
+    # Scopes: today (default), session, or a rate window (per hour over 15m / 1h).
+    m = _ALERT_RE.match(text)
+    if not m:
+        raise ValueError(f"expected '<metric> [scope] <op> <value>': {text!r}")
+    metric, op, value = m["left"], m["op"], float(m["value"])
+    head, _, last = metric.rpartition(" ")
+    scoped = bool(head) and last in ALERT_SCOPES
+    metric, scope = (head.strip(), last) if scoped else (metric, "today")
+    kind, _, name = metric.partition(":")
+    if scope not in ALERT_SCOPES:
+        raise ValueError(f"unknown scope {scope!r} in {text!r}; use one of {', '.join(ALERT_SCOPES)}")
+    if metric == "idle":
+        if scoped or op not in (">=", ">"):
+            raise ValueError(f"idle rules take no scope and only > or >=: {text!r}")
+    elif kind in ("item", "adventure", "container") and name:
+        if scope != "today" and not (kind == "item" and scope == "session"):
+            raise ValueError(f"{kind}: rules only support {'today or session' if kind == 'item' else 'today'}: {text!r}")
+    elif metric in ALERT_TOTALS:
+        if scope not in ("today", "session") and metric not in RATE_FIELDS:
+            raise ValueError(f"{metric} has no rate windows: {text!r}")
+    else:
+        raise ValueError(f"unknown metric {metric!r} in {text!r}")
+    return {"text": text.strip(), "metric": metric, "scope": scope, "op": op, "value": value}
+
+
+class AlertEngine:
+    # Rules are indexed by the metric they watch, so an event only checks rules on keys it
+    # touched. Rules that change with the clock alone (rate windows, idle) are checked once
+    # a second by tick(). Alerts are edge-triggered: a rule fires when it becomes true and
+    # re-arms once it is false again.
+    def __init__(self, rules: List[str], on_error=None):
+        self.lock      = threading.Lock()
+        self.on_error  = on_error
+        self.listeners = []
+        self.recent    = deque(maxlen=50)
+        self._next_id  = 1
+        self._last_run: Dict[str, float] = {}
+        self.set_rules(rules)
+
+    def set_rules(self, rules: List[str]):
+        compiled = []
+        for text in rules:
+            try:
+                compiled.append(parse_alert_rule(text))
+            except ValueError as e:
+                if self.on_error:
+                    self.on_error(f"Alert rule ignored: {e}")
+        by_key, timed = defaultdict(list), []
+        for rule in compiled:
+            if rule["metric"] == "idle" or rule["scope"] not in ("today", "session"):
+                timed.append(rule)
+            else:
+                by_key[rule["metric"]].append(rule)
+        with self.lock:
+            self.rules  = compiled
+            self.by_key = by_key
+            self.timed  = timed
+            self.state: Dict[tuple, bool] = {}
+
+    def add_listener(self, callback):
+        self.listeners.append(callback)
+
+    def _value(self, rule: dict, acct: Account, now: float) -> float:
+        metric, scope = rule["metric"], rule["scope"]
+        kind, _, name = metric.partition(":")
+        if metric == "idle":
+            return (now - self._last_run.get(acct.label, now)) / 60
+        if scope not in ("today", "session"):
+            return acct.rates.rates()[metric][scope]
+        if scope == "session":
+            sess = acct.dm.sessions.current or {}
+            return sess.get("items", {}).get(name, 0) if kind == "item" else sess.get(ALERT_TOTALS[metric][1], 0)
+        dm = acct.dm
+        with dm.lock:
+            if kind == "item":
+                return sum(totals.get(name, 0) for totals in (
+                    dm.blockchain_totals, dm.non_blockchain_totals,
+                    dm.container_blockchain_totals, dm.container_non_blockchain_totals))
+            if kind == "adventure":
+                return dm.adventure_counts.get(name, 0)
+            if kind == "container":
+                return dm.container_counts.get(name, 0)
+            value = getattr(dm, ALERT_TOTALS[metric][0])
+            return sum(value.values()) if isinstance(value, dict) else value
+
+    def _check(self, rule: dict, acct: Account, now: float, fired: list):
+        value = self._value(rule, acct, now)
+        hit   = ALERT_OPS[rule["op"]](value, rule["value"])
+        key   = (rule["text"], acct.label)
+        with self.lock:
+            was = self.state.get(key)
+            self.state[key] = hit
+            # The first look at a rule only records where it stands, so a goal already
+            # reached before a restart does not fire again.
+            if hit and was is False:
+                alert = {"id": self._next_id, "time": now, "account": acct.label,
+                         "rule": rule["text"], "value": value}
+                self._next_id += 1
+                self.recent.append(alert)
+                fired.append(alert)
+
+    def _notify(self, fired: list):
+        for alert in fired:
+            for callback in self.listeners:
+                try:
+                    callback(alert)
+                except Exception:
+                    pass
+
+    def prime(self, accounts: List[Account]):
+        now = time.time()
+        for acct in accounts:
+            self._last_run.setdefault(acct.label, now)
+            for rule in self.rules:
+                self._check(rule, acct, now, [])
+
+    def on_event(self, acct: Account, record: dict):
+        now, fired = time.time(), []
+        keys = {"gold", "estimated_gold", "enj", "xp", f"{record['kind']}:{record['name']}"}
+        keys.update(f"item:{name}" for name in record.get("items", {}))
+        if record["kind"] == "adventure":
+            keys.add("runs")
+            self._last_run[acct.label] = now
+            for rule in self.timed:
+                if rule["metric"] == "idle":
+                    self._check(rule, acct, now, fired)
+        else:
+            keys.add("containers")
+        for key in keys:
+            for rule in self.by_key.get(key, ()):
+                self._check(rule, acct, now, fired)
+        self._notify(fired)
+
+    def tick(self, accounts: List[Account]):
+        now, fired = time.time(), []
+        for rule in self.timed:
+            for acct in accounts:
+                self._check(rule, acct, now, fired)
+        self._notify(fired)
+
+    def recent_alerts(self) -> List[dict]:
+        with self.lock:
+            return list(self.recent)
+
+
+def format_alert(alert: dict, with_account: bool = False) -> str:
+    rule = parse_alert_rule(alert["rule"])
+    now  = f"{alert['value']:.1f} min" if rule["metric"] == "idle" else f"{alert['value']:,.4g}"
+    text = f"{alert['rule']}  (now {now})"
+    return f"[{alert['account']}] {text}" if with_account else text
+
+
+# ===========================================================================
+# QueryAPIServer  — read-only localhost JSON / SSE API
+# ===========================================================================
+def _json_default(obj):
+    if isinstance(obj, (set, frozenset)):
+        return sorted(obj)
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    raise TypeError(f"{type(obj).__name__} is not JSON serializable")
+
+
+def _merge_patch(old: dict, new: dict) -> dict:
+    # RFC 7396 merge patch turning `old` into `new`; removed keys map to None.
+    patch = {}
+    for k, v in new.items():
+        if k not in old:
+            patch[k] = v
+        elif isinstance(v, dict) and isinstance(old[k], dict):
+            sub = _merge_patch(old[k], v)
+            if sub:
+                patch[k] = sub
+        elif v != old[k]:
+            patch[k] = v
+    for k in old:
+        if k not in new:
+            patch[k] = None
+    return patch
+
+
+class QueryAPIServer:
+    def __init__(self, dm: DataManager, host: str = API_HOST, port: int = API_PORT):
+        self.dm         = dm
+        self.host       = host
+        self.port       = port
+        self._cond      = threading.Condition()
+        self._version   = 0
+        self._snap_ver  = -1
+        self._snap      = None
+        self._stopping  = False
+        self._httpd     = None
+        self._endpoints: Dict[str, Any] = {}
+
+    # ------------------------------------------------------------------
+    # Public
+    # ------------------------------------------------------------------
+    def start(self):
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                api._dispatch(self)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._httpd.daemon_threads = True
+        threading.Thread(target=self._httpd.serve_forever, daemon=True, name="api-thread").start()
+
+    def stop(self):
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        if self._httpd:
+            try:
+                self._httpd.shutdown()
+                self._httpd.server_close()
+            except Exception:
+                pass
+
+    def add_endpoint(self, path: str, provider):
+        # Extra read-only GET endpoint returning provider() as JSON.
+        self._endpoints[path] = provider
+
+    def publish(self):
+        # Called whenever ingestion changed state; SSE clients compute their own diff.
+        with self._cond:
+            self._version += 1
+            self._cond.notify_all()
+
+    # ------------------------------------------------------------------
+    # Internal
+    # ------------------------------------------------------------------
+    def _current(self):
+        with self._cond:
+            ver = self._version
+            if self._snap_ver == ver:
+                return ver, self._snap
+        # Taken outside the condition so publish() never waits on dm.lock.
+        snap = json.loads(json.dumps(self.dm.snapshot(), default=_json_default))
+        with self._cond:
+            if self._snap_ver < ver:
+                self._snap, self._snap_ver = snap, ver
+        return ver, snap
+
+    def _dispatch(self, req: BaseHTTPRequestHandler):
+        url   = urlparse(req.path)
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        try:
+            if url.path == "/api/snapshot":
+                self._send_json(req, self._current()[1])
+            elif url.path == "/api/summary":
+                today = self.dm.now_local().strftime("%Y-%m-%d")
+                start = query.get("start", today)
+                end   = query.get("end", start)
+                for d in (start, end):
+                    datetime.strptime(d, "%Y-%m-%d")
+                currency = query.get("currency", self.dm.settings.get("currency", "usd")).lower()
+                summary  = self.dm.summarize_logs_cached(start, end, currency)
+                self._send_json(req, dict(summary, start=start, end=end))
+            elif url.path == "/api/market":
+                item = query.get("item")
+                if not item:
+                    self._send_json(req, self.dm.market_values.items())
+                else:
+                    start, end = self._range_timestamps(query)
+                    stats = self.dm.market_values.stats(item, start, end)
+                    self._send_json(req, stats or {"error": "no samples"}, status=200 if stats else 404)
+            elif url.path == "/api/sessions":
+                start, end = self._range_timestamps(query)
+                self._send_json(req, self.dm.sessions.sessions(start, end))
+            elif url.path == "/api/drop_rates":
+                self._send_json(req, self.dm.drop_rate_table(query.get("scope", "all")))
+            elif url.path == "/api/container_ev":
+                self._send_json(req, self.dm.container_ev_table(query.get("scope", "all")))
+            elif url.path == "/api/top_drops":
+                today = self.dm.now_local().strftime("%Y-%m-%d")
+                start = query.get("start", today[:8] + "01")
+                end   = query.get("end", today)
+                for d in (start, end):
+                    datetime.strptime(d, "%Y-%m-%d")
+                kind, k = query.get("kind", "enj"), query.get("k", "20")
+                if kind not in ("enj", "gold") or not k.isdigit():
+                    self._send_json(req, {"error": "kind must be enj or gold, k a whole number"}, status=400)
+                else:
+                    self._send_json(req, self.dm.top_drops_range(start, end, kind, int(k)))
+            elif url.path == "/api/events":
+                self._stream_events(req)
+            elif url.path in self._endpoints:
+                self._send_json(req, self._endpoints[url.path]())
+            else:
+                self._send_json(req, {"error": "not found"}, status=404)
+        except ValueError:
+            self._send_json(req, {"error": "dates must be YYYY-MM-DD"}, status=400)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def _range_timestamps(self, query: dict) -> tuple:
+        # Local-day YYYY-MM-DD bounds from the query string as unix timestamps.
+        tz = timezone(timedelta(hours=self.dm.settings.get("gmt_offset", 0)))
+        start = end = None
+        if "start" in query:
+            start = datetime.strptime(query["start"], "%Y-%m-%d").replace(tzinfo=tz).timestamp()
+        if "end" in query:
+            end = (datetime.strptime(query["end"], "%Y-%m-%d").replace(tzinfo=tz) + timedelta(days=1)).timestamp()
+        return start, end
+
+    def _send_json(self, req: BaseHTTPRequestHandler, payload, status: int = 200):
+        body = json.dumps(payload, default=_json_default).encode("utf-8")
+        req.send_response(status)
+        req.send_header("Content-Type", "application/json")
+        req.send_header("Content-Length", str(len(body)))
+        req.send_header("Access-Control-Allow-Origin", "*")
+        req.end_headers()
+        req.wfile.write(body)
+
+    def _stream_events(self, req: BaseHTTPRequestHandler):
+        req.send_response(200)
+        req.send_header("Content-Type", "text/event-stream")
+        req.send_header("Cache-Control", "no-cache")
+        req.send_header("Access-Control-Allow-Origin", "*")
+        req.end_headers()
+
+        def send(event: str, ver: int, payload):
+            data = json.dumps(payload, default=_json_default)
+            req.wfile.write(f"id: {ver}\nevent: {event}\ndata: {data}\n\n".encode("utf-8"))
+            req.wfile.flush()
+
+        seen_ver, last = self._current()
+        send("snapshot", seen_ver, last)
+        while True:
+            with self._cond:
+                if self._version == seen_ver and not self._stopping:
+                    self._cond.wait(SSE_KEEPALIVE)
+                if self._stopping:
+                    return
+                changed = self._version != seen_ver
+            if not changed:
+                req.wfile.write(b": keepalive\n\n")
+                req.wfile.flush()
+                continue
+            seen_ver, snap = self._current()
+            patch = _merge_patch(last, snap)
+            if patch:
+                send("diff", seen_ver, patch)
+            last = snap
+
+
+# ===========================================================================
+# PriceService  — cached CoinGecko ENJ quotes
+# ===========================================================================
+class PriceService:
+    # Only the process that writes run_logs fetches prices and saves price_cache.json. A
+    # viewer (writer=False) never goes to the network; it re-reads that cache when it changes.
+    def __init__(self, cache_path: str, currencies: List[str], ttl: int = PRICE_TTL, url: str = COINGECKO_URL,
+                 writer: bool = True):
+        self.cache_path  = cache_path
+        self.currencies  = list(dict.fromkeys(c.lower() for c in currencies))
+        self.ttl         = ttl
+        self.url         = url
+        self.writer      = writer
+        self.lock        = threading.Lock()
+        self._prices: dict = {}
+        self._fetched_at = 0.0
+        self._cache_mtime = None
+        self._status     = "loading"
+        self._failures   = 0
+        self._retry_at   = 0.0
+        self._listeners: list = []
+        self._wake       = threading.Event()
+        self._stop       = threading.Event()
+        self._thread     = None
+
+        self.session = None
+        if writer:
+            self.session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=2)
+            self.session.mount("https://", adapter)
+            self.session.mount("http://",  adapter)
+        self._load_cache()
+
+    # ------------------------------------------------------------------
+    # Public
+    # ------------------------------------------------------------------
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True, name="price-thread")
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        try:
+            if self.session:
+                self.session.close()
+        except Exception:
+            pass
+
+    def add_listener(self, callback):
+        self._listeners.append(callback)
+
+    def add_currency(self, currency: str):
+        currency = currency.lower()
+        with self.lock:
+            if currency in self.currencies:
+                return
+            self.currencies.append(currency)
+            if self.writer:
+                self._fetched_at = 0.0     # a viewer waits for the writer to fetch it
+        self._wake.set()
+
+    def latest(self) -> tuple:
+        with self.lock:
+            return self._fetched_at, dict(self._prices)
+
+    def quote(self, currency: str) -> tuple:
+        # (price or None, 24h change, stale, status) for one currency, straight from the cache.
+        currency = currency.lower()
+        with self.lock:
+            price  = self._prices.get(currency)
+            change = self._prices.get(f"{currency}_24h_change") or 0.0
+            stale  = time.time() - self._fetched_at > self.ttl
+            return price, change, stale, self._status
+
+    # ------------------------------------------------------------------
+    # Internal
+    # ------------------------------------------------------------------
+    def _load_cache(self) -> bool:
+        # True when the file changed since it was last loaded.
+        try:
+            mtime = os.path.getmtime(self.cache_path)
+            if mtime == self._cache_mtime:
+                return False
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            prices     = dict(data.get("prices", {}))
+            fetched_at = float(data.get("fetched_at", 0.0))
+        except Exception:
+            return False
+        with self.lock:
+            self._cache_mtime = mtime
+            self._prices      = prices
+            self._fetched_at  = fetched_at
+            if prices:
+                self._status = "ok"
+        return True
+
+    def _save_cache(self, prices: dict, fetched_at: float):
+        tmp_path = self.cache_path + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"fetched_at": fetched_at, "prices": prices}, f)
+            os.replace(tmp_path, self.cache_path)
+        except Exception:
+            pass
+
+    def _next_delay(self) -> float:
+        with self.lock:
+            now = time.time()
+            if self._failures:
+                return max(self._retry_at - now, 0.0)
+            return max(self._fetched_at + self.ttl - now, 0.0)
+
+    def _backoff(self, retry_after: Optional[str]):
+        # Exponential backoff with equal jitter, never sooner than the server's Retry-After.
+        self._failures += 1
+        delay = min(PRICE_BACKOFF_MAX, PRICE_BACKOFF_BASE * 2 ** (self._failures - 1))
+        delay = delay / 2 + random.uniform(0, delay / 2)
+        try:
+            delay = max(delay, float(retry_after)) if retry_after else delay
+        except ValueError:
+            pass
+        self._retry_at = time.time() + delay
+
+    def _fetch(self):
+        with self.lock:
+            currencies = ",".join(self.currencies)
+        try:
+            r = self.session.get(
+                self.url,
+                params={"ids": "enjincoin", "vs_currencies": currencies, "include_24hr_change": "true"},
+                timeout=5,
+            )
+            if r.status_code == 429 or r.status_code >= 500:
+                with self.lock:
+                    self._status = "rate_limited" if r.status_code == 429 else "error"
+                    self._backoff(r.headers.get("Retry-After"))
+                return
+            r.raise_for_status()
+            prices = r.json().get("enjincoin", {})
+            now    = time.time()
+            with self.lock:
+                self._prices     = dict(prices)
+                self._fetched_at = now
+                self._status     = "ok"
+                self._failures   = 0
+            self._save_cache(prices, now)
+        except Exception:
+            with self.lock:
+                self._status = "error"
+                self._backoff(None)
+
+    def _notify(self):
+        for cb in list(self._listeners):
+            try:
+                cb()
+            except Exception:
+                pass
+
+    def _run(self):
+        if not self.writer:
+            while not self._stop.wait(PRICE_CACHE_POLL):
+                if self._load_cache():
+                    self._notify()
+            return
+        while not self._stop.is_set():
+            delay = self._next_delay()
+            if delay > 0:
+                self._wake.wait(delay)
+                self._wake.clear()
+                if self._stop.is_set():
+                    break
+                if self._next_delay() > 0:
+                    continue
+            self._fetch()
+            self._notify()
+
+
+# ===========================================================================
+# PriceHistory  — append-only ENJ price samples per currency
+# ===========================================================================
+class PriceHistory:
+    RECORD = struct.Struct("<dd")   # (unix timestamp, price)
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, mode=0o755, exist_ok=True)
+        self.lock      = threading.Lock()
+        self._series: Dict[str, tuple] = {}
+        self._samples  = 0
+
+    def _path(self, currency: str) -> str:
+        return os.path.join(self.directory, f"enj_{currency}.bin")
+
+    def _load_locked(self, currency: str) -> tuple:
+        series = self._series.get(currency)
+        if series is None:
+            raw = array("d")
+            try:
+                with open(self._path(currency), "rb") as f:
+                    data = f.read()
+                raw.frombytes(data[:len(data) - len(data) % self.RECORD.size])
+            except OSError:
+                pass
+            if sys.byteorder != "little":
+                raw.byteswap()
+            series = (raw[0::2], raw[1::2])
+            self._series[currency] = series
+            self._samples += len(series[0])
+        return series
+
+    def version(self) -> int:
+        with self.lock:
+            return self._samples
+
+    def record(self, fetched_at: float, prices: dict):
+        if not fetched_at:
+            return
+        with self.lock:
+            for currency, price in prices.items():
+                if currency.endswith("_24h_change") or not isinstance(price, (int, float)):
+                    continue
+                stamps, values = self._load_locked(currency)
+                if stamps and fetched_at <= stamps[-1]:
+                    continue
+                try:
+                    with open(self._path(currency), "ab") as f:
+                        f.write(self.RECORD.pack(fetched_at, float(price)))
+                except OSError:
+                    continue
+                stamps.append(fetched_at)
+                values.append(float(price))
+                self._samples += 1
+
+    def price_at(self, currency: str, when: float) -> Optional[float]:
+        # Last sample at or before `when`; None if the series starts after it.
+        with self.lock:
+            stamps, values = self._load_locked(currency.lower())
+            i = bisect_right(stamps, when)
+            return values[i - 1] if i else None
+
+    def price_for_day(self, currency: str, date_str: str, gmt_offset: int = 0) -> Optional[float]:
+        try:
+            day_start = datetime.strptime(date_str, "%Y-%m-%d").replace(
+                tzinfo=timezone(timedelta(hours=gmt_offset)))
+        except ValueError:
+            return None
+        return self.price_at(currency, (day_start + timedelta(days=1)).timestamp())
+
+
+# ===========================================================================
+# MarketValueSeries  — per-item MarketValue history, changes only
+# ===========================================================================
+class MarketValueSeries:
+    def __init__(self, path: str):
+        self.path  = path
+        self.lock  = threading.Lock()
+        self._series: Dict[str, tuple] = {}
+        self._load()
+
+    def _load(self):
+        rows = defaultdict(list)
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        rec = json.loads(line)
+                        rows[rec["n"]].append((float(rec["t"]), float(rec["v"])))
+                    except (ValueError, KeyError, TypeError):
+                        continue
+        except OSError:
+            return
+        for name, points in rows.items():
+            points.sort()
+            stamps, values = array("d"), array("d")
+            for t, v in points:
+                if values and values[-1] == v:
+                    continue
+                stamps.append(t)
+                values.append(v)
+            self._series[name] = (stamps, values)
+
+    def record(self, name: str, value: float, ts: float) -> bool:
+        with self.lock:
+            stamps, values = self._series.setdefault(name, (array("d"), array("d")))
+            i = bisect_right(stamps, ts)
+            if i and values[i - 1] == value:
+                return False
+            try:
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps({"t": ts, "n": name, "v": value}) + "\n")
+            except OSError:
+                return False
+            if i == len(stamps):
+                stamps.append(ts)
+                values.append(value)
+            elif values[i] == value:
+                # Late sample equal to the next point: that value just took effect earlier.
+                stamps[i] = ts
+            else:
+                # Late (replayed) sample: keep the series sorted.
+                stamps.insert(i, ts)
+                values.insert(i, value)
+            return True
+
+    def latest(self, name: str) -> Optional[float]:
+        with self.lock:
+            series = self._series.get(name)
+            return series[1][-1] if series else None
+
+    def items(self) -> Dict[str, float]:
+        with self.lock:
+            return {name: values[-1] for name, (_, values) in self._series.items() if values}
+
+    def sample_count(self) -> int:
+        with self.lock:
+            return sum(len(stamps) for stamps, _ in self._series.values())
+
+    def stats(self, name: str, start: Optional[float] = None, end: Optional[float] = None) -> Optional[dict]:
+        # min/max/time-weighted avg of the value in effect over [start, end].
+        with self.lock:
+            series = self._series.get(name)
+            if not series or not series[0]:
+                return None
+            stamps, values = series
+            end = time.time() if end is None else end
+            lo  = 0 if start is None else max(bisect_right(stamps, start) - 1, 0)
+            hi  = bisect_right(stamps, end)
+            if hi <= lo:
+                return None
+            window_start = stamps[lo] if start is None else max(start, stamps[lo])
+            pts   = values[lo:hi]
+            total = weighted = 0.0
+            for j in range(lo, hi):
+                seg_start = max(stamps[j], window_start)
+                seg_end   = stamps[j + 1] if j + 1 < hi else end
+                span      = max(seg_end - seg_start, 0.0)
+                weighted += values[j] * span
+                total    += span
+            return {
+                "item":    name,
+                "samples": hi - lo,
+                "min":     min(pts),
+                "max":     max(pts),
+                "avg":     weighted / total if total else sum(pts) / len(pts),
+                "first":   pts[0],
+                "last":    pts[-1],
+                "since":   window_start,
+            }
+
+
+# ===========================================================================
+# Item lists  — incrementally sorted tallies and a virtualized list widget
+# ===========================================================================
+ITEM_SORT_MODES = {
+    # section -> orders a click on its header cycles through; the first is the default
+    "adventures":               ("amount", "name"),
+    "containers":               ("amount", "name"),
+    "blockchain":               ("name", "amount", "value"),
+    "non_blockchain":           ("name", "amount", "value"),
+    "container_blockchain":     ("name", "amount", "value"),
+    "container_non_blockchain": ("name", "amount", "value"),
+}
+
+
+class SortedTally:
+    # A {name: amount} dict kept in display order. update() diffs against the previous
+    # counts and moves only the entries that changed (bisect out, insort back), so a tick
+    # with a few new drops does not re-sort the whole section. "value" orders by
+    # amount x latest market value; new prices re-key every entry once.
+    def __init__(self, mode: str = "name"):
+        self.mode    = mode
+        self.counts: Dict[str, float] = {}
+        self.values: Dict[str, float] = {}
+        self._keys: list = []
+
+    def _key(self, name: str, amount) -> tuple:
+        if self.mode == "amount":
+            return (-amount, name)
+        if self.mode == "value":
+            return (-amount * self.values.get(name, 0), name)
+        return (name.lower(), name)
+
+    def set_mode(self, mode: str):
+        if mode != self.mode:
+            self.mode  = mode
+            self._keys = sorted(self._key(n, a) for n, a in self.counts.items())
+
+    def update(self, counts: Dict[str, float], values: Optional[Dict[str, float]] = None):
+        if self.mode == "value" and values is not None and values != self.values:
+            self.values = dict(values)
+            self.counts = dict(counts)
+            self._keys  = sorted(self._key(n, a) for n, a in self.counts.items())
+            return
+        added = 0
+        for name, amount in counts.items():
+            old = self.counts.get(name)
+            if old == amount:
+                continue
+            if old is None:
+                added += 1
+            else:
+                del self._keys[bisect_left(self._keys, self._key(name, old))]
+            insort(self._keys, self._key(name, amount))
+            self.counts[name] = amount
+        if len(self.counts) != len(counts):
+            # Entries only disappear on a day reset or a view switch.
+            for name in [n for n in self.counts if n not in counts]:
+                del self._keys[bisect_left(self._keys, self._key(name, self.counts.pop(name)))]
+
+    def items(self) -> List[tuple]:
+        return [(key[-1], self.counts[key[-1]]) for key in self._keys]
+
+
+class VirtualList(ctk.CTkFrame):
+    # Drop-in for the read-only textboxes: a Canvas that draws only the rows in view, reusing
+    # one text item per visible line. Rows are (text, tag[, key]); tag "bold" uses the section
+    # font, long rows word-wrap, and clicking a row with a key calls on_click(key).
+    def __init__(self, parent, on_click=None):
+        super().__init__(parent, fg_color="transparent", border_width=0)
+        self.on_click  = on_click
+        self.rows: List[tuple]  = []
+        self.lines: List[tuple] = []        # rows after wrapping to the current width
+        self.fonts     = {"": tkfont.Font(font=FONT_BODY), "bold": tkfont.Font(font=FONT_SECTION)}
+        self.row_h     = max(f.metrics("linespace") for f in self.fonts.values()) + 2
+        self.fg        = "#d4d4d4"
+        self.canvas    = tk.Canvas(self, highlightthickness=0, borderwidth=0, yscrollincrement=self.row_h)
+        self.scrollbar = ctk.CTkScrollbar(self, command=self._yview)
+        self.canvas.configure(yscrollcommand=self.scrollbar.set)
+        self.scrollbar.pack(side="right", fill="y")
+        self.canvas.pack(side="left", fill="both", expand=True)
+        self._pool: List[int] = []
+        self._width  = 0
+        self._widths: Dict[tuple, int] = {}
+        self.canvas.bind("<Configure>", self._resized)
+        self.canvas.bind("<Button-1>", self._clicked)
+        for seq in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.canvas.bind(seq, self._wheel)
+
+    def set_colors(self, bg: str, fg: str):
+        self.canvas.configure(bg=bg)
+        self.fg = fg
+        for item in self._pool:
+            self.canvas.itemconfigure(item, fill=fg)
+
+    def set_rows(self, rows: List[tuple]):
+        self.rows = rows
+        self._layout()
+
+    def _measure(self, text: str, tag: str) -> int:
+        key = (text, tag)
+        width = self._widths.get(key)
+        if width is None:
+            if len(self._widths) > 20_000:
+                self._widths.clear()
+            width = self._widths[key] = self.fonts.get(tag, self.fonts[""]).measure(text)
+        return width
+
+    def _layout(self):
+        width, lines = self._width - 8, []
+        for row in self.rows:
+            text, tag = row[0], row[1]
+            if width <= 0 or not text or self._measure(text, tag) <= width:
+                lines.append(row)
+                continue
+            line = ""
+            for word in text.split(" "):
+                candidate = f"{line} {word}" if line else word
+                if line and self._measure(candidate, tag) > width:
+                    lines.append((line,) + row[1:])
+                    line = word
+                else:
+                    line = candidate
+            lines.append((line,) + row[1:])
+        self.lines = lines
+        self.canvas.configure(scrollregion=(0, 0, 1, len(lines) * self.row_h))
+        self._redraw()
+
+    def _resized(self, event):
+        if event.width != self._width:
+            self._width = event.width
+            self._layout()
+        else:
+            self._redraw()
+
+    def _yview(self, *args):
+        self.canvas.yview(*args)
+        self._redraw()
+
+    def _wheel(self, event):
+        step = -1 if getattr(event, "num", None) == 4 or getattr(event, "delta", 0) > 0 else 1
+        self.canvas.yview_scroll(step * 3, "units")
+        self._redraw()
+
+    def _redraw(self):
+        top     = max(int(self.canvas.canvasy(0)) // self.row_h, 0)
+        visible = self.canvas.winfo_height() // self.row_h + 2
+        while len(self._pool) < visible:
+            self._pool.append(self.canvas.create_text(4, 0, anchor="nw", fill=self.fg, text=""))
+        for i, item in enumerate(self._pool):
+            idx = top + i
+            if i < visible and idx < len(self.lines):
+                text, tag = self.lines[idx][0], self.lines[idx][1]
+                self.canvas.coords(item, 4, idx * self.row_h)
+                self.canvas.itemconfigure(item, text=text, font=self.fonts.get(tag, self.fonts[""]))
+            else:
+                self.canvas.itemconfigure(item, text="")
+
+    def _clicked(self, event):
+        idx = int(self.canvas.canvasy(event.y)) // self.row_h
+        if 0 <= idx < len(self.lines) and len(self.lines[idx]) > 2 and self.on_click:
+            self.on_click(self.lines[idx][2])
 
 
 # ===========================================================================
 # TrackerUI
 # ===========================================================================
 class TrackerUI:
-    def __init__(self, root: tk.Tk, dm: DataManager):
-        self.root = root
-        self.dm   = dm
-        settings  = dm.settings
-        self._last_ws_status = "—"
+    def __init__(self, root: tk.Tk, prices: PriceService, accounts: List[Account],
+                 combined: Optional[CombinedDataManager] = None, ingest: Optional[IngestControl] = None,
+                 sink_stats=None, on_alerts_changed=None, diagnostics: Optional["MemoryDiagnostics"] = None,
+                 viewer: bool = False):
+        self.root     = root
+        self.prices   = prices
+        self.accounts = accounts
+        self.combined = combined
+        self.ingest   = ingest
+        self.viewer   = viewer
+        self.sink_stats = sink_stats or (lambda: [])
+        self.on_alerts_changed = on_alerts_changed
+        self.diagnostics = diagnostics
+        self._toasts: list = []
+        self.combined_rates = CombinedRates([a.rates for a in accounts])
+        self.view_var = tk.StringVar(value="all" if combined else accounts[0].label)
+        self.dm, self.rates = self._view_source()
+        settings  = self.dm.settings
 
         self.currency_var = tk.StringVar(value=settings.get("currency", "usd"))
         self.dark_mode    = settings.get("dark_mode", True)
@@ -563,6 +4252,9 @@ class TrackerUI:
             "estimated_gold": tk.BooleanVar(value=settings["show_totals"].get("estimated_gold", True)),
             "enj":            tk.BooleanVar(value=settings["show_totals"].get("enj",            True)),
         }
+        self.show_rates = {
+            k: tk.BooleanVar(value=settings["show_rates"].get(k, False)) for k in RATE_FIELDS
+        }
         self.show_sections = {
             "adventures":    tk.BooleanVar(value=settings["show_sections"].get("adventures",    True)),
             "experience":    tk.BooleanVar(value=settings["show_sections"].get("experience",    True)),
@@ -573,6 +4265,9 @@ class TrackerUI:
             "container_non_blockchain":tk.BooleanVar(value=settings["show_sections"].get("container_non_blockchain",False)),
         }
 
+        self._tallies = {section: SortedTally(settings.get("item_sort", {}).get(section, modes[0]))
+                         for section, modes in ITEM_SORT_MODES.items()}
+
         self._build_ui(settings)
         self._build_menu()
         self.apply_theme()
@@ -582,14 +4277,11 @@ class TrackerUI:
     # ------------------------------------------------------------------
     # UI construction
     # ------------------------------------------------------------------
-    def _make_textbox(self, parent) -> ctk.CTkTextbox:
-        tb = ctk.CTkTextbox(parent, font=FONT_BODY, wrap="word", border_width=0)
-        tb.configure(state="disabled")
-        tb._textbox.tag_configure("bold", font=FONT_SECTION)
-        return tb
+    def _make_textbox(self, parent) -> VirtualList:
+        return VirtualList(parent, on_click=self._cycle_sort)
 
     def _build_ui(self, settings: dict):
-        self.root.title("Lost Relics Daily Tracker")
+        self.root.title("Lost Relics Daily Tracker" + (" (viewer)" if self.viewer else ""))
         try:
             self.root.iconbitmap("lrtracker.ico")
         except Exception:
@@ -635,7 +4327,6 @@ class TrackerUI:
         self.text_frame.pack(fill="both", expand=True, padx=5, pady=5)
 
         self.text_output = self._make_textbox(self.text_frame)
-        self.text_output.configure(width=42, height=28)
         self.text_output.pack(fill="both", expand=True)
         self._col_textboxes   = [self.text_output]
         self._content_frames  = [self.text_frame]
@@ -692,6 +4383,20 @@ class TrackerUI:
 
         file_menu = tk.Menu(menubar, tearoff=0)
         file_menu.add_command(label="Summarize Runs", command=self._summarize_runs_popup)
+        file_menu.add_command(label="Top Drops",      command=self._top_drops_popup)
+        file_menu.add_command(label="Drop Rates",     command=self._drop_rates_popup)
+        file_menu.add_command(label="Container Value", command=self._container_ev_popup)
+        file_menu.add_command(label="Sessions",       command=self._sessions_popup)
+        file_menu.add_command(label="Export Columnar Data…", command=self._export_columnar)
+        file_menu.add_command(label="Rebuild History…",      command=self._rebuild_history)
+        file_menu.add_command(label="Accounts…",             command=self._accounts_popup)
+        file_menu.add_command(label="Sinks…",                command=self._sinks_popup)
+        if self.diagnostics:
+            file_menu.add_command(label="Memory Diagnostics…", command=self._memory_popup)
+        if self.ingest:
+            file_menu.add_separator()
+            file_menu.add_command(label="Start Tracking Process", command=self.ingest.start)
+            file_menu.add_command(label="Stop Tracking Process",  command=self._stop_ingest)
         #file_menu.add_separator()
         #file_menu.add_command(label="Exit", command=self.root.quit)
         menubar.add_cascade(label="File", menu=file_menu)
@@ -705,6 +4410,14 @@ class TrackerUI:
         totals_menu.add_checkbutton(label="Total ENJ Value",      variable=self.show_totals["enj"],            command=self.refresh_ui)
         view_menu.add_cascade(label="Totals", menu=totals_menu)
 
+        rates_menu = tk.Menu(view_menu, tearoff=0)
+        rates_menu.add_checkbutton(label="Runs / Hour",           variable=self.show_rates["runs"],           command=self.refresh_ui)
+        rates_menu.add_checkbutton(label="Gold Coins / Hour",     variable=self.show_rates["gold"],           command=self.refresh_ui)
+        rates_menu.add_checkbutton(label="Estimated Gold / Hour", variable=self.show_rates["estimated_gold"], command=self.refresh_ui)
+        rates_menu.add_checkbutton(label="ENJ Value / Hour",      variable=self.show_rates["enj"],            command=self.refresh_ui)
+        rates_menu.add_checkbutton(label="Character XP / Hour",   variable=self.show_rates["xp"],             command=self.refresh_ui)
+        view_menu.add_cascade(label="Rates", menu=rates_menu)
+
         sections_menu = tk.Menu(view_menu, tearoff=0)
         sections_menu.add_checkbutton(label="Adventures",          variable=self.show_sections["adventures"],    command=self.refresh_ui)
         sections_menu.add_checkbutton(label="Experience",          variable=self.show_sections["experience"],    command=self.refresh_ui)
@@ -722,6 +4435,15 @@ class TrackerUI:
                 command=lambda c=cur: self._update_currency(c),
             )
         view_menu.add_cascade(label="Currency", menu=currency_menu)
+
+        if self.combined:
+            account_menu = tk.Menu(view_menu, tearoff=0)
+            account_menu.add_radiobutton(label="All Accounts", value="all", variable=self.view_var,
+                                         command=self._select_view)
+            for acct in self.accounts:
+                account_menu.add_radiobutton(label=acct.label, value=acct.label, variable=self.view_var,
+                                             command=self._select_view)
+            view_menu.add_cascade(label="Account", menu=account_menu)
         menubar.add_cascade(label="View", menu=view_menu)
 
         settings_menu = tk.Menu(menubar, tearoff=0)
@@ -729,6 +4451,9 @@ class TrackerUI:
         settings_menu.add_command(label="Toggle Overlay",    command=self.toggle_overlay)
         settings_menu.add_command(label="Toggle Layout",     command=self.toggle_layout)
         settings_menu.add_command(label="Set GMT Offset",    command=self._set_gmt_popup)
+        settings_menu.add_command(label="Set Log Disk Budget", command=self._set_disk_budget_popup)
+        settings_menu.add_command(label="Set Session Idle Gap", command=self._set_session_idle_popup)
+        settings_menu.add_command(label="Alerts…",           command=self._alerts_popup)
 
         menubar.add_cascade(label="Settings", menu=settings_menu)
 
@@ -761,11 +4486,12 @@ class TrackerUI:
         self.dm.save_settings(self.dm.settings)
         for w in self.root.winfo_children():
             w.destroy()
+        self._last_snap = None
         self._build_ui(self.dm.settings)
         self._build_menu()
         self.apply_theme()
         self._update_enjin_price()
-        self.label_ws_status.configure(text=f"WS: {self._last_ws_status}")
+        self.refresh_ws_status()
 
     def _set_gmt_popup(self):
         current = self.dm.settings.get("gmt_offset", 0)
@@ -789,13 +4515,93 @@ class TrackerUI:
         self.dm.save_settings(self.dm.settings)
         messagebox.showinfo("GMT Offset Updated", f"Timezone set to GMT{offset:+d}.\nTakes effect immediately.")
 
+    def _set_disk_budget_popup(self):
+        cfg = self.dm.settings.setdefault("archive", {})
+        usage = self.dm.disk_usage() / 1048576
+        budget = simpledialog.askinteger(
+            "Set Log Disk Budget",
+            f"run_logs currently uses {usage:.1f} MB.\n\n"
+            f"Days older than {cfg.get('after_days', 30)} are packed into compressed monthly archives.\n"
+            "Enter a size budget in MB (0 = no budget); when run_logs grows past it,\n"
+            "every day except today is archived.",
+            initialvalue=cfg.get("disk_budget_mb", 0), minvalue=0,
+        )
+        if budget is None:
+            return
+        cfg["disk_budget_mb"] = budget
+        self.dm.save_settings(self.dm.settings)
+        threading.Thread(target=self.dm.compact_logs, daemon=True, name="compact-thread").start()
+
+    def _set_session_idle_popup(self):
+        cfg = self.dm.settings.setdefault("sessions", {})
+        minutes = simpledialog.askinteger(
+            "Set Session Idle Gap",
+            "A new session starts when no run or container finishes for this many minutes.\n"
+            "Already closed sessions keep their boundaries.",
+            initialvalue=cfg.get("idle_minutes", 20), minvalue=1,
+        )
+        if minutes is None:
+            return
+        cfg["idle_minutes"] = minutes
+        self.dm.sessions.set_idle(minutes * 60)
+        self.dm.save_settings(self.dm.settings)
+
+    def _alerts_popup(self):
+        win = ctk.CTkToplevel(self.root)
+        win.title("Alerts")
+        win.geometry("520x380")
+        win.resizable(True, True)
+        ctk.CTkLabel(win, text="Alerts", font=FONT_POPUP_TITLE).pack(pady=(10, 0))
+        ctk.CTkLabel(win, font=FONT_POPUP_BODY, justify="left", text=(
+            "One rule per line: <metric> [scope] <op> <value>\n"
+            "e.g.  item:Waygate Orb >= 50    enj today > 25    runs 1h < 20    idle >= 10\n"
+            "Scopes: today, session, 15m, 1h (per-hour rates). idle is in minutes."),
+        ).pack(pady=(0, 6), padx=10)
+        box = ctk.CTkTextbox(win, font=FONT_BODY, wrap="none")
+        box.pack(fill="both", expand=True, padx=10)
+        box.insert("1.0", "\n".join(self.dm.settings.get("alerts", [])))
+
+        def save():
+            rules = [line.strip() for line in box.get("1.0", tk.END).splitlines() if line.strip()]
+            try:
+                for rule in rules:
+                    parse_alert_rule(rule)
+            except ValueError as e:
+                messagebox.showerror("Invalid Rule", str(e), parent=win)
+                return
+            self.dm.settings["alerts"] = rules
+            self.dm.save_settings(self.dm.settings)
+            if self.on_alerts_changed:
+                self.on_alerts_changed()
+            win.destroy()
+
+        ctk.CTkButton(win, text="Save", command=save).pack(pady=10)
+
+    def show_alert(self, alert: dict):
+        # Borderless toast stacked up from the bottom-right corner; gone after 8 seconds.
+        toast = ctk.CTkToplevel(self.root)
+        toast.overrideredirect(True)
+        toast.attributes("-topmost", True)
+        ctk.CTkLabel(toast, text=format_alert(alert, with_account=len(self.accounts) > 1),
+                     font=FONT_POPUP_BODY, wraplength=360, justify="left").pack(padx=14, pady=10)
+        toast.update_idletasks()
+        self._toasts = [t for t in self._toasts if t.winfo_exists()]
+        offset = sum(t.winfo_height() + 8 for t in self._toasts)
+        x = toast.winfo_screenwidth()  - toast.winfo_reqwidth()  - 20
+        y = toast.winfo_screenheight() - toast.winfo_reqheight() - 60 - offset
+        toast.geometry(f"+{x}+{y}")
+        self._toasts.append(toast)
+        toast.bind("<Button-1>", lambda e: toast.destroy())
+        toast.after(8_000, toast.destroy)
+        self.root.bell()
+
     def apply_theme(self):
         ctk.set_appearance_mode("dark" if self.dark_mode else "light")
 
         if self.dark_mode:
-            fg, muted, select_bg = "#d4d4d4", "#888888", "#444444"
+            fg, muted = "#d4d4d4", "#888888"
         else:
-            fg, muted, select_bg = "#000000", "gray", "#cce6ff"
+            fg, muted = "#000000", "gray"
 
         overlay     = self.dm.settings.get("overlay_mode", False)
         win_bg      = TRANSPARENT_KEY if overlay else "transparent"
@@ -822,72 +4628,268 @@ class TrackerUI:
         for frame in self._content_frames:
             frame.configure(fg_color=TRANSPARENT_KEY if overlay else "transparent")
         for tb in self._col_textboxes:
-            tb.configure(
-                fg_color=TRANSPARENT_KEY if overlay else ("gray17" if self.dark_mode else "gray95"),
-                text_color=fg,
-            )
-            tb._textbox.tag_configure("bold", font=FONT_SECTION)
+            tb.set_colors(TRANSPARENT_KEY if overlay else ("gray17" if self.dark_mode else "gray95"), fg)
 
     # ------------------------------------------------------------------
     # WebSocket status 
     # ------------------------------------------------------------------
-    def set_ws_status(self, text: str):
-        self._last_ws_status = text
+    def refresh_ws_status(self):
+        view = self.view_var.get()
+        if view == "all":
+            up   = sum(1 for a in self.accounts if a.status == "Connected")
+            text = f"{up}/{len(self.accounts)} connected"
+        else:
+            text = next(a.status for a in self.accounts if a.label == view)
         self.label_ws_status.configure(text=f"WS: {text}")
 
     # ------------------------------------------------------------------
-    # Enjin price
+    # Accounts
     # ------------------------------------------------------------------
-    def _update_enjin_price(self):
-        def fetch():
+    def _view_source(self) -> tuple:
+        view = self.view_var.get()
+        if view == "all" and self.combined:
+            return self.combined, self.combined_rates
+        acct = next(a for a in self.accounts if a.label == view)
+        return acct.dm, acct.rates
+
+    def _select_view(self):
+        self.dm, self.rates = self._view_source()
+        self._last_snap = None
+        self.refresh_ui()
+        self.refresh_ws_status()
+
+    def _stop_ingest(self):
+        if messagebox.askyesno(
+            "Stop Tracking Process",
+            "Stop the background tracking process?\n\nRuns finished while it is stopped are not counted.",
+        ):
+            self.ingest.stop()
+
+    def _accounts_popup(self):
+        win = ctk.CTkToplevel(self.root)
+        win.title("Accounts")
+        win.geometry("1180x300")
+        win.resizable(True, True)
+        ctk.CTkLabel(win, text="Accounts", font=FONT_POPUP_TITLE).pack(pady=(10, 0))
+        ctk.CTkLabel(win, text="Connection and storage use per tracked game client",
+                     font=FONT_POPUP_BODY).pack(pady=(0, 6))
+        tree = self._make_table(win, [
+            ("label",       "Account",    110, "w"),
+            ("player",      "Player",     130, "w"),
+            ("status",      "Status",     170, "w"),
+            ("connects",    "Connects",    70, "e"),
+            ("messages",    "Messages",    80, "e"),
+            ("bytes",       "Received",    80, "e"),
+            ("cpu_seconds", "WS CPU",      70, "e"),
+            ("stalls",      "Stalls",      60, "e"),
+            ("detect",      "Detect / Recover", 130, "e"),
+            ("runs_today",  "Runs Today",  80, "e"),
+            ("disk_bytes",  "Logs",        80, "e"),
+        ], lambda key: None)
+
+        def render():
+            if not win.winfo_exists():
+                return
+            rows = account_usage(self.accounts)
+            tree.delete(*tree.get_children())
+            for r in rows:
+                tree.insert("", tk.END, values=(
+                    r["label"], r["player"], r["status"] if r["alive"] else "stopped",
+                    f"{r.get('connects', 0):,}", f"{r.get('messages', 0):,}",
+                    f"{r.get('bytes', 0) / 1048576:,.1f} MB", f"{r.get('cpu_seconds', 0.0):,.1f} s",
+                    f"{r['stalls']:,}" if "stalls" in r else "—",
+                    " / ".join("—" if r.get(k) is None else f"{r[k]:.1f} s" for k in ("time_to_detect", "time_to_recover")),
+                    f"{r['runs_today']:,}", f"{r['disk_bytes'] / 1048576:,.1f} MB",
+                ))
+            win.after(2_000, render)
+
+        render()
+
+    def _sinks_popup(self):
+        win = ctk.CTkToplevel(self.root)
+        win.title("Sinks")
+        win.geometry("1000x260")
+        win.resizable(True, True)
+        ctk.CTkLabel(win, text="Sinks", font=FONT_POPUP_TITLE).pack(pady=(10, 0))
+        ctk.CTkLabel(win, text="Event delivery per configured sink (\"sinks\" in settings.conf)",
+                     font=FONT_POPUP_BODY).pack(pady=(0, 6))
+        tree = self._make_table(win, [
+            ("name",       "Sink",        120, "w"),
+            ("queued",     "Queued",       70, "e"),
+            ("oldest_age", "Oldest",       70, "e"),
+            ("delivered",  "Delivered",    80, "e"),
+            ("dropped",    "Dropped",      70, "e"),
+            ("failures",   "Failures",     70, "e"),
+            ("lag",        "Lag / Max",   110, "e"),
+            ("last_error", "Last Error",  300, "w"),
+        ], lambda key: None)
+
+        def render():
+            if not win.winfo_exists():
+                return
+            tree.delete(*tree.get_children())
+            for r in self.sink_stats():
+                tree.insert("", tk.END, values=(
+                    r["name"], f"{r['queued']:,}", f"{r['oldest_age']:.1f} s",
+                    f"{r['delivered']:,}", f"{r['dropped']:,}", f"{r['failures']:,}",
+                    f"{'—' if r['last_lag'] is None else format(r['last_lag'], '.1f')} / {r['max_lag']:.1f} s",
+                    r["last_error"],
+                ))
+            win.after(2_000, render)
+
+        render()
+
+    def memory_counts(self) -> Dict[str, int]:
+        # Called from the diagnostics thread: plain attributes only, no Tk calls.
+        lists = [getattr(self, n, None) for n in ("text_output", "col_totals", "col_adventures", "col_loot",
+                                                  "col_containers")]
+        lists = [l for l in lists if l is not None]
+        return {
+            "list_rows":      sum(len(l.rows) for l in lists),
+            "list_pool":      sum(len(l._pool) for l in lists),
+            "list_widths":    sum(len(l._widths) for l in lists),
+            "tally_entries":  sum(len(t.counts) for t in self._tallies.values()),
+            "root_children":  len(self.root.children),
+            "toasts":         len(self._toasts),
+        }
+
+    def _memory_popup(self):
+        diag = self.diagnostics
+        win  = ctk.CTkToplevel(self.root)
+        win.title("Memory Diagnostics")
+        win.geometry("900x620")
+        win.resizable(True, True)
+        ctk.CTkLabel(win, text="Memory Diagnostics", font=FONT_POPUP_TITLE).pack(pady=(10, 0))
+        status = ctk.CTkLabel(win, text="", font=FONT_POPUP_BODY)
+        status.pack(pady=(0, 6))
+        bar = ctk.CTkFrame(win, fg_color="transparent")
+        bar.pack(pady=(0, 8))
+        box = ctk.CTkTextbox(win, font=("Consolas", 12), wrap="none")
+        box.pack(fill="both", expand=True, padx=10, pady=(0, 10))
+
+        def render():
+            if not win.winfo_exists():
+                return
+            minutes = diag.interval / 60
+            status.configure(text=(f"Sampling every {minutes:g} min to {LOG_DIR}/{MEMORY_DIAG_FILE}" if diag.running
+                                   else "Stopped. Start to trace allocations; Sample Now only counts objects."))
+            toggle.configure(text="Stop" if diag.running else "Start")
+            box.configure(state="normal")
+            box.delete("1.0", tk.END)
+            box.insert("1.0", format_memory_report(diag.latest) if diag.latest else "No samples yet.")
+            box.configure(state="disabled")
+
+        def toggle_running():
+            if diag.running:
+                diag.stop()
+            else:
+                diag.start()
+            self.dm.settings.setdefault("memory_diagnostics", {})["enabled"] = diag.running
+            self.dm.save_settings(self.dm.settings)
+            win.after(500, render)
+
+        def sample_now():
+            threading.Thread(target=lambda: (diag.sample(), self.root.after(0, render)),
+                             daemon=True, name="memory-sample").start()
+
+        def save_report():
+            if not diag.latest:
+                return
+            path = os.path.join(LOG_DIR, MEMORY_REPORT_FILE)
             try:
-                vs  = self.currency_var.get()
-                r   = requests.get(
-                    COINGECKO_URL,
-                    params={"ids": "enjincoin", "vs_currencies": vs, "include_24hr_change": "true"},
-                    timeout=5,
-                )
-                d      = r.json().get("enjincoin", {})
-                price  = d.get(vs)
-                change = d.get(f"{vs}_24h_change", 0.0)
-                cur    = vs.upper()
-                if price is None:
-                    text, color = f"Enjin Price: N/A ({cur})", "gray"
-                else:
-                    arrow = "▲" if change >= 0 else "▼"
-                    color = "limegreen" if change >= 0 else "tomato"
-                    text  = f"Enjin Price: {price:,.3f} {cur} {arrow} {abs(change):.1f}% (24h)"
-            except requests.exceptions.HTTPError as e:
-                if hasattr(e, "response") and e.response and e.response.status_code == 429:
-                    text, color = "Enjin Price: Rate limited", "gray"
-                else:
-                    text, color = "Enjin Price: Error", "gray"
-            except Exception:
-                text, color = "Enjin Price: Error", "gray"
+                with open(path, "w", encoding="utf-8") as f:
+                    f.write(format_memory_report(diag.latest) + "\n")
+            except OSError as e:
+                messagebox.showerror("Memory Diagnostics", f"Could not save report: {e}", parent=win)
+                return
+            messagebox.showinfo("Memory Diagnostics", f"Report saved to {path}", parent=win)
 
-            self.root.after(0, lambda t=text, c=color: self.enjin_label.configure(text=t, text_color=c))
+        toggle = ctk.CTkButton(bar, text="Start", width=90, command=toggle_running)
+        toggle.pack(side="left", padx=4)
+        ctk.CTkButton(bar, text="Sample Now",  width=110, command=sample_now).pack(side="left", padx=4)
+        ctk.CTkButton(bar, text="Save Report", width=110, command=save_report).pack(side="left", padx=4)
 
-        threading.Thread(target=fetch, daemon=True).start()
-        self.root.after(600_000, self._update_enjin_price)   
+        def poll():
+            if win.winfo_exists():
+                render()
+                win.after(5_000, poll)
+
+        poll()
+
+    # ------------------------------------------------------------------
+    # Enjin price
+    # ------------------------------------------------------------------
+    def _update_enjin_price(self):
+        price, change, stale, status = self.prices.quote(self.currency_var.get())
+        cur = self.currency_var.get().upper()
+        if price is None:
+            if status == "loading":
+                text, color = "Enjin Price: Loading…", "gray"
+            elif status == "rate_limited":
+                text, color = "Enjin Price: Rate limited", "gray"
+            elif status == "error":
+                text, color = "Enjin Price: Error", "gray"
+            else:
+                text, color = f"Enjin Price: N/A ({cur})", "gray"
+        else:
+            arrow = "▲" if change >= 0 else "▼"
+            color = "limegreen" if change >= 0 else "tomato"
+            text  = f"Enjin Price: {price:,.3f} {cur} {arrow} {abs(change):.1f}% (24h)"
+            if stale:
+                text += " (cached)"
+        self.enjin_label.configure(text=text, text_color=color)
 
     def _update_currency(self, new_currency: str):
         self.currency_var.set(new_currency)
         self.dm.settings["currency"] = new_currency
         self.dm.save_settings(self.dm.settings)
+        self.prices.add_currency(new_currency)
         self._update_enjin_price()
 
     # ------------------------------------------------------------------
     # Main display refresh
     # ------------------------------------------------------------------
-    def _write_col(self, tb: ctk.CTkTextbox, lines: list):
-        tb.configure(state="normal")
-        tb.delete("1.0", tk.END)
-        for text, tag in lines:
-            if tag:
-                tb._textbox.insert(tk.END, text + "\n", tag)
-            else:
-                tb.insert(tk.END, text + "\n")
-        tb.configure(state="disabled")
+    def _write_col(self, tb: VirtualList, lines: list):
+        tb.set_rows(lines)
+
+    def _cycle_sort(self, section: str):
+        modes = ITEM_SORT_MODES[section]
+        tally = self._tallies[section]
+        tally.set_mode(modes[(modes.index(tally.mode) + 1) % len(modes)])
+        self.dm.settings.setdefault("item_sort", {})[section] = tally.mode
+        self.dm.save_settings(self.dm.settings)
+        self._last_snap = None
+        self.refresh_ui()
+
+    def _section_lines(self, section: str, title: str, counts: dict, fmt=None, empty: str = "(none)") -> list:
+        # Header (click to change the order) followed by the section's rows in sorted order.
+        tally = self._tallies[section]
+        tally.update(counts, self.dm.market_values.items() if tally.mode == "value" else None)
+        lines = [(f"{title}  · by {tally.mode}", "bold", section)]
+        lines += [(fmt(n, a) if fmt else f"{n} x{a:,}", "") for n, a in tally.items()] or [(empty, "")]
+        return lines
+
+    def _adventure_line(self, snap: dict):
+        def fmt(n, c):
+            t = snap["adventure_time_totals"].get(n, 0)
+            h, rem = divmod(t, 3600); m, s = divmod(rem, 60)
+            time_str = f"{h}h {m}m {s}s" if h else f"{m}m {s}s"
+            return f"{n} x{c:,}  ·  {time_str}"
+        return fmt
+
+    def _rate_lines(self) -> List[str]:
+        labels = {"runs": ("Runs/h", ",.1f"), "gold": ("Gold/h", ",.0f"), "estimated_gold": ("Est. Gold/h", ",.0f"),
+                  "enj": ("ENJ/h", ",.2f"), "xp": ("XP/h", ",.0f")}
+        shown = [k for k in RATE_FIELDS if self.show_rates[k].get()]
+        if not shown:
+            return []
+        rates = self.rates.rates()
+        lines = []
+        for k in shown:
+            label, fmt = labels[k]
+            r = rates[k]
+            lines.append(f"{label}: {r['15m']:{fmt}} (15m) · {r['1h']:{fmt}} (1h) · {r['session']:{fmt}} (session)")
+        return lines
 
     def _refresh_horizontal(self, snap: dict):
         # Column 1 — All totals + Adventures 
@@ -900,17 +4902,12 @@ class TrackerUI:
             lines.append((f"Total Estimated Gold: {snap['total_estimated_gold']:,.0f}", "bold"))
         if self.show_totals["enj"].get():
             lines.append((f"Total ENJ Value: {snap['total_enj_value']:,.2f}", "bold"))
+        for text in self._rate_lines():
+            lines.append((text, ""))
         if self.show_sections["adventures"].get():
             lines.append(("", ""))
-            lines.append(("Adventures:", "bold"))
-            if snap["adventure_counts"]:
-                for n, c in sorted(snap["adventure_counts"].items(), key=lambda x: -x[1]):
-                    t = snap["adventure_time_totals"].get(n, 0)
-                    h, rem = divmod(t, 3600); m, s = divmod(rem, 60)
-                    time_str = f"{h}h {m}m {s}s" if h else f"{m}m {s}s"
-                    lines.append((f"{n} x{c:,}  ·  {time_str}", ""))
-            else:
-                lines.append(("(no adventures yet)", ""))
+            lines += self._section_lines("adventures", "Adventures:", snap["adventure_counts"],
+                                         self._adventure_line(snap), "(no adventures yet)")
         self._write_col(self.col_totals, lines)
 
         # Column 2 — Experience
@@ -925,73 +4922,31 @@ class TrackerUI:
         # Column 3 — Blockchain + Non-Blockchain
         lines = []
         if self.show_sections["blockchain"].get():
-            lines.append(("Blockchain Items:", "bold"))
-            if snap["blockchain_totals"]:
-                for n, a in sorted(snap["blockchain_totals"].items()):
-                    lines.append((f"{n} x{a:,}", ""))
-            else:
-                lines.append(("(none)", ""))
+            lines += self._section_lines("blockchain", "Blockchain Items:", snap["blockchain_totals"])
         if self.show_sections["non_blockchain"].get():
             lines.append(("", ""))
-            lines.append(("Tracked Non-Blockchain Items:", "bold"))
-            filtered = [(n, a) for n, a in snap["non_blockchain_totals"].items()
-                        if n in snap["non_blockchain_items"]]
-            if filtered:
-                for n, a in sorted(filtered):
-                    lines.append((f"{n} x{a:,}", ""))
-            else:
-                lines.append(("(none)", ""))
+            filtered = {n: a for n, a in snap["non_blockchain_totals"].items()
+                        if n in snap["non_blockchain_items"]}
+            lines += self._section_lines("non_blockchain", "Tracked Non-Blockchain Items:", filtered)
         self._write_col(self.col_loot, lines)
 
         # Column 4 — Containers
         lines = []
         if self.show_sections["containers"].get():
-            lines.append(("Opened Containers:", "bold"))
-            if snap["container_counts"]:
-                for n, c in sorted(snap["container_counts"].items(), key=lambda x: -x[1]):
-                    lines.append((f"{n} x{c:,}", ""))
-            else:
-                lines.append(("(none)", ""))
+            lines += self._section_lines("containers", "Opened Containers:", snap["container_counts"])
         if self.show_sections["container_blockchain"].get():
             lines.append(("", ""))
-            lines.append(("Container Blockchain Items:", "bold"))
-            if snap["container_blockchain_totals"]:
-                for n, a in sorted(snap["container_blockchain_totals"].items()):
-                    lines.append((f"{n} x{a:,}", ""))
-            else:
-                lines.append(("(none)", ""))
+            lines += self._section_lines("container_blockchain", "Container Blockchain Items:",
+                                         snap["container_blockchain_totals"])
         if self.show_sections["container_non_blockchain"].get():
             lines.append(("", ""))
-            lines.append(("Container Non-Blockchain Items:", "bold"))
-            filtered_cont = [(n, a) for n, a in snap["container_non_blockchain_totals"].items()
-                             if n in snap["non_blockchain_items"]]
-            if filtered_cont:
-                for n, a in sorted(filtered_cont):
-                    lines.append((f"{n} x{a:,}", ""))
-            else:
-                lines.append(("(none)", ""))
+            filtered_cont = {n: a for n, a in snap["container_non_blockchain_totals"].items()
+                             if n in snap["non_blockchain_items"]}
+            lines += self._section_lines("container_non_blockchain", "Container Non-Blockchain Items:", filtered_cont)
         self._write_col(self.col_containers, lines)
 
     def refresh_ui(self):
-        with self.dm.lock:
-            snap = dict(
-                player_name        = self.dm.player_name,
-                counter            = self.dm.counter,
-                total_enj_value    = self.dm.total_enj_value,
-                gold_coins_total   = self.dm.gold_coins_total,
-                total_estimated_gold=self.dm.total_estimated_gold,
-                adventure_counts   = dict(self.dm.adventure_counts),
-                adventure_time_totals = dict(self.dm.adventure_time_totals),
-                total_character_xp = self.dm.total_character_xp,
-                skill_xp_totals    = dict(self.dm.skill_xp_totals),
-                blockchain_totals  = dict(self.dm.blockchain_totals),
-                non_blockchain_totals=dict(self.dm.non_blockchain_totals),
-                non_blockchain_items =set(self.dm.non_blockchain_items),
-                container_counts               = dict(self.dm.container_counts),
-                container_blockchain_totals    = dict(self.dm.container_blockchain_totals),
-                container_non_blockchain_totals= dict(self.dm.container_non_blockchain_totals),
-                start_time         = self.dm.start_time,
-            )
+        snap = self.dm.snapshot()
 
         now     = self.dm.now_local()
         elapsed = now - snap["start_time"]
@@ -1011,87 +4966,58 @@ class TrackerUI:
             self._refresh_horizontal(snap)
             return
 
+        rate_lines = self._rate_lines()
         snap_key = (snap['counter'], snap['total_enj_value'], snap['gold_coins_total'],
-                snap['total_estimated_gold'], snap['total_character_xp'])
+                snap['total_estimated_gold'], snap['total_character_xp'], tuple(rate_lines),
+                tuple(v.get() for v in (*self.show_totals.values(), *self.show_sections.values())))
         if snap_key == self._last_snap:
             return
         self._last_snap = snap_key
 
-        yview = self.text_output._textbox.yview()
-        self.text_output.configure(state="normal")
-        self.text_output.delete("1.0", tk.END)
-
-        def bold(t): self.text_output._textbox.insert(tk.END, t + "\n", "bold")
-
-        if self.show_totals["runs"].get():           bold(f"Total Runs: {snap['counter']:,}")
-        if self.show_totals["gold"].get():           bold(f"Total Gold Coins: {snap['gold_coins_total']:,}")
-        if self.show_totals["estimated_gold"].get(): bold(f"Total Estimated Gold: {snap['total_estimated_gold']:,.0f}")
-        if self.show_totals["enj"].get():            bold(f"Total ENJ Value: {snap['total_enj_value']:,.2f}")
-        self.text_output.insert(tk.END, "\n")
+        lines: list = []
+        if self.show_totals["runs"].get():           lines.append((f"Total Runs: {snap['counter']:,}", "bold"))
+        if self.show_totals["gold"].get():           lines.append((f"Total Gold Coins: {snap['gold_coins_total']:,}", "bold"))
+        if self.show_totals["estimated_gold"].get(): lines.append((f"Total Estimated Gold: {snap['total_estimated_gold']:,.0f}", "bold"))
+        if self.show_totals["enj"].get():            lines.append((f"Total ENJ Value: {snap['total_enj_value']:,.2f}", "bold"))
+        for text in rate_lines:
+            lines.append((text, ""))
+        lines.append(("", ""))
 
         if self.show_sections["adventures"].get():
-            bold("Adventures:")
-            if snap["adventure_counts"]:
-                for n, c in sorted(snap["adventure_counts"].items(), key=lambda x: -x[1]):
-                    t = snap["adventure_time_totals"].get(n, 0)
-                    h, rem = divmod(t, 3600); m, s = divmod(rem, 60)
-                    time_str = f"{h}h {m}m {s}s" if h else f"{m}m {s}s"
-                    self.text_output.insert(tk.END, f"{n} x{c:,}  ·  {time_str}\n")
-            else:
-                self.text_output.insert(tk.END, "(no adventures yet)\n")
+            lines += self._section_lines("adventures", "Adventures:", snap["adventure_counts"],
+                                         self._adventure_line(snap), "(no adventures yet)")
 
         if self.show_sections["experience"].get():
-            bold("\nExperience:")
-            self.text_output.insert(tk.END, f"Character XP: {snap['total_character_xp']:,}\n")
+            lines += [("", ""), ("Experience:", "bold"), (f"Character XP: {snap['total_character_xp']:,}", "")]
             for s, xp in snap["skill_xp_totals"].items():
-                self.text_output.insert(tk.END, f"{s}: {xp:,}\n")
+                lines.append((f"{s}: {xp:,}", ""))
 
         if self.show_sections["blockchain"].get():
-            bold("\nBlockchain Items:")
-            if snap["blockchain_totals"]:
-                for n, a in sorted(snap["blockchain_totals"].items()):
-                    self.text_output.insert(tk.END, f"{n} x{a:,}\n")
-            else:
-                self.text_output.insert(tk.END, "(none)\n")
+            lines.append(("", ""))
+            lines += self._section_lines("blockchain", "Blockchain Items:", snap["blockchain_totals"])
 
         if self.show_sections["non_blockchain"].get():
-            bold("\nTracked Non-Blockchain Items:")
-            filtered = [(n, a) for n, a in snap["non_blockchain_totals"].items()
-                        if n in snap["non_blockchain_items"]]
-            if filtered:
-                for n, a in sorted(filtered):
-                    self.text_output.insert(tk.END, f"{n} x{a:,}\n")
-            else:
-                self.text_output.insert(tk.END, "(none)\n")
+            lines.append(("", ""))
+            filtered = {n: a for n, a in snap["non_blockchain_totals"].items()
+                        if n in snap["non_blockchain_items"]}
+            lines += self._section_lines("non_blockchain", "Tracked Non-Blockchain Items:", filtered)
 
         if self.show_sections["containers"].get():
-            bold("\nOpened Containers:")
-            if snap["container_counts"]:
-                for n, c in sorted(snap["container_counts"].items(), key=lambda x: -x[1]):
-                    self.text_output.insert(tk.END, f"{n} x{c:,}\n")
-            else:
-                self.text_output.insert(tk.END, "(none)\n")
+            lines.append(("", ""))
+            lines += self._section_lines("containers", "Opened Containers:", snap["container_counts"])
 
         if self.show_sections["container_blockchain"].get():
-            bold("\nContainer Blockchain Items:")
-            if snap["container_blockchain_totals"]:
-                for n, a in sorted(snap["container_blockchain_totals"].items()):
-                    self.text_output.insert(tk.END, f"{n} x{a:,}\n")
-            else:
-                self.text_output.insert(tk.END, "(none)\n")
+            lines.append(("", ""))
+            lines += self._section_lines("container_blockchain", "Container Blockchain Items:",
+                                         snap["container_blockchain_totals"])
 
         if self.show_sections["container_non_blockchain"].get():
-            bold("\nContainer Non-Blockchain Items:")
-            filtered_cont = [(n, a) for n, a in snap["container_non_blockchain_totals"].items()
-                             if n in snap["non_blockchain_items"]]
-            if filtered_cont:
-                for n, a in sorted(filtered_cont):
-                    self.text_output.insert(tk.END, f"{n} x{a:,}\n")
-            else:
-                self.text_output.insert(tk.END, "(none)\n")
+            lines.append(("", ""))
+            filtered_cont = {n: a for n, a in snap["container_non_blockchain_totals"].items()
+                             if n in snap["non_blockchain_items"]}
+            lines += self._section_lines("container_non_blockchain", "Container Non-Blockchain Items:", filtered_cont)
 
-        self.text_output.configure(state="disabled")
-        self.text_output._textbox.yview_moveto(yview[0])
+        self._write_col(self.text_output, lines)
 
     # ------------------------------------------------------------------
     # Dialogs
@@ -1141,6 +5067,385 @@ class TrackerUI:
         except Exception as ex:
             ctk.CTkLabel(donate_window, text=f"QR Image error: {ex}", text_color="red").pack()
 
+    def _export_excel(self, summary: dict, start_date: str, end_date: str):
+        file_path = filedialog.asksaveasfilename(
+            defaultextension=".xlsx",
+            filetypes=[("Excel Files", "*.xlsx")],
+            title="Save Report As",
+        )
+        if not file_path:
+            return
+        include_runs = messagebox.askyesno(
+            "Download as Excel",
+            "Include a per-run sheet?\n\nIt lists every adventure and container opened in the range.",
+        )
+
+        win = ctk.CTkToplevel(self.root)
+        win.title("Exporting Report")
+        win.geometry("360x140")
+        win.resizable(False, False)
+        win.attributes("-topmost", True)
+        label = ctk.CTkLabel(win, text="Preparing…", font=FONT_POPUP_BODY)
+        label.pack(pady=(12, 6))
+        bar = ctk.CTkProgressBar(win, width=320)
+        bar.set(0)
+        bar.pack(pady=(0, 10))
+        cancel_event = threading.Event()
+
+        def cancel():
+            cancel_event.set()
+            label.configure(text="Cancelling…")
+
+        ctk.CTkButton(win, text="Cancel", command=cancel).pack()
+        win.protocol("WM_DELETE_WINDOW", cancel)
+
+        def update(done, total):
+            if win.winfo_exists() and not cancel_event.is_set():
+                bar.set(done / total if total else 1)
+                label.configure(text=f"Exporting… {done * 100 // total if total else 100}%")
+
+        def finish(ok, error):
+            if win.winfo_exists():
+                win.destroy()
+            if error:
+                messagebox.showerror("Export Failed", f"Could not save report: {error}")
+            elif ok:
+                messagebox.showinfo("Export Successful", f"Report saved to {file_path}")
+            else:
+                messagebox.showinfo("Export Cancelled", "The report was not saved.")
+
+        def worker():
+            ok, error = False, None
+            try:
+                ok = self.dm.export_to_excel(
+                    file_path, summary, start_date, end_date, include_runs,
+                    progress=lambda d, t: self.root.after(0, update, d, t),
+                    cancel_event=cancel_event,
+                )
+            except Exception as e:
+                error = e
+            self.root.after(0, finish, ok, error)
+
+        threading.Thread(target=worker, daemon=True, name="export-thread").start()
+
+    def _rebuild_history(self):
+        if not messagebox.askyesno(
+            "Rebuild History",
+            "Recompute every saved day with the current tracked/excluded item lists and GMT offset?\n\n"
+            "Days recorded before raw run data was kept cannot be recomputed and are left as they are.",
+        ):
+            return
+
+        win = ctk.CTkToplevel(self.root)
+        win.title("Rebuilding History")
+        win.geometry("360x140")
+        win.resizable(False, False)
+        win.attributes("-topmost", True)
+        label = ctk.CTkLabel(win, text="Reading logs…", font=FONT_POPUP_BODY)
+        label.pack(pady=(12, 6))
+        bar = ctk.CTkProgressBar(win, width=320)
+        bar.set(0)
+        bar.pack(pady=(0, 10))
+        cancel_event = threading.Event()
+
+        def cancel():
+            cancel_event.set()
+            label.configure(text="Cancelling…")
+
+        ctk.CTkButton(win, text="Cancel", command=cancel).pack()
+        win.protocol("WM_DELETE_WINDOW", cancel)
+
+        def update(done, total):
+            if win.winfo_exists() and not cancel_event.is_set():
+                bar.set(done / total if total else 1)
+                label.configure(text=f"Rebuilding… {done * 100 // total if total else 100}%")
+
+        def finish(result, error):
+            if win.winfo_exists():
+                win.destroy()
+            if error:
+                messagebox.showerror("Rebuild Failed", f"History was not rebuilt: {error}")
+            elif result is None:
+                messagebox.showinfo("Rebuild Cancelled", "No logs were changed.")
+            else:
+                kept = result["kept"]
+                note = (f"\n\n{len(kept)} earlier day(s) without raw run data were kept as logged "
+                        f"({kept[0]} – {kept[-1]}).") if kept else ""
+                messagebox.showinfo("Rebuild Complete", f"Rebuilt {result['rebuilt']} day(s).{note}")
+            self.refresh_ui()
+
+        def worker():
+            result, error = None, None
+            try:
+                result = self.dm.rebuild_history(
+                    progress=lambda d, t: self.root.after(0, update, d, t),
+                    cancel_event=cancel_event,
+                )
+            except Exception as e:
+                error = e
+            self.root.after(0, finish, result, error)
+
+        threading.Thread(target=worker, daemon=True, name="rebuild-thread").start()
+
+    def _export_columnar(self):
+        exporter = ColumnarExporter(self.dm)
+        try:
+            fmt = exporter.pick_format()
+        except RuntimeError as e:
+            messagebox.showerror("Export Columnar Data", str(e))
+            return
+        out_dir = filedialog.askdirectory(title="Export Columnar Data To")
+        if not out_dir:
+            return
+
+        def finish(result, error):
+            if error:
+                messagebox.showerror("Export Failed", f"Could not export data: {error}")
+            else:
+                messagebox.showinfo(
+                    "Export Successful",
+                    f"Wrote {result['days_written']:,} new day(s), {result['total_days']:,} in total "
+                    f"({fmt}) to:\n" + "\n".join(result["paths"]),
+                )
+
+        def worker():
+            result, error = None, None
+            try:
+                result = exporter.export(out_dir, fmt)
+            except Exception as e:
+                error = e
+            self.root.after(0, finish, result, error)
+
+        threading.Thread(target=worker, daemon=True, name="columnar-thread").start()
+
+    def _make_table(self, parent, columns: list, on_sort) -> ttk.Treeview:
+        # columns: (key, heading, width, anchor). Clicking a heading calls on_sort(key).
+        style = ttk.Style(parent)
+        if self.dark_mode:
+            bg, fg, head_bg, sel = "gray17", "#d4d4d4", "gray25", "#444444"
+        else:
+            bg, fg, head_bg, sel = "gray95", "#000000", "gray85", "#cce6ff"
+        style.configure("Tracker.Treeview", background=bg, fieldbackground=bg, foreground=fg,
+                        rowheight=22, font=("Roboto", 11))
+        style.configure("Tracker.Treeview.Heading", background=head_bg, foreground=fg, font=("Roboto", 11, "bold"))
+        style.map("Tracker.Treeview", background=[("selected", sel)])
+
+        frame = ctk.CTkFrame(parent, fg_color="transparent")
+        frame.pack(fill="both", expand=True, padx=10, pady=(0, 10))
+        tree = ttk.Treeview(frame, columns=[c[0] for c in columns], show="headings", style="Tracker.Treeview")
+        for key, heading, width, anchor in columns:
+            tree.heading(key, text=heading, command=lambda k=key: on_sort(k))
+            tree.column(key, width=width, anchor=anchor, stretch=anchor == "w")
+        scroll = ttk.Scrollbar(frame, orient="vertical", command=tree.yview)
+        tree.configure(yscrollcommand=scroll.set)
+        scroll.pack(side="right", fill="y")
+        tree.pack(side="left", fill="both", expand=True)
+        return tree
+
+    def _top_drops_popup(self):
+        win = ctk.CTkToplevel(self.root)
+        win.title("Top Drops")
+        win.geometry("820x560")
+        win.resizable(True, True)
+        ctk.CTkLabel(win, text="Most Valuable Drops", font=FONT_POPUP_TITLE).pack(pady=(10, 0))
+        ctk.CTkLabel(win, text="Single drops ranked by market value × amount",
+                     font=FONT_POPUP_BODY).pack(pady=(0, 6))
+
+        today = self.dm.now_local().date()
+        bar   = ctk.CTkFrame(win, fg_color="transparent")
+        bar.pack(pady=(0, 8))
+        start = ctk.CTkEntry(bar, width=110, font=FONT_POPUP_BODY)
+        start.insert(0, today.replace(day=1).isoformat())
+        end   = ctk.CTkEntry(bar, width=110, font=FONT_POPUP_BODY)
+        end.insert(0, today.isoformat())
+        kind  = ctk.CTkSegmentedButton(bar, values=["ENJ", "Est. Gold"])
+        kind.set("ENJ")
+        count = ctk.CTkEntry(bar, width=50, font=FONT_POPUP_BODY)
+        count.insert(0, "20")
+        for widget, label in ((start, "From"), (end, "To"), (kind, ""), (count, "Top")):
+            if label:
+                ctk.CTkLabel(bar, text=label, font=FONT_POPUP_BODY).pack(side="left", padx=(8, 4))
+            widget.pack(side="left", padx=(0, 4))
+
+        tree = self._make_table(win, [
+            ("rank",   "#",        40, "e"),
+            ("item",   "Item",    200, "w"),
+            ("amount", "Amount",   70, "e"),
+            ("value",  "Value",   100, "e"),
+            ("source", "From",    200, "w"),
+            ("time",   "When",    140, "w"),
+        ], lambda key: None)
+        tz = timezone(timedelta(hours=self.dm.settings.get("gmt_offset", 0)))
+
+        def show(rows, unit):
+            if not win.winfo_exists():
+                return
+            tree.delete(*tree.get_children())
+            for n, r in enumerate(rows, 1):
+                tree.insert("", tk.END, values=(
+                    n, r["item"], f"{r['amount']:,}",
+                    f"{r['value']:,.2f} {unit}" if unit == "ENJ" else f"{r['value']:,.0f} {unit}",
+                    r["source"], datetime.fromtimestamp(r["time"], tz).strftime("%Y-%m-%d %H:%M"),
+                ))
+
+        def load():
+            try:
+                dates = [datetime.strptime(e.get().strip(), "%Y-%m-%d").date().isoformat() for e in (start, end)]
+                k = int(count.get())
+            except ValueError:
+                messagebox.showerror("Top Drops", "Dates must be YYYY-MM-DD and Top a whole number.", parent=win)
+                return
+            enj = kind.get() == "ENJ"
+            threading.Thread(target=lambda: self.root.after(0, show, self.dm.top_drops_range(
+                dates[0], dates[1], "enj" if enj else "gold", k), "ENJ" if enj else "gold"),
+                daemon=True, name="top-drops-thread").start()
+
+        ctk.CTkButton(bar, text="Show", width=70, command=load).pack(side="left", padx=(8, 0))
+        load()
+
+    def _drop_rates_popup(self):
+        win = ctk.CTkToplevel(self.root)
+        win.title("Drop Rates")
+        win.geometry("820x560")
+        win.resizable(True, True)
+        ctk.CTkLabel(win, text="Drop Rates per Adventure", font=FONT_POPUP_TITLE).pack(pady=(10, 0))
+        ctk.CTkLabel(win, text="Share of runs that dropped the item, with a 95% Wilson interval",
+                     font=FONT_POPUP_BODY).pack(pady=(0, 6))
+
+        scopes = {"Today": "today", "All Time": "all"}
+        scope  = tk.StringVar(value="All Time")
+        rows: list = []
+        order  = {"key": "rate", "reverse": True}
+
+        def render():
+            key = "ci_low" if order["key"] == "ci" else order["key"]
+            tree.delete(*tree.get_children())
+            for r in sorted(rows, key=lambda r: (r[key].lower() if isinstance(r[key], str) else r[key]),
+                            reverse=order["reverse"]):
+                tree.insert("", tk.END, values=(
+                    r["adventure"], r["item"], f"{r['runs']:,}", f"{r['hits']:,}",
+                    f"{r['rate'] * 100:.1f}%", f"{r['ci_low'] * 100:.1f} – {r['ci_high'] * 100:.1f}%",
+                    f"{r['per_run']:,.2f}",
+                ))
+
+        def sort_by(key):
+            if order["key"] == key:
+                order["reverse"] = not order["reverse"]
+            else:
+                order["key"], order["reverse"] = key, key not in ("adventure", "item")
+            render()
+
+        def reload(_=None):
+            rows[:] = self.dm.drop_rate_table(scopes[scope.get()])
+            render()
+
+        ctk.CTkSegmentedButton(win, values=list(scopes), variable=scope, command=reload).pack(pady=(0, 8))
+        tree = self._make_table(win, [
+            ("adventure", "Adventure", 180, "w"),
+            ("item",      "Item",      180, "w"),
+            ("runs",      "Runs",       70, "e"),
+            ("hits",      "Drops",      70, "e"),
+            ("rate",      "Rate",       70, "e"),
+            ("ci",        "95% CI",    120, "e"),
+            ("per_run",   "Avg/Run",    80, "e"),
+        ], sort_by)
+        reload()
+
+    def _container_ev_popup(self):
+        win = ctk.CTkToplevel(self.root)
+        win.title("Container Value")
+        win.geometry("980x560")
+        win.resizable(True, True)
+        ctk.CTkLabel(win, text="Expected Value per Container", font=FONT_POPUP_TITLE).pack(pady=(10, 0))
+        ctk.CTkLabel(win, text="Average value of one opening, ± its standard error; gold includes estimated gold",
+                     font=FONT_POPUP_BODY).pack(pady=(0, 6))
+
+        scopes = {"Today": "today", "All Time": "all"}
+        scope  = tk.StringVar(value="All Time")
+        rows: list = []
+        order  = {"key": "ev_enj", "reverse": True}
+
+        def render():
+            tree.delete(*tree.get_children())
+            for r in sorted(rows, key=lambda r: (r[order["key"]].lower() if isinstance(r[order["key"]], str)
+                                                 else r[order["key"]]), reverse=order["reverse"]):
+                top = ", ".join(f"{i['item']} {i['per_open']:,.2f}" for i in r["items"][:4])
+                tree.insert("", tk.END, values=(
+                    r["container"], f"{r['opened']:,}",
+                    f"{r['ev_enj']:,.3f} ± {r['se_enj']:,.3f}", f"{r['sd_enj']:,.3f}",
+                    f"{r['ev_gold']:,.0f} ± {r['se_gold']:,.0f}", f"{r['sd_gold']:,.0f}", top,
+                ))
+
+        def sort_by(key):
+            if key == "items":
+                return
+            if order["key"] == key:
+                order["reverse"] = not order["reverse"]
+            else:
+                order["key"], order["reverse"] = key, key != "container"
+            render()
+
+        def reload(_=None):
+            rows[:] = self.dm.container_ev_table(scopes[scope.get()])
+            render()
+
+        ctk.CTkSegmentedButton(win, values=list(scopes), variable=scope, command=reload).pack(pady=(0, 8))
+        tree = self._make_table(win, [
+            ("container", "Container",    170, "w"),
+            ("opened",    "Opened",        70, "e"),
+            ("ev_enj",    "ENJ / Open",   120, "e"),
+            ("sd_enj",    "ENJ SD",        70, "e"),
+            ("ev_gold",   "Gold / Open",  120, "e"),
+            ("sd_gold",   "Gold SD",       70, "e"),
+            ("items",     "Avg Items / Open", 340, "w"),
+        ], sort_by)
+        reload()
+
+    def _sessions_popup(self):
+        win = ctk.CTkToplevel(self.root)
+        win.title("Sessions")
+        win.geometry("980x520")
+        win.resizable(True, True)
+        ctk.CTkLabel(win, text="Play Sessions", font=FONT_POPUP_TITLE).pack(pady=(10, 0))
+        idle = self.dm.settings.get("sessions", {}).get("idle_minutes", 20)
+        ctk.CTkLabel(win, text=f"Split on gaps longer than {idle} min (Settings → Set Session Idle Gap)",
+                     font=FONT_POPUP_BODY).pack(pady=(0, 6))
+
+        rows  = self.dm.sessions.sessions()
+        order = {"key": "start", "reverse": True}
+        tz    = timezone(timedelta(hours=self.dm.settings.get("gmt_offset", 0)))
+
+        def render():
+            tree.delete(*tree.get_children())
+            for r in sorted(rows, key=lambda r: r[order["key"]], reverse=order["reverse"]):
+                h, rem = divmod(int(r["duration"]), 3600); m = rem // 60
+                top = ", ".join(f"{n} ×{a:,}" for n, a in list(r["items"].items())[:3])
+                tree.insert("", tk.END, values=(
+                    (f"{r['account']} · " if "account" in r else "")
+                    + datetime.fromtimestamp(r["start"], tz).strftime("%Y-%m-%d %H:%M") + (" •" if r["open"] else ""),
+                    f"{h}h {m:02d}m", f"{r['runs']:,}", f"{r['gold']:,}", f"{r['estimated_gold']:,}",
+                    f"{r['enj']:,.2f}", f"{r['xp']:,}", top,
+                ))
+
+        def sort_by(key):
+            if order["key"] == key:
+                order["reverse"] = not order["reverse"]
+            else:
+                order["key"], order["reverse"] = key, True
+            render()
+
+        tree = self._make_table(win, [
+            ("start",          "Started",    140, "w"),
+            ("duration",       "Duration",    80, "e"),
+            ("runs",           "Runs",        60, "e"),
+            ("gold",           "Gold",        80, "e"),
+            ("estimated_gold", "Est. Gold",   90, "e"),
+            ("enj",            "ENJ",         70, "e"),
+            ("xp",             "XP",          80, "e"),
+            ("items",          "Top Items",  360, "w"),
+        ], lambda key: None if key == "items" else sort_by(key))
+        render()
+
     def _summarize_runs_popup(self):
         start_date = simpledialog.askstring("Summarize Runs", "Start Date (YYYY-MM-DD):")
         if not start_date:
@@ -1148,9 +5453,13 @@ class TrackerUI:
         end_date = simpledialog.askstring("Summarize Runs", "End Date (YYYY-MM-DD):")
         if not end_date:
             return
-
-        summary     = self.dm.summarize_logs(start_date, end_date)
-        summary_txt = self.dm.format_summary(summary, start_date, end_date)
+        try:
+            for d in (start_date, end_date):
+                datetime.strptime(d, "%Y-%m-%d")
+        except ValueError:
+            messagebox.showerror("Invalid Date", "Please enter dates as YYYY-MM-DD.")
+            return
+        currency = self.currency_var.get()
 
         win = ctk.CTkToplevel(self.root)
         win.title("Summary of Runs")
@@ -1161,134 +5470,686 @@ class TrackerUI:
         ctk.CTkLabel(win, text="Lost Relics Adventure Report", font=FONT_POPUP_TITLE).pack(pady=(10, 0))
         ctk.CTkLabel(win, text=f"From {start_date} to {end_date}", font=FONT_POPUP_BODY).pack(pady=(0, 10))
 
-        ctk.CTkButton(
-            win, text="Download as Excel",
-            command=lambda: self.dm.export_summary_to_excel(summary, start_date, end_date),
-        ).pack(pady=(0, 10))
+        status = ctk.CTkFrame(win, fg_color="transparent")
+        status.pack(pady=(0, 10))
+        bar = ctk.CTkProgressBar(status, width=300)
+        bar.set(0)
+        bar.pack(side="left", padx=(0, 8))
+        cancel_event = threading.Event()
+        ctk.CTkButton(status, text="Cancel", width=80, command=cancel_event.set).pack(side="left")
 
         ta = ctk.CTkTextbox(win, wrap="word", font=FONT_POPUP_BODY)
-        ta.pack(fill="both", expand=True, padx=10, pady=5)
-        ta.insert("1.0", summary_txt)
+        ta.insert("1.0", "Summarizing…")
         ta.configure(state="disabled")
 
+        def close():
+            cancel_event.set()
+            win.destroy()
+
+        win.protocol("WM_DELETE_WINDOW", close)
+
+        def update(done, total):
+            if win.winfo_exists():
+                bar.set(done / total if total else 1)
+
+        def show(summary, summary_txt):
+            if not win.winfo_exists():
+                return
+            status.destroy()
+            if "_cancelled" in summary:
+                summary_txt = "Summary cancelled."
+            else:
+                ctk.CTkButton(
+                    win, text="Download as Excel",
+                    command=lambda: self._export_excel(summary, start_date, end_date),
+                ).pack(pady=(0, 10), before=ta)
+            ta.configure(state="normal")
+            ta.delete("1.0", tk.END)
+            ta.insert("1.0", summary_txt)
+            ta.configure(state="disabled")
+
+        def worker():
+            summary = self.dm.summarize_logs_cached(
+                start_date, end_date, currency,
+                progress=lambda d, t: self.root.after(0, update, d, t),
+                cancel_event=cancel_event,
+            )
+            summary_txt = self.dm.format_summary(summary, start_date, end_date)
+            self.root.after(0, show, summary, summary_txt)
+
+        ta.pack(fill="both", expand=True, padx=10, pady=5)
+        threading.Thread(target=worker, daemon=True, name="summary-thread").start()
+
 
 # ===========================================================================
-# RunCounterApp  — orchestrator
+# TrackerCore  — ingestion, dedupe and persistence
 # ===========================================================================
-class RunCounterApp:
-    def __init__(self, root: tk.Tk):
-        self.root       = root
-        self.dm         = DataManager(LOG_DIR, CONFIG_FILE, EXCLUDE_FILE)
-        self.ui         = TrackerUI(root, self.dm)
-        self.stop_event = threading.Event()
-
-        self.ws_client = WebSocketClient(
-            url             = WS_URL,
-            on_adventure    = self._handle_adventure,
-            on_player       = self._handle_player,
-            on_container    = self._handle_container,
-            on_status       = self._handle_ws_status,
-            stop_event      = self.stop_event,
-            reconnect_delay = RECONNECT_DELAY,
+class TrackerCore:
+    # Everything that keeps tracking going: connections, event handling, logs, prices and the
+    # query API. Runs inside the UI process, or alone with --ingest, publishing each change
+    # to run_logs/snapshot.shm for viewers and UI processes started with --attach. Only the
+    # process holding the WriterLock builds one.
+    def __init__(self, on_status=None, publish: bool = False):
+        endpoints       = parse_ws_endpoints(WS_URL)
+        history         = PriceHistory(os.path.join(LOG_DIR, PRICE_HISTORY_DIR))
+        settings        = None
+        self.accounts: List[Account] = []
+        for label, url in endpoints:
+            # A single endpoint keeps using run_logs/ directly, as before.
+            log_dir  = LOG_DIR if len(endpoints) == 1 else os.path.join(LOG_DIR, label)
+            dm       = DataManager(log_dir, CONFIG_FILE, EXCLUDE_FILE, settings=settings, price_history=history)
+            settings = dm.settings
+            self.accounts.append(Account(label, url, dm))
+        self.dm         = self.accounts[0].dm        # owns the shared settings
+        self.combined   = CombinedDataManager(self.accounts, LOG_DIR) if len(self.accounts) > 1 else None
+        self.prices     = PriceService(
+            os.path.join(LOG_DIR, PRICE_CACHE_FILE),
+            PRICE_CURRENCIES + [self.dm.settings.get("currency", "usd")],
         )
+        self.prices.add_listener(lambda: history.record(*self.prices.latest()))
+        self.on_status  = on_status
+        self.stop_event = threading.Event()
+        self.publisher  = SnapshotPublisher(os.path.join(LOG_DIR, SNAPSHOT_FILE)) if publish else None
+        self.sinks      = SinkPipeline(self.dm.settings.get("sinks", []), on_error=self.dm.save_error_log)
+        self.alerts     = AlertEngine(self.dm.settings.get("alerts", []), on_error=self.dm.save_error_log)
+        self.api        = None
+
+    def start(self):
+        self.prices.start()
+        self.sinks.start()
+        self.alerts.prime(self.accounts)
+        for acct in self.accounts:
+            acct.ws_client = make_ws_client(
+                self.dm.settings.get("ws_client", {}),
+                url             = acct.url,
+                on_adventure    = lambda adv, a=acct: self._handle_adventure(a, adv),
+                on_player       = lambda player, a=acct: self._handle_player(a, player),
+                on_container    = lambda cont, a=acct: self._handle_container(a, cont),
+                on_status       = lambda text, a=acct: self._handle_ws_status(a, text),
+                on_error        = lambda text, a=acct: a.dm.save_error_log(text, source=f"ws-{a.label}"),
+                stop_event      = self.stop_event,
+                reconnect_delay = RECONNECT_DELAY,
+            )
+            acct.ws_thread = threading.Thread(target=acct.ws_client.run, daemon=True, name=f"ws-{acct.label}")
+            acct.ws_thread.start()
 
-        self.ws_thread = threading.Thread(target=self.ws_client.run, daemon=True, name="ws-thread")
-        self.ws_thread.start()
+        api_cfg = self.dm.settings.get("query_api", {})
+        if api_cfg.get("enabled", True):
+            try:
+                view = self.combined or self.dm
+                self.api = QueryAPIServer(view, API_HOST, int(api_cfg.get("port", API_PORT)))
+                rates = CombinedRates([a.rates for a in self.accounts]) if self.combined else self.accounts[0].rates
+                self.api.add_endpoint("/api/rates", rates.rates)
+                self.api.add_endpoint("/api/accounts", lambda: account_usage(self.accounts))
+                self.api.add_endpoint("/api/sinks", self.sinks.stats)
+                self.api.add_endpoint("/api/alerts", self.alerts.recent_alerts)
+                self.api.add_endpoint("/api/errors", lambda: sorted(
+                    (e for a in self.accounts for e in a.dm.errors.recent()), key=lambda e: e["time"])[-200:])
+                self.api.start()
+            except Exception as e:
+                self.api = None
+                self.dm.save_error_log(f"Query API failed to start: {e}")
 
-        self._schedule_ui_refresh()
-        root.protocol("WM_DELETE_WINDOW", self._on_close)
-        self._install_signal_handlers()
-        self._install_excepthook()
+        for acct in self.accounts:
+            self._start_compaction(acct.dm)
+        self.publish_snapshot()
 
     # ------------------------------------------------------------------
     # Callbacks from WebSocketClient
     # ------------------------------------------------------------------
-    def _check_daily_reset(self):
-        today = self.dm.now_local().date()
-        if today != self.dm.current_log_date:
-            self.dm.reset_daily_counters_locked(today)
-
-    def _handle_adventure(self, adv: dict):
-        with self.dm.lock:
-            self._check_daily_reset()
+    def _check_daily_reset(self, dm: DataManager) -> bool:
+        today = dm.now_local().date()
+        if today != dm.current_log_date:
+            dm.switch_day_locked(today)
+            return True
+        return False
+
+    def _start_compaction(self, dm: DataManager):
+        threading.Thread(target=dm.compact_logs, daemon=True, name="compact-thread").start()
+
+    def _on_event_accepted(self, acct: Account, record: dict):
+        acct.rates.add(record)
+        acct.dm.sessions.add(record)
+        self.sinks.publish(acct.label, record)
+        self.alerts.on_event(acct, record)
+        self._on_state_changed()
+
+    def _on_state_changed(self):
+        if self.api:
+            self.api.publish()
+        self.publish_snapshot()
+
+    def _handle_adventure(self, acct: Account, adv: dict):
+        dm = acct.dm
+        with dm.lock:
+            self._check_daily_reset(dm)
 
             instance_id = adv.get("AdventureInstance")
             if not instance_id or not adv.get("AdventureName"):
                 return
-            if instance_id in self.dm.seen_adventure_instances:
-                return     
-
-            completed_utc = adv.get("AdventureCompletedUtc")
-            if completed_utc:
-                try:
-                    adv_date = datetime.fromisoformat(
-                        completed_utc.replace("Z", "+00:00")
-                    ).astimezone(
-                        timezone(timedelta(hours=self.dm.settings.get("gmt_offset", 0)))
-                    ).date()
-                    if adv_date != self.dm.current_log_date:
-                        return
-                except Exception:
-                    pass                            
 
-            self.dm.seen_adventure_instances.add(instance_id)
-            self.dm.process_adventure_locked(adv)
+            with dm.day_context_locked(dm.event_day(adv.get("AdventureCompletedUtc"))):
+                if instance_id in dm.seen_adventure_instances:
+                    return
+                dm.seen_adventure_instances.add(instance_id)
+                record = dm.process_adventure_locked(adv)
+                log_date, data, seq = dm.capture_day_locked()
+                dm.append_journal(record, log_date)
 
-        self.dm.save_log()
+        dm.write_day_log(log_date, data, seq)
+        self._on_event_accepted(acct, record)
 
-    def _handle_player(self, player: dict):
+    def _handle_player(self, acct: Account, player: dict):
         name = player.get("PlayerName")
-        if name:
-            with self.dm.lock:
-                self.dm.player_name = name
+        if name and name != acct.dm.player_name:
+            with acct.dm.lock:
+                acct.dm.player_name = name
+            self._on_state_changed()
 
-    def _handle_container(self, cont: dict):
-        with self.dm.lock:
-            self._check_daily_reset()
+    def _handle_container(self, acct: Account, cont: dict):
+        dm = acct.dm
+        with dm.lock:
+            self._check_daily_reset(dm)
 
             instance_id = cont.get("ContainerInstance")
             if not instance_id or not cont.get("Name"):
                 return
-            if instance_id in self.dm.seen_container_instances:
+
+            with dm.day_context_locked(dm.event_day(cont.get("OpenedUtc"))):
+                if instance_id in dm.seen_container_instances:
+                    return
+                dm.seen_container_instances.add(instance_id)
+                record = dm.process_container_locked(cont)
+                log_date, data, seq = dm.capture_day_locked()
+                dm.append_journal(record, log_date)
+
+        dm.write_day_log(log_date, data, seq)
+        self._on_event_accepted(acct, record)
+
+    def _handle_ws_status(self, acct: Account, text: str):
+        acct.status = text
+        if self.on_status:
+            self.on_status()
+        self.publish_snapshot()
+
+    # ------------------------------------------------------------------
+    # Periodic work, once a second
+    # ------------------------------------------------------------------
+    def tick(self):
+        self._reload_settings()
+        for acct in self.accounts:
+            with acct.dm.lock:
+                reset = self._check_daily_reset(acct.dm)
+            if reset:
+                self._on_state_changed()
+                self._start_compaction(acct.dm)
+            acct.dm.sessions.expire(time.time())
+        self.alerts.tick(self.accounts)
+        # Also a heartbeat: attached UIs treat a stale snapshot as a stopped process.
+        self.publish_snapshot()
+
+    def _reload_settings(self):
+        # A viewer window, or the UI of --attach, may have changed settings.conf.
+        if not self.dm.settings_changed():
+            return
+        self.dm.reload_settings()
+        loaded = self.dm.settings
+        for acct in self.accounts:
+            acct.dm.sessions.set_idle(loaded["sessions"].get("idle_minutes", 20) * 60)
+        self.prices.add_currency(loaded.get("currency", "usd"))        # picked in a viewer
+        self.apply_alert_rules()
+
+    def memory_counts(self) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        for acct in self.accounts:
+            prefix = f"{acct.label}." if len(self.accounts) > 1 else ""
+            counts.update({prefix + k: v for k, v in acct.dm.memory_counts().items()})
+        counts["sink_queued"]  = sum(s["queued"] for s in self.sinks.stats())
+        counts["alert_states"] = len(self.alerts.state)
+        return counts
+
+    def apply_alert_rules(self):
+        self.alerts.set_rules(self.dm.settings.get("alerts", []))
+        self.alerts.prime(self.accounts)
+
+    def publish_snapshot(self):
+        if not self.publisher:
+            return
+        payload = {
+            "pid":          os.getpid(),
+            "published_at": time.time(),
+            "accounts": [{
+                "label":       acct.label,
+                "status":      acct.status,
+                "snapshot":    acct.dm.snapshot(),
+                "drop_counts": acct.dm.drop_count_totals("today"),
+                "container_stats": acct.dm.container_stat_totals("today"),
+                "rates":       acct.rates.rates(),
+                "usage":       acct.usage(disk=False),
+            } for acct in self.accounts],
+            "sinks": self.sinks.stats(),
+            "alerts": self.alerts.recent_alerts(),
+        }
+        if not self.publisher.publish(payload):
+            self.dm.save_error_log(f"Snapshot larger than {self.publisher.capacity} bytes, not published.")
+
+    # ------------------------------------------------------------------
+    # Shutdown
+    # ------------------------------------------------------------------
+    def stop(self):
+        self.stop_event.set()
+        for acct in self.accounts:
+            if acct.ws_client:
+                acct.ws_client.close()
+        self.prices.stop()
+        if self.api:
+            self.api.stop()
+        self.sinks.stop()
+
+        for acct in self.accounts:
+            try:
+                acct.dm.save_log()
+            except Exception:
+                pass
+
+        for acct in self.accounts:
+            if acct.ws_thread and acct.ws_thread.is_alive():
+                try: acct.ws_thread.join(timeout=3)
+                except Exception: pass
+        if self.publisher:
+            self.publisher.close()
+
+
+def run_ingest() -> int:
+    # --ingest: tracking without a window. Stops on SIGINT/SIGTERM or when an attached UI
+    # drops run_logs/ingest.stop. Exits at once if another process already writes run_logs.
+    writer = WriterLock(os.path.join(LOG_DIR, WRITER_LOCK_FILE))
+    if not writer.acquire():
+        print(f"Another tracker is already writing {LOG_DIR}/; not starting a second writer.", file=sys.stderr)
+        return 1
+    core      = TrackerCore(publish=True)
+    stop_path = os.path.join(LOG_DIR, INGEST_STOP_FILE)
+    try:
+        os.remove(stop_path)
+    except OSError:
+        pass
+
+    def handler(signum, frame):
+        core.dm.save_error_log(f"Signal {signum} received, shutting down.")
+        core.stop_event.set()
+
+    for sig in (getattr(signal, "SIGINT", None), getattr(signal, "SIGTERM", None)):
+        if sig:
+            try:
+                signal.signal(sig, handler)
+            except Exception:
+                pass
+
+    diag_cfg    = core.dm.settings.get("memory_diagnostics", {})
+    diagnostics = MemoryDiagnostics(os.path.join(LOG_DIR, MEMORY_DIAG_FILE), diag_cfg.get("interval_minutes", 5) * 60)
+    diagnostics.add_source("tracker", core.memory_counts)
+    if diag_cfg.get("enabled"):
+        diagnostics.start()
+
+    core.start()
+    try:
+        while not core.stop_event.wait(1.0):
+            if os.path.exists(stop_path):
+                os.remove(stop_path)
+                break
+            core.tick()
+    except Exception as e:
+        core.dm.save_error_log(f"Uncaught exception: {type(e).__name__}: {e}")
+        raise
+    finally:
+        diagnostics.stop()
+        core.stop()
+        writer.release()
+    return 0
+
+
+# ===========================================================================
+# Memory diagnostics  — tracemalloc samples for long-running sessions
+# ===========================================================================
+def _process_rss() -> Optional[int]:
+    if psutil is not None:
+        try:
+            return psutil.Process().memory_info().rss
+        except Exception:
+            return None
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+class MemoryDiagnostics:
+    # Every `interval` seconds: process RSS, tracemalloc totals, the top allocation sites and
+    # the sites that grew most since the previous sample, live objects per type, entries per
+    # registered structure and threads grouped by name. Each sample is one line of
+    # MEMORY_DIAG_FILE; only the latest sample and snapshot stay in memory.
+    def __init__(self, path: str, interval: float = 300.0):
+        self.path     = path
+        self.interval = interval
+        self.lock     = threading.Lock()
+        self.sources: Dict[str, Any] = {}
+        self.latest: Optional[dict]  = None
+        self._snapshot = None
+        self._owns_tracing = False
+        self._stop   = threading.Event()
+        self._thread = None
+
+    def add_source(self, name: str, counts):
+        # counts() -> {structure: entries}; reported as "<name>.<structure>".
+        self.sources[name] = counts
+
+    @property
+    def running(self) -> bool:
+        return bool(self._thread and self._thread.is_alive())
+
+    def start(self):
+        if self.running:
+            return
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(1)
+            self._owns_tracing = True
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True, name="memory-diagnostics")
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+        if self._owns_tracing:
+            tracemalloc.stop()
+            self._owns_tracing = False
+        with self.lock:
+            self._snapshot = None
+
+    def _run(self):
+        while True:
+            try:
+                self.sample()
+            except Exception:
+                pass
+            if self._stop.wait(self.interval):
                 return
-            
-            opened_utc = cont.get("OpenedUtc")
-            if opened_utc:
-                try:
-                    cont_date = datetime.fromisoformat(
-                        opened_utc.replace("Z", "+00:00")
-                    ).astimezone(
-                        timezone(timedelta(hours=self.dm.settings.get("gmt_offset", 0)))
-                    ).date()
-                    if cont_date != self.dm.current_log_date:
-                        return
-                except Exception:
-                    pass
 
-            self.dm.seen_container_instances.add(instance_id)
-            self.dm.process_container_locked(cont)
+    def sample(self) -> dict:
+        gc.collect()
+        structures: Dict[str, int] = {}
+        for name, counts in list(self.sources.items()):
+            try:
+                structures.update({f"{name}.{k}": v for k, v in counts().items()})
+            except Exception as e:
+                structures[f"{name}.error"] = str(e)
+        types = defaultdict(int)
+        for obj in gc.get_objects():
+            types[type(obj).__name__] += 1
+        threads = defaultdict(int)
+        for t in threading.enumerate():
+            threads[re.sub(r"\d+", "#", t.name)] += 1
+
+        result = {
+            "time":       time.time(),
+            "rss":        _process_rss(),
+            "structures": structures,
+            "objects":    dict(heapq.nlargest(MEMORY_DIAG_TOP, types.items(), key=lambda kv: kv[1])),
+            "threads":    {"total": threading.active_count(), "by_name": dict(threads)},
+        }
+        if tracemalloc.is_tracing():
+            snapshot = tracemalloc.take_snapshot().filter_traces((
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+                tracemalloc.Filter(False, "<unknown>"),
+            ))
+            result["traced"], result["traced_peak"] = tracemalloc.get_traced_memory()
+            result["top_sites"] = [
+                {"site": str(st.traceback), "size": st.size, "count": st.count}
+                for st in snapshot.statistics("lineno")[:MEMORY_DIAG_TOP]
+            ]
+            with self.lock:
+                previous, self._snapshot = self._snapshot, snapshot
+            if previous is not None:
+                result["growth_sites"] = [
+                    {"site": str(st.traceback), "size_diff": st.size_diff, "count_diff": st.count_diff}
+                    for st in snapshot.compare_to(previous, "lineno")[:MEMORY_DIAG_TOP] if st.size_diff > 0
+                ]
+        with self.lock:
+            self.latest = result
+            try:
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(result) + "\n")
+            except OSError:
+                pass
+        return result
+
+
+def format_memory_report(sample: dict) -> str:
+    mib = lambda n: "n/a" if n is None else f"{n / 1048576:,.1f} MiB"
+    lines = [
+        f"Sampled {datetime.fromtimestamp(sample['time']).strftime('%Y-%m-%d %H:%M:%S')}",
+        f"RSS: {mib(sample.get('rss'))}",
+    ]
+    if "traced" in sample:
+        lines.append(f"Traced: {mib(sample['traced'])} (peak {mib(sample['traced_peak'])})")
+    lines.append(f"Threads: {sample['threads']['total']}")
+    lines += [f"  {name}: {n}" for name, n in sorted(sample["threads"]["by_name"].items())]
+    lines.append("\nStructures (entries):")
+    lines += [f"  {name}: {n:,}" if isinstance(n, int) else f"  {name}: {n}"
+              for name, n in sorted(sample["structures"].items())]
+    lines.append("\nLive objects by type:")
+    lines += [f"  {name}: {n:,}" for name, n in sample["objects"].items()]
+    if "top_sites" in sample:
+        lines.append("\nTop allocation sites:")
+        lines += [f"  {st['size'] / 1024:,.1f} KiB in {st['count']:,} blocks  {st['site']}" for st in sample["top_sites"]]
+    if sample.get("growth_sites"):
+        lines.append("\nGrowth since the previous sample:")
+        lines += [f"  +{st['size_diff'] / 1024:,.1f} KiB ({st['count_diff']:+,} blocks)  {st['site']}"
+                  for st in sample["growth_sites"]]
+    return "\n".join(lines)
+
+
+def run_soak_benchmark(days: int = 7, per_day: int = SOAK_EVENTS_PER_DAY) -> int:
+    # --soak-benchmark: drives a TrackerCore (no connections, API or price fetching) through
+    # `days` simulated days of runs, containers and replayed duplicates in a scratch folder,
+    # then checks that per-day structures reset at midnight, threads stay flat and traced
+    # memory stops growing once DAY_CACHE_SIZE past days are parked. Returns the exit code.
+    cwd, scratch = os.getcwd(), tempfile.mkdtemp(prefix="lrt-soak-")
+    os.chdir(scratch)
+    tracemalloc.start(1)
+    try:
+        core  = TrackerCore()
+        acct  = core.accounts[0]
+        dm    = acct.dm
+        tz    = timezone(timedelta(hours=dm.settings.get("gmt_offset", 0)))
+        # Simulated days start at the next midnight, so each one is newer than the last
+        # day the store has closed and no event takes the late-event path.
+        start = datetime.now(tz).replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
+        clock = [start.timestamp()]
+        dm.clock = lambda: clock[0]
+        rng   = random.Random(1)
+        adventures = [f"Adventure {i}" for i in range(12)]
+        containers = [f"Container {i}" for i in range(6)]
+        items  = [(f"Item {i}", i % 3 == 0) for i in range(80)]
+        prices = {name: rng.randint(5, 5000) for name, _ in items}
+        step   = 86400.0 / per_day
+        rows   = []
+        last   = None
+        for day in range(days):
+            for n in range(per_day):
+                clock[0] = start.timestamp() + day * 86400 + n * step
+                if n % 100 == 0:
+                    name = rng.choice(items)[0]
+                    prices[name] = max(1, prices[name] + rng.randint(-50, 50))
+                when  = datetime.fromtimestamp(clock[0], timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+                drops = [{"Name": name, "Amount": rng.randint(1, 5), "MarketValue": prices[name], "IsBlockchain": bc}
+                         for name, bc in rng.sample(items, 4)] + [{"Name": "Gold Coins", "Amount": rng.randint(1, 200)}]
+                if n % 8 == 7:
+                    core._handle_container(acct, {"ContainerInstance": f"c{day}-{n}", "Name": rng.choice(containers),
+                                                  "OpenedUtc": when, "Items": drops})
+                else:
+                    last = {"AdventureInstance": f"a{day}-{n}", "AdventureName": rng.choice(adventures),
+                            "AdventureCompletedUtc": when, "TimeTaken": int(step), "ExperienceAmount": 10,
+                            "Items": drops}
+                    core._handle_adventure(acct, last)
+                if n % 50 == 49 and last:     # the game re-sends recent runs after a reconnect
+                    core._handle_adventure(acct, last)
+            gc.collect()
+            counts = core.memory_counts()
+            rows.append({"day": day + 1, "traced": tracemalloc.get_traced_memory()[0], "rss": _process_rss(),
+                         "threads": threading.active_count(), "seen": counts["seen_adventure_instances"]
+                         + counts["seen_container_instances"], "parked": counts["parked_days"]})
+        core.sinks.stop()
+        dm.errors.flush()
+    finally:
+        tracemalloc.stop()
+        os.chdir(cwd)
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    print(f"{'Day':>4} {'Traced MiB':>11} {'RSS MiB':>9} {'Threads':>8} {'Seen ids':>9} {'Parked':>7}")
+    for r in rows:
+        rss = f"{r['rss'] / 1048576:,.1f}" if r["rss"] else "n/a"
+        print(f"{r['day']:>4} {r['traced'] / 1048576:>11,.2f} {rss:>9} {r['threads']:>8} {r['seen']:>9,} {r['parked']:>7}")
+    failures = []
+    if len({r["threads"] for r in rows}) > 1:
+        failures.append("thread count changed")
+    warm = next((i for i, r in enumerate(rows) if r["parked"] >= DAY_CACHE_SIZE), len(rows))
+    if len(rows) - warm >= 2:
+        growth = (rows[-1]["traced"] - rows[warm]["traced"]) / (len(rows) - 1 - warm)
+        print(f"Traced growth after day {warm + 1}: {growth / 1024:,.1f} KiB/day "
+              f"(limit {SOAK_DAILY_GROWTH / 1024:,.0f})")
+        if growth > SOAK_DAILY_GROWTH:
+            failures.append("traced memory keeps growing")
+    else:
+        print(f"Too few days to check growth; use at least {DAY_CACHE_SIZE + 2}.")
+    if any(r["seen"] > per_day for r in rows):
+        failures.append("seen instance ids were not reset at midnight")
+    if any(r["parked"] > DAY_CACHE_SIZE for r in rows):
+        failures.append("parked days exceed DAY_CACHE_SIZE")
+    print("FAIL: " + "; ".join(failures) if failures else "PASS")
+    return 1 if failures else 0
+
+
+# ===========================================================================
+# RunCounterApp  — orchestrator
+# ===========================================================================
+class RunCounterApp:
+    def __init__(self, root: tk.Tk, attach: bool = False):
+        # attach: tracking runs in a separate --ingest process (started here if needed);
+        # this window only reads what it publishes and can close without stopping it.
+        # Without --attach the window tracks itself if it wins the WriterLock, and otherwise
+        # opens as a viewer of the process that holds it, taking over once that one exits.
+        self.root       = root
+        self.stop_event = threading.Event()
+        self.writer     = WriterLock(os.path.join(LOG_DIR, WRITER_LOCK_FILE))
+        self.viewer     = not attach and not self.writer.acquire()
+        if attach or self.viewer:
+            self.core   = None
+            self.ingest = IngestControl(LOG_DIR)
+            if attach:
+                self.ingest.start()
+            self.accounts: List[Account] = attached_accounts()
+            self.prices = PriceService(
+                os.path.join(LOG_DIR, PRICE_CACHE_FILE),
+                PRICE_CURRENCIES + [self.accounts[0].dm.settings.get("currency", "usd")],
+                writer=False,
+            )
+        else:
+            self.ingest   = None
+            self.core     = TrackerCore(publish=True)      # viewers tail the snapshot
+            self.accounts = self.core.accounts
+            self.prices   = self.core.prices
+        self.dm         = self.accounts[0].dm        # owns the shared settings
+        self.combined   = CombinedDataManager(self.accounts, LOG_DIR) if len(self.accounts) > 1 else None
+        sink_stats      = self.core.sinks.stats if self.core else lambda: (self.ingest.read() or {}).get("sinks", [])
+        diag_cfg        = self.dm.settings.get("memory_diagnostics", {})
+        self.diagnostics = MemoryDiagnostics(os.path.join(LOG_DIR, MEMORY_DIAG_FILE),
+                                             diag_cfg.get("interval_minutes", 5) * 60)
+        self.ui         = TrackerUI(root, self.prices, self.accounts, self.combined,
+                                    ingest=None if self.viewer else self.ingest, viewer=self.viewer,
+                                    sink_stats=sink_stats, on_alerts_changed=self.core and self.core.apply_alert_rules,
+                                    diagnostics=self.diagnostics)
+        self.diagnostics.add_source("tracker", self.core.memory_counts if self.core else lambda: {
+            f"{a.label}.{k}": v for a in self.accounts for k, v in a.dm.memory_counts().items()})
+        self.diagnostics.add_source("ui", self.ui.memory_counts)
+        if diag_cfg.get("enabled"):
+            self.diagnostics.start()
+
+        self.prices.add_listener(lambda: self.root.after(0, self.ui._update_enjin_price))
+        if self.core:
+            self.core.on_status = lambda: self.root.after(0, self.ui.refresh_ws_status)
+            self.core.alerts.add_listener(lambda alert: self.root.after(0, self.ui.show_alert, alert))
+            self.core.start()
+        else:
+            self._seen_alert = (None, 0)        # (ingestion pid, last alert id shown)
+            self.prices.start()
+            self._poll_snapshot()
 
-        self.dm.save_log()
+        self._schedule_ui_refresh()
+        root.protocol("WM_DELETE_WINDOW", self._on_close)
+        self._install_signal_handlers()
+        self._install_excepthook()
 
-    def _handle_ws_status(self, text: str):
-        self.root.after(0, self.ui.set_ws_status, text)
+    def _poll_snapshot(self):
+        payload = self.ingest.read() or {}
+        live    = self.ingest.alive()
+        entries = {e["label"]: e for e in payload.get("accounts", [])}
+        for acct in self.accounts:
+            acct.apply_published(entries.get(acct.label), live)
+        self.ui.refresh_ws_status()
+
+        # Alerts fire in the ingestion process; show the ones published since the last poll.
+        # A new process numbers from 1 again; on first sight only note where it stands.
+        alerts = payload.get("alerts", [])
+        pid, last = self._seen_alert
+        newest = max((a["id"] for a in alerts), default=0)
+        if pid != payload.get("pid"):
+            self._seen_alert = (payload.get("pid"), newest if pid is None else 0)
+            if pid is None:
+                return
+            last = 0
+        for alert in alerts:
+            if alert["id"] > last:
+                self.ui.show_alert(alert)
+        self._seen_alert = (payload.get("pid"), max(newest, last))
 
     # ------------------------------------------------------------------
     # UI refresh loop
     # ------------------------------------------------------------------
     def _schedule_ui_refresh(self):
         if not self.stop_event.is_set():
-            with self.dm.lock:
-                self._check_daily_reset()
+            if self.core:
+                self.core.tick()
+            else:
+                if self.dm.settings_changed():
+                    self.dm.reload_settings()
+                self._poll_snapshot()
+                if self.viewer and self._take_over():
+                    return
             self.ui.refresh_ui()
             self.root.after(1_000, self._schedule_ui_refresh)
 
+    def _take_over(self) -> bool:
+        # The writer stopped publishing: if it has also let go of the lock (closed or died),
+        # hand the folder to a fresh process started as the writer and close this viewer.
+        if self.ingest.alive() or not self.writer.acquire():
+            return False
+        self.dm.save_error_log("The tracker writing run_logs has exited; restarting as the writer.")
+        self.writer.release()
+        spawn_self([])
+        self._on_close()
+        return True
+
     # ------------------------------------------------------------------
     # Shutdown
     # ------------------------------------------------------------------
     def _on_close(self):
         try:
-            settings = {
+            settings = dict(self.dm.settings)
+            settings.update({
                 "window_width":  self.ui.root.winfo_width(),
                 "window_height": self.ui.root.winfo_height(),
                 "dark_mode":     self.ui.dark_mode,
@@ -1297,23 +6158,21 @@ class RunCounterApp:
                 "overlay_mode":  self.dm.settings.get("overlay_mode", False),
                 "layout_mode":   self.dm.settings.get("layout_mode", "vertical"),
                 "show_totals":   {k: v.get() for k, v in self.ui.show_totals.items()},
+                "show_rates":    {k: v.get() for k, v in self.ui.show_rates.items()},
                 "show_sections": {k: v.get() for k, v in self.ui.show_sections.items()},
-            }
+            })
             self.dm.save_settings(settings)
         except Exception:
             pass
 
         self.stop_event.set()
-        self.ws_client.close()
-
-        try:
-            self.dm.save_log()
-        except Exception:
-            pass
-
-        if self.ws_thread.is_alive():
-            self.ws_thread.join(timeout=3)
-
+        self.diagnostics.stop()
+        if self.core:
+            self.core.stop()
+        else:
+            self.prices.stop()
+            self.ingest.close()
+        self.writer.release()
         self.root.destroy()
 
     def _install_signal_handlers(self):
@@ -1332,12 +6191,10 @@ class RunCounterApp:
         def _hook(exc_type, exc, tb):
             try:
                 self.dm.save_error_log(f"Uncaught exception: {exc_type.__name__}: {exc}")
-                self.dm.save_log()
             finally:
                 self.stop_event.set()
-                self.ws_client.close()
-                if self.ws_thread.is_alive():
-                    try: self.ws_thread.join(timeout=3)
+                if self.core:
+                    try: self.core.stop()
                     except Exception: pass
                 sys.__excepthook__(exc_type, exc, tb)
                 try: self.root.quit()
@@ -1349,7 +6206,40 @@ class RunCounterApp:
 # Entry point
 # ===========================================================================
 if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    parser = argparse.ArgumentParser(description="Lost Relics Daily Tracker")
+    parser.add_argument("--export-columnar", metavar="DIR",
+                        help="export daily and per-item totals to DIR (Arrow IPC or .npz) and exit")
+    parser.add_argument("--format", choices=["arrow", "npz"],
+                        help="columnar format (default: arrow if pyarrow is installed, else npz)")
+    parser.add_argument("--ingest", action="store_true",
+                        help="track without a window, publishing to run_logs/snapshot.shm")
+    parser.add_argument("--attach", action="store_true",
+                        help="show a window for the --ingest process, starting one if none is running")
+    parser.add_argument("--soak-benchmark", metavar="DAYS", type=int, nargs="?", const=7,
+                        help="simulate DAYS (default 7) of events in a scratch folder and check memory stays bounded")
+    args = parser.parse_args()
+
+    if args.soak_benchmark:
+        sys.exit(run_soak_benchmark(args.soak_benchmark))
+
+    if args.export_columnar:
+        # Read-only, so it can run next to a tracker that is writing run_logs.
+        accounts = attached_accounts()
+        dm       = CombinedDataManager(accounts, LOG_DIR) if len(accounts) > 1 else accounts[0].dm
+        try:
+            result = ColumnarExporter(dm).export(args.export_columnar, args.format)
+        except RuntimeError as e:
+            sys.exit(str(e))
+        print(f"Wrote {result['days_written']} new day(s), {result['total_days']} in total:")
+        for path in result["paths"]:
+            print(f"  {path}")
+        sys.exit(0)
+
+    if args.ingest:
+        sys.exit(run_ingest())
+
     ctk.set_default_color_theme("blue")
     root = ctk.CTk()
-    app  = RunCounterApp(root)
+    app  = RunCounterApp(root, attach=args.attach)
     root.mainloop()
\ No newline at end of file
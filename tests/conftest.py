@@ -0,0 +1,15 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import lost_relics_tracker as lrt
+
+
+@pytest.fixture
+def dm(tmp_path, monkeypatch):
+    # A DataManager on an empty run_logs/, with settings.conf and item lists in tmp_path.
+    monkeypatch.chdir(tmp_path)
+    return lrt.DataManager("run_logs", "non_blockchain_config.json", "non_blockchain_exclude.json")
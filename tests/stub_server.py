@@ -0,0 +1,88 @@
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+try:
+    from websockets.asyncio.server import serve
+except ImportError:
+    serve = None
+
+
+# ===========================================================================
+# StubHTTPServer  — canned HTTP responses on 127.0.0.1
+# ===========================================================================
+class StubHTTPServer:
+    # Serves queued (status, headers, body) replies in order; the last one repeats.
+    def __init__(self):
+        self.replies: list = []
+        self.requests: list = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                stub.requests.append(self.path)
+                status, headers, body = stub.replies.pop(0) if len(stub.replies) > 1 else stub.replies[0]
+                data = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url    = f"http://127.0.0.1:{self.server.server_address[1]}/simple/price"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def reply(self, status: int, body=None, **headers):
+        self.replies.append((status, headers, body if body is not None else {}))
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+# ===========================================================================
+# StubWebSocketServer  — stand-in for the game's WebSocket feed
+# ===========================================================================
+class StubWebSocketServer:
+    # `handler(ws, n)` runs for the n-th connection (1-based) on the server's own loop.
+    def __init__(self, handler):
+        self.handler     = handler
+        self.connections = 0
+        self.url         = None
+        self.loop        = asyncio.new_event_loop()
+        self.ready       = threading.Event()
+        self.thread      = threading.Thread(target=self._run, daemon=True)
+
+    async def _serve(self, ws):
+        self.connections += 1
+        await self.handler(ws, self.connections)
+
+    def _run(self):
+        async def main():
+            self._stop = asyncio.Event()
+            async with serve(self._serve, "127.0.0.1", 0, close_timeout=0.5) as server:
+                self.url = f"ws://127.0.0.1:{server.sockets[0].getsockname()[1]}/"
+                self.ready.set()
+                await self._stop.wait()
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_until_complete(main())
+
+    def __enter__(self):
+        self.thread.start()
+        self.ready.wait(5)
+        return self
+
+    def __exit__(self, *exc):
+        self.loop.call_soon_threadsafe(self._stop.set)
+        self.thread.join(5)
@@ -0,0 +1,79 @@
+import pytest
+
+import lost_relics_tracker as lrt
+
+
+@pytest.mark.parametrize("text, metric, scope, op, value", [
+    ("item:Waygate Orb >= 50",  "item:Waygate Orb", "today",   ">=", 50.0),
+    ("enj today > 25",          "enj",              "today",   ">",  25.0),
+    ("runs 1h < 20",            "runs",             "1h",      "<",  20.0),
+    ("item:Orb session >= 2.5", "item:Orb",         "session", ">=", 2.5),
+    ("  idle >= 10 ",           "idle",             "today",   ">=", 10.0),
+])
+def test_parse_rule(text, metric, scope, op, value):
+    rule = lrt.parse_alert_rule(text)
+    assert (rule["metric"], rule["scope"], rule["op"], rule["value"]) == (metric, scope, op, value)
+    assert rule["text"] == text.strip()
+
+
+@pytest.mark.parametrize("text", [
+    "runs = 3",                    # no such operator
+    "bogus >= 1",                  # unknown metric
+    "idle 1h >= 5",                # idle takes no scope
+    "idle < 5",                    # ... and only > / >=
+    "containers 1h > 1",           # not a rate field
+    "adventure:Cave session >= 1", # only today
+])
+def test_bad_rules_are_rejected(text):
+    with pytest.raises(ValueError):
+        lrt.parse_alert_rule(text)
+
+
+def test_bad_rule_is_reported_and_skipped():
+    errors = []
+    engine = lrt.AlertEngine(["runs >= 1", "bogus >= 1"], on_error=errors.append)
+    assert [r["text"] for r in engine.rules] == ["runs >= 1"]
+    assert len(errors) == 1 and "bogus" in errors[0]
+
+
+def test_rule_fires_on_the_edge_and_rearms(dm):
+    acct   = lrt.Account("main", "ws://localhost", dm)
+    engine = lrt.AlertEngine(["runs >= 2", "item:Orb >= 1"])
+    fired  = []
+    engine.add_listener(fired.append)
+    engine.prime([acct])
+    event = {"kind": "adventure", "name": "Cave", "items": {}}
+
+    def run(count: int):
+        dm.counter = count
+        engine.on_event(acct, event)
+        return [a["rule"] for a in fired]
+
+    assert run(1) == []
+    assert run(2) == ["runs >= 2"]
+    assert run(3) == ["runs >= 2"]                     # still true: no second alert
+    assert run(0) == ["runs >= 2"]                     # false again re-arms it
+    assert run(2) == ["runs >= 2", "runs >= 2"]
+    assert [a["id"] for a in engine.recent_alerts()] == [1, 2]
+    assert fired[-1]["value"] == 2
+
+
+def test_rule_already_true_when_primed_does_not_fire(dm):
+    acct = lrt.Account("main", "ws://localhost", dm)
+    dm.counter = 5
+    engine = lrt.AlertEngine(["runs >= 2"])
+    engine.prime([acct])
+    dm.counter = 6
+    engine.on_event(acct, {"kind": "adventure", "name": "Cave", "items": {}})
+    assert engine.recent_alerts() == []
+
+
+def test_event_only_checks_rules_on_the_keys_it_touched(dm):
+    acct   = lrt.Account("main", "ws://localhost", dm)
+    engine = lrt.AlertEngine(["containers >= 1"])
+    engine.prime([acct])
+    dm.container_counts["Chest"] = 1
+    engine.on_event(acct, {"kind": "adventure", "name": "Cave", "items": {}})
+    assert engine.recent_alerts() == []
+    engine.on_event(acct, {"kind": "container", "name": "Chest", "items": {}})
+    assert [a["rule"] for a in engine.recent_alerts()] == ["containers >= 1"]
@@ -0,0 +1,80 @@
+import json
+import os
+
+import pytest
+
+import lost_relics_tracker as lrt
+
+np = pytest.importorskip("numpy")
+
+FORMATS = ["npz"] + (["arrow"] if lrt.pa is not None else [])
+
+
+def write_day(dm, date: str, runs: int, orbs: int, mtime: float):
+    path = os.path.join(dm.log_dir, f"runs_{date}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"runs": runs, "blockchain_totals": {"Orb": orbs}}, f)
+    os.utime(path, (mtime, mtime))
+
+
+def read_export(out_dir: str, fmt: str) -> dict:
+    if fmt == "npz":
+        with np.load(os.path.join(out_dir, lrt.COLUMNAR_BUNDLE)) as bundle:
+            return {"date": [str(d) for d in bundle["daily_date"]], "runs": bundle["daily_runs"].tolist(),
+                    "amount": bundle["items_amount"].tolist()}
+    daily = lrt.pa_feather.read_table(os.path.join(out_dir, lrt.COLUMNAR_DAILY)).to_pydict()
+    items = lrt.pa_feather.read_table(os.path.join(out_dir, lrt.COLUMNAR_ITEMS)).to_pydict()
+    return {"date": [str(d) for d in daily["date"]], "runs": daily["runs"], "amount": items["amount"]}
+
+
+def read_manifest(out_dir: str) -> dict:
+    with open(os.path.join(out_dir, lrt.COLUMNAR_MANIFEST), encoding="utf-8") as f:
+        return json.load(f)["days"]
+
+
+@pytest.fixture
+def days(dm):
+    for i, date in enumerate(("2025-01-01", "2025-01-02", "2025-01-03"), 1):
+        write_day(dm, date, i, 10 * i, 1_700_000_000 + i)
+    return dm
+
+
+@pytest.mark.parametrize("fmt", FORMATS)
+def test_reexport_rewrites_only_the_changed_day(days, tmp_path, fmt):
+    out      = str(tmp_path / "out")
+    exporter = lrt.ColumnarExporter(days)
+    assert exporter.export(out, fmt)["days_written"] == 3
+    before   = read_manifest(out)
+
+    assert exporter.export(out, fmt)["days_written"] == 0
+
+    write_day(days, "2025-01-02", 20, 200, 1_700_100_000)
+    result = exporter.export(out, fmt)
+    after  = read_manifest(out)
+    assert result["days_written"] == 1
+    assert result["total_days"] == 3
+    assert after["2025-01-02"] != before["2025-01-02"]
+    assert {d: s for d, s in after.items() if d != "2025-01-02"} == \
+           {d: s for d, s in before.items() if d != "2025-01-02"}
+    assert read_export(out, fmt) == {"date": ["2025-01-01", "2025-01-02", "2025-01-03"],
+                                     "runs": [1, 20, 3], "amount": [10, 200, 30]}
+
+
+@pytest.mark.parametrize("fmt", FORMATS)
+def test_reexport_drops_a_deleted_day(days, tmp_path, fmt):
+    out = str(tmp_path / "out")
+    exporter = lrt.ColumnarExporter(days)
+    exporter.export(out, fmt)
+    os.remove(os.path.join(days.log_dir, "runs_2025-01-01.json"))
+
+    assert exporter.export(out, fmt)["days_written"] == 0
+    assert read_export(out, fmt)["date"] == ["2025-01-02", "2025-01-03"]
+    assert sorted(read_manifest(out)) == ["2025-01-02", "2025-01-03"]
+
+
+def test_missing_manifest_rebuilds(days, tmp_path):
+    out = str(tmp_path / "out")
+    exporter = lrt.ColumnarExporter(days)
+    exporter.export(out, "npz")
+    os.remove(os.path.join(out, lrt.COLUMNAR_MANIFEST))
+    assert exporter.export(out, "npz")["days_written"] == 3
@@ -0,0 +1,64 @@
+import math
+import statistics
+
+import pytest
+
+import lost_relics_tracker as lrt
+
+
+def open_box(dm, enj: float, gold: int, items: dict, count: int = 1, name: str = "Chest"):
+    with dm.lock:
+        dm.note_container_value_locked(name, count, enj, gold, items)
+
+
+def row(dm, name: str = "Chest", scope: str = "today") -> dict:
+    return next(r for r in dm.container_ev_table(scope) if r["container"] == name)
+
+
+def test_mean_and_spread_match_the_sample(dm):
+    enj  = [0.5, 2.0, 0.0, 7.5, 1.0]
+    gold = [10, 40, 0, 25, 25]
+    for e, g in zip(enj, gold):
+        open_box(dm, e, g, {"Orb": 1})
+    r = row(dm)
+    assert r["opened"] == 5
+    assert r["ev_enj"]  == pytest.approx(statistics.mean(enj))
+    assert r["sd_enj"]  == pytest.approx(statistics.stdev(enj))
+    assert r["se_enj"]  == pytest.approx(statistics.stdev(enj) / math.sqrt(5))
+    assert r["ev_gold"] == pytest.approx(statistics.mean(gold))
+    assert r["sd_gold"] == pytest.approx(statistics.stdev(gold))
+
+
+def test_single_opening_has_no_spread(dm):
+    open_box(dm, 3.0, 12, {})
+    r = row(dm)
+    assert (r["ev_enj"], r["sd_enj"], r["se_enj"]) == (3.0, 0.0, 0.0)
+
+
+def test_stack_counts_as_equal_openings(dm):
+    open_box(dm, 10.0, 100, {"Orb": 3, "Gem": 1}, count=2)
+    r = row(dm)
+    assert r["opened"] == 2
+    assert (r["ev_enj"], r["sd_enj"]) == (5.0, 0.0)
+    assert r["items"] == [{"item": "Orb", "rate": 1.0, "per_open": 1.5},
+                          {"item": "Gem", "rate": 0.5, "per_open": 0.5}]
+
+
+def test_merging_halves_equals_the_whole(dm):
+    for e in (1.0, 2.0, 4.0):
+        open_box(dm, e, 0, {"Orb": 1})
+    whole = dm.container_stat_totals("today")
+
+    first, second = {}, {}
+    for stats, values in ((first, (1.0, 2.0)), (second, (4.0,))):
+        for e in values:
+            lrt._merge_container_stats(stats, {"Chest": {"opened": 1, "enj": [e, e * e], "gold": [0, 0],
+                                                         "items": {"Orb": [1, 1]}}})
+    assert lrt._merge_container_stats(first, second) == whole
+    assert whole["Chest"]["enj"] == [7.0, 21.0]
+
+
+def test_types_are_kept_apart(dm):
+    open_box(dm, 1.0, 0, {}, name="Chest")
+    open_box(dm, 9.0, 0, {}, name="Crate")
+    assert {r["container"]: r["ev_enj"] for r in dm.container_ev_table()} == {"Chest": 1.0, "Crate": 9.0}
@@ -0,0 +1,57 @@
+import json
+
+import lost_relics_tracker as lrt
+
+
+def lines(path) -> list:
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+def test_repeats_are_counted_into_one_record(tmp_path):
+    path = tmp_path / lrt.ERROR_LOG_FILE
+    log  = lrt.ErrorLog(str(path))
+    for delay in (5, 7, 9, 11, 13):
+        log.log(f"reconnecting in {delay}s", source="ws")
+    log.log("other failure")
+    log.flush(expire_only=True)                        # tally window still open
+    assert [e["message"] for e in lines(path)] == ["reconnecting in 5s", "other failure"]
+
+    log.flush()
+    repeat = lines(path)[-1]
+    assert repeat["repeated"] == 4
+    assert repeat["message"] == "reconnecting in 13s"
+    assert repeat["source"] == "ws" and "since" in repeat
+    assert len(lines(path)) == 3
+
+
+def test_window_end_starts_a_new_tally(tmp_path, monkeypatch):
+    monkeypatch.setattr(lrt, "ERROR_REPEAT_WINDOW", 0)
+    path = tmp_path / lrt.ERROR_LOG_FILE
+    log  = lrt.ErrorLog(str(path))
+    for _ in range(3):
+        log.log("timeout")
+    log.flush()
+    assert [e.get("repeated") for e in lines(path)] == [None, None, None]
+
+
+def test_rotates_past_the_size_limit(tmp_path, monkeypatch):
+    monkeypatch.setattr(lrt, "ERROR_LOG_MAX_BYTES", 400)
+    monkeypatch.setattr(lrt, "ERROR_LOG_BACKUPS", 2)
+    path = tmp_path / lrt.ERROR_LOG_FILE
+    log  = lrt.ErrorLog(str(path))
+    for i in range(40):
+        log.log(f"failure {'x' * i}")                  # no digits: each message is distinct
+        log.flush()
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["errors.1.jsonl", "errors.2.jsonl", "errors.jsonl"]
+    assert all(p.stat().st_size <= 400 for p in tmp_path.iterdir())
+    recent = log.recent(5)
+    assert [e["message"] for e in recent] == [f"failure {'x' * i}" for i in range(35, 40)]
+
+
+def test_viewer_keeps_lines_in_memory(tmp_path):
+    path = tmp_path / lrt.ERROR_LOG_FILE
+    log  = lrt.ErrorLog(str(path), writer=False)
+    log.log("viewer problem")
+    assert [e["message"] for e in log.recent()] == ["viewer problem"]
+    assert not path.exists()
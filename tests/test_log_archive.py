@@ -0,0 +1,102 @@
+import json
+import os
+from datetime import date
+
+import pytest
+
+import lost_relics_tracker as lrt
+
+
+def write_day(dm, date: str, runs: int):
+    with open(os.path.join(dm.log_dir, f"runs_{date}.json"), "w", encoding="utf-8") as f:
+        json.dump({"runs": runs, "blockchain_totals": {"Orb": runs}}, f)
+    with open(os.path.join(dm.log_dir, f"journal_{date}.jsonl"), "w", encoding="utf-8") as f:
+        f.write(json.dumps({"kind": "adventure", "run": runs}) + "\n")
+
+
+def loose_files(dm) -> list:
+    return sorted(f for f in os.listdir(dm.log_dir) if f.startswith(("runs_", "journal_")))
+
+
+def archive_path(dm) -> str:
+    return dm.archive.archive_path("2025-01")
+
+
+@pytest.fixture
+def archived(dm):
+    write_day(dm, "2025-01-05", 5)
+    write_day(dm, "2025-01-06", 6)
+    assert dm.compact_logs() == 2
+    return dm
+
+
+def test_compaction_round_trip(archived):
+    dm = archived
+    assert loose_files(dm) == []
+    assert os.path.isfile(archive_path(dm))
+
+    files = dm._day_log_files("2025-01-01", "2025-01-31")
+    assert [d for d, _ in files] == ["2025-01-05", "2025-01-06"]
+    assert all(isinstance(source, tuple) for _, source in files)
+    assert [dm._read_day_log(source)["runs"] for _, source in files] == [5, 6]
+    assert list(dm.iter_journal("2025-01-06")) == [{"kind": "adventure", "run": 6}]
+    assert dm.summarize_logs("2025-01-01", "2025-01-31")["Total Runs"] == 11
+
+
+def test_second_batch_joins_the_same_month(archived):
+    dm = archived
+    write_day(dm, "2025-01-07", 7)
+    assert dm.compact_logs() == 1
+    assert loose_files(dm) == []
+
+    files = dm._day_log_files("2025-01-01", "2025-01-31")
+    assert [(d, dm._read_day_log(source)["runs"]) for d, source in files] == \
+           [("2025-01-05", 5), ("2025-01-06", 6), ("2025-01-07", 7)]
+    assert list(dm.iter_journal("2025-01-05")) == [{"kind": "adventure", "run": 5}]
+
+
+def test_loose_file_wins_over_archived_copy(archived):
+    dm = archived
+    write_day(dm, "2025-01-06", 60)
+    files = dict(dm._day_log_files("2025-01-06", "2025-01-06"))
+    assert dm._read_day_log(files["2025-01-06"])["runs"] == 60
+
+
+def test_truncated_archive_is_skipped_not_misread(archived):
+    dm   = archived
+    path = archive_path(dm)
+    os.truncate(path, os.path.getsize(path) - 5)
+
+    assert dm._day_log_files("2025-01-01", "2025-01-31") == []
+    assert dm.archive.find("runs_2025-01-05.json") is None
+    with pytest.raises(Exception):
+        dm.archive.read(path, "runs_2025-01-05.json")
+
+
+def test_corrupt_footer_keeps_loose_files_on_the_next_compaction(archived):
+    dm   = archived
+    path = archive_path(dm)
+    with open(path, "r+b") as f:
+        f.seek(-len(lrt.ARCHIVE_MAGIC), os.SEEK_END)
+        f.write(b"XXXX")
+    assert dm.archive.members("runs_", "2025-01-01", "2025-01-31") == []
+    with pytest.raises(ValueError):
+        dm.archive._index(path)
+
+    write_day(dm, "2025-01-07", 7)
+    assert dm.compact_logs() == 0
+    assert loose_files(dm) == ["journal_2025-01-07.jsonl", "runs_2025-01-07.json"]
+    assert [e["source"] for e in dm.errors.recent()][-1:] == ["tracker"]
+
+
+def test_archived_day_keeps_instance_ids_for_replays(dm):
+    with open(os.path.join(dm.log_dir, "runs_2025-01-05.json"), "w", encoding="utf-8") as f:
+        json.dump({"runs": 1, "seen_adventure_instances": ["adv-1"],
+                   "seen_container_instances": ["box-1"]}, f)
+    assert dm.compact_logs() == 1
+
+    day = date(2025, 1, 5)
+    with dm.lock, dm.day_context_locked(day):
+        assert dm.seen_adventure_instances == {"adv-1"}
+        assert dm.seen_container_instances == {"box-1"}
+        assert dm.counter == 1
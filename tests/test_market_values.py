@@ -0,0 +1,36 @@
+import lost_relics_tracker as lrt
+
+
+def series(tmp_path):
+    return lrt.MarketValueSeries(str(tmp_path / "market_values.jsonl"))
+
+
+def test_unchanged_value_is_not_recorded(tmp_path):
+    mv = series(tmp_path)
+    assert mv.record("Orb", 5.0, 100)
+    assert not mv.record("Orb", 5.0, 200)
+    assert mv.record("Orb", 6.0, 300)
+    assert mv.sample_count() == 2
+
+
+def test_late_sample_equal_to_next_point_moves_it_earlier(tmp_path):
+    mv = series(tmp_path)
+    mv.record("Orb", 5.0, 100)
+    mv.record("Orb", 7.0, 300)
+    assert mv.record("Orb", 7.0, 200)
+    assert mv.sample_count() == 2
+    assert mv.stats("Orb", 100, 300)["avg"] == 6.0
+
+    reloaded = series(tmp_path)
+    assert reloaded.sample_count() == 2
+    assert reloaded.stats("Orb", 100, 300) == mv.stats("Orb", 100, 300)
+
+
+def test_late_sample_with_a_new_value_is_inserted_in_order(tmp_path):
+    mv = series(tmp_path)
+    mv.record("Orb", 5.0, 100)
+    mv.record("Orb", 7.0, 300)
+    assert mv.record("Orb", 9.0, 200)
+    assert mv.sample_count() == 3
+    assert mv.latest("Orb") == 7.0
+    assert mv.stats("Orb", 100, 300)["max"] == 9.0
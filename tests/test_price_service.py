@@ -0,0 +1,140 @@
+import json
+import time
+
+import pytest
+
+import lost_relics_tracker as lrt
+from stub_server import StubHTTPServer
+
+PRICES = {"enjincoin": {"usd": 0.25, "usd_24h_change": -1.5}}
+
+
+@pytest.fixture
+def stub():
+    with StubHTTPServer() as server:
+        yield server
+
+
+@pytest.fixture
+def cache_path(tmp_path):
+    return str(tmp_path / "price_cache.json")
+
+
+def make_service(cache_path, url):
+    return lrt.PriceService(cache_path, ["usd"], url=url)
+
+
+def test_429_backs_off_no_sooner_than_retry_after(stub, cache_path):
+    stub.reply(429, **{"Retry-After": "120"})
+    service = make_service(cache_path, stub.url)
+    before  = time.time()
+    service._fetch()
+
+    price, _, _, status = service.quote("usd")
+    assert price is None
+    assert status == "rate_limited"
+    assert service._failures == 1
+    assert service._retry_at >= before + 120
+    assert 119 <= service._next_delay() <= 121
+    assert "vs_currencies=usd" in stub.requests[0]
+
+
+def test_5xx_backoff_grows_and_is_capped(stub, cache_path, monkeypatch):
+    monkeypatch.setattr(lrt.random, "uniform", lambda low, high: high)
+    stub.reply(503)
+    service = make_service(cache_path, stub.url)
+
+    delays = []
+    for _ in range(8):
+        service._fetch()
+        delays.append(round(service._next_delay()))
+    assert service.quote("usd")[3] == "error"
+    assert service._failures == 8
+    assert delays[:3] == [lrt.PRICE_BACKOFF_BASE, 2 * lrt.PRICE_BACKOFF_BASE, 4 * lrt.PRICE_BACKOFF_BASE]
+    assert delays == sorted(delays)
+    assert max(delays) == lrt.PRICE_BACKOFF_MAX
+
+
+def test_success_after_errors_resets_backoff_and_writes_cache(stub, cache_path):
+    stub.reply(500)
+    stub.reply(429)
+    stub.reply(200, PRICES)
+    service = make_service(cache_path, stub.url)
+
+    service._fetch()
+    service._fetch()
+    assert service._failures == 2
+    service._fetch()
+
+    price, change, stale, status = service.quote("usd")
+    assert (price, change, stale, status) == (0.25, -1.5, False, "ok")
+    assert service._failures == 0
+    assert service._next_delay() > service.ttl - 5
+    with open(cache_path, encoding="utf-8") as f:
+        assert json.load(f)["prices"] == PRICES["enjincoin"]
+
+
+def test_warm_start_serves_cached_prices_without_fetching(stub, cache_path):
+    stub.reply(200, PRICES)
+    make_service(cache_path, stub.url)._fetch()
+    stub.requests.clear()
+
+    service = make_service(cache_path, stub.url)
+    price, change, stale, status = service.quote("usd")
+    assert (price, change, stale, status) == (0.25, -1.5, False, "ok")
+    assert service._next_delay() > 0
+
+    service.start()
+    time.sleep(0.3)
+    service.stop()
+    assert stub.requests == []
+
+
+def test_warm_start_with_stale_cache_refetches(stub, cache_path):
+    with open(cache_path, "w", encoding="utf-8") as f:
+        json.dump({"fetched_at": time.time() - 2 * lrt.PRICE_TTL, "prices": {"usd": 0.1}}, f)
+    stub.reply(200, PRICES)
+
+    service = make_service(cache_path, stub.url)
+    price, _, stale, status = service.quote("usd")
+    assert (price, stale, status) == (0.1, True, "ok")
+    assert service._next_delay() == 0
+
+    service.start()
+    deadline = time.time() + 5
+    while service.quote("usd")[0] != 0.25 and time.time() < deadline:
+        time.sleep(0.05)
+    service.stop()
+    assert service.quote("usd")[:3] == (0.25, -1.5, False)
+    assert len(stub.requests) == 1
+
+
+def test_corrupt_cache_starts_cold(cache_path):
+    with open(cache_path, "w", encoding="utf-8") as f:
+        f.write("{not json")
+    service = make_service(cache_path, "http://127.0.0.1:9/")
+    assert service.quote("usd") == (None, 0.0, True, "loading")
+
+
+def test_viewer_follows_the_writer_cache_without_fetching(stub, cache_path, monkeypatch):
+    monkeypatch.setattr(lrt, "PRICE_CACHE_POLL", 0.05)
+    with open(cache_path, "w", encoding="utf-8") as f:
+        json.dump({"fetched_at": time.time() - 2 * lrt.PRICE_TTL, "prices": {"usd": 0.1}}, f)
+    stub.reply(200, PRICES)
+
+    viewer  = lrt.PriceService(cache_path, ["usd"], url=stub.url, writer=False)
+    updates = []
+    viewer.add_listener(lambda: updates.append(viewer.quote("usd")[0]))
+    assert viewer.quote("usd")[:3] == (0.1, 0.0, True)
+    viewer.add_currency("eur")
+    viewer.start()
+
+    make_service(cache_path, stub.url)._fetch()        # the writer refreshes the cache
+    deadline = time.time() + 5
+    while not updates and time.time() < deadline:
+        time.sleep(0.05)
+    viewer.stop()
+    assert updates == [0.25]
+    assert viewer.quote("usd")[:3] == (0.25, -1.5, False)
+    assert len(stub.requests) == 1
+    assert "vs_currencies=usd" in stub.requests[0]
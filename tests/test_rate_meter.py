@@ -0,0 +1,34 @@
+import lost_relics_tracker as lrt
+
+ONE = (1, 10, 0, 0.5, 100)
+
+
+def test_events_inside_the_window_are_summed():
+    meter = lrt.RateMeter(3600, buckets=60)
+    meter.add(1000.0, ONE, now=1000.0)
+    meter.add(1500.0, ONE, now=1500.0)
+    assert meter.totals(1500.0) == [2, 20, 0, 1.0, 200]
+
+
+def test_buckets_expire_once_the_window_passes():
+    meter = lrt.RateMeter(3600, buckets=60)            # 60 s buckets
+    meter.add(0.0, ONE, now=0.0)
+    meter.add(1800.0, ONE, now=1800.0)
+    assert meter.totals(3599.0)[0] == 2
+    assert meter.totals(3600.0)[0] == 1                # first bucket dropped
+    assert meter.totals(5400.0)[0] == 0
+    assert meter.totals(9000.0) == [0.0] * len(lrt.RATE_FIELDS)
+
+
+def test_reused_slot_starts_from_zero():
+    meter = lrt.RateMeter(600, buckets=10)
+    meter.add(5.0, ONE, now=5.0)
+    meter.add(605.0, ONE, now=605.0)                   # same slot, one window later
+    assert meter.totals(605.0)[0] == 1
+
+
+def test_event_older_than_the_window_is_ignored():
+    meter = lrt.RateMeter(600, buckets=10)
+    meter.add(0.0, ONE, now=700.0)
+    meter.add(650.0, ONE, now=700.0)
+    assert meter.totals(700.0)[0] == 1
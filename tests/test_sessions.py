@@ -0,0 +1,45 @@
+import lost_relics_tracker as lrt
+
+IDLE = 600
+
+
+def run(ts: float, duration: float = 60, gold: int = 5) -> dict:
+    return {"kind": "adventure", "time": ts, "duration": duration, "gold": gold, "items": {"Orb": 1}}
+
+
+def spans(index) -> list:
+    return [(s["start"], s["end"], s["runs"], s["open"]) for s in index.sessions()]
+
+
+def test_idle_gap_splits_sessions(tmp_path):
+    index = lrt.SessionIndex(str(tmp_path), IDLE)
+    t0 = 2_000_000_000.0                               # in the future, so nothing expires
+    index.add(run(t0))
+    index.add(run(t0 + 400))                           # gap of 340 s: same session
+    index.add(run(t0 + 400 + IDLE + 100))              # gap past the threshold: new session
+    assert spans(index) == [(t0 - 60, t0 + 400, 2, False),
+                            (t0 + 440 + IDLE, t0 + 500 + IDLE, 1, True)]
+    assert index.sessions()[0]["gold"] == 10
+
+
+def test_open_session_closes_after_idle_and_survives_restart(tmp_path):
+    index = lrt.SessionIndex(str(tmp_path), IDLE)
+    index.add(run(1000.0))
+    index.expire(1000.0 + IDLE - 1)
+    assert index.current is not None
+    index.expire(1000.0 + IDLE + 1)
+    assert index.current is None
+
+    reopened = lrt.SessionIndex(str(tmp_path), IDLE)
+    assert [(s["start"], s["end"], s["runs"]) for s in reopened.closed] == [(940.0, 1000.0, 1)]
+    assert not (tmp_path / lrt.SESSION_OPEN_FILE).exists()
+
+
+def test_late_event_backfills_the_closed_session(tmp_path):
+    index = lrt.SessionIndex(str(tmp_path), IDLE)
+    t0 = 2_000_000_000.0
+    index.add(run(t0))
+    index.add(run(t0 + 5000))                          # closes the first session
+    index.add(run(t0 + 200))                           # late delivery for the first one
+    assert [(s["runs"], s["open"]) for s in index.sessions()] == [(2, False), (1, True)]
+    assert len((tmp_path / lrt.SESSIONS_FILE).read_text().splitlines()) == 1
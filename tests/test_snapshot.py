@@ -0,0 +1,61 @@
+import threading
+
+import lost_relics_tracker as lrt
+
+VERSIONS = 2000
+
+
+def payload(version: int) -> dict:
+    # Size varies with the version so a torn read mixes lengths and fails the check.
+    return {"version": version, "body": [version] * (1 + version % 37)}
+
+
+def test_reader_never_sees_a_torn_payload(tmp_path):
+    path      = str(tmp_path / "snapshot.shm")
+    publisher = lrt.SnapshotPublisher(path, capacity=64 * 1024)
+    reader    = lrt.SnapshotReader(path)
+    done      = threading.Event()
+
+    def publish():
+        try:
+            for version in range(1, VERSIONS + 1):
+                publisher.publish(payload(version))
+        finally:
+            done.set()
+
+    thread = threading.Thread(target=publish)
+    thread.start()
+    seen, last = 0, 0
+    try:
+        while not done.is_set():
+            got = reader.read()
+            if got is None:
+                continue
+            assert got == payload(got["version"])
+            assert got["version"] >= last
+            assert reader._seq % 2 == 0
+            last  = got["version"]
+            seen += 1
+    finally:
+        thread.join()
+    assert seen > 0
+    assert reader.read() == payload(VERSIONS)
+    reader.close()
+    publisher.close()
+
+
+def test_new_publisher_continues_the_sequence(tmp_path):
+    path  = str(tmp_path / "snapshot.shm")
+    first = lrt.SnapshotPublisher(path, capacity=4096)
+    first.publish(payload(1))
+    first.close()
+
+    reader = lrt.SnapshotReader(path)
+    assert reader.read() == payload(1)
+    second = lrt.SnapshotPublisher(path, capacity=1024)      # never shrinks the file
+    assert second.capacity == 4096
+    second.publish(payload(2))
+    assert reader.read() == payload(2)
+    assert not second.publish({"body": "x" * 8192})
+    reader.close()
+    second.close()
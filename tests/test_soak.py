@@ -0,0 +1,13 @@
+import os
+import tempfile
+
+import lost_relics_tracker as lrt
+
+
+def test_short_soak_passes(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))     # scratch folder goes under tmp_path
+    assert lrt.run_soak_benchmark(days=2, per_day=200) == 0
+    assert "PASS" in capsys.readouterr().out
+    assert os.getcwd() == str(tmp_path)
+    assert os.listdir(tmp_path) == []                           # scratch folder removed
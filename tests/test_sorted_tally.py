@@ -0,0 +1,55 @@
+import random
+
+import pytest
+
+import lost_relics_tracker as lrt
+
+
+def expected(counts: dict, mode: str, values: dict = None) -> list:
+    key = {"name":   lambda kv: (kv[0].lower(), kv[0]),
+           "amount": lambda kv: (-kv[1], kv[0]),
+           "value":  lambda kv: (-kv[1] * (values or {}).get(kv[0], 0), kv[0])}[mode]
+    return sorted(counts.items(), key=key)
+
+
+def test_increments_move_only_the_changed_entry():
+    tally = lrt.SortedTally("amount")
+    tally.update({"Orb": 5, "Gem": 3, "ash": 1})
+    assert tally.items() == [("Orb", 5), ("Gem", 3), ("ash", 1)]
+    tally.update({"Orb": 5, "Gem": 3, "ash": 9})
+    assert tally.items() == [("ash", 9), ("Orb", 5), ("Gem", 3)]
+    tally.update({"Orb": 5, "Gem": 5, "ash": 9})       # ties break by name
+    assert tally.items() == [("ash", 9), ("Gem", 5), ("Orb", 5)]
+
+
+def test_name_mode_ignores_case_and_drops_missing_entries():
+    tally = lrt.SortedTally()
+    tally.update({"beta": 1, "Alpha": 2, "gamma": 3})
+    assert [n for n, _ in tally.items()] == ["Alpha", "beta", "gamma"]
+    tally.update({"gamma": 4})
+    assert tally.items() == [("gamma", 4)]
+
+
+def test_value_mode_rekeys_on_new_prices():
+    tally  = lrt.SortedTally("value")
+    counts = {"Orb": 2, "Gem": 10}
+    tally.update(counts, {"Orb": 100, "Gem": 1})
+    assert [n for n, _ in tally.items()] == ["Orb", "Gem"]
+    tally.update(counts, {"Orb": 1, "Gem": 1})
+    assert [n for n, _ in tally.items()] == ["Gem", "Orb"]
+    tally.set_mode("name")
+    assert [n for n, _ in tally.items()] == ["Gem", "Orb"]
+
+
+@pytest.mark.parametrize("mode", ["name", "amount", "value"])
+def test_random_increments_match_a_full_sort(mode):
+    rng    = random.Random(7)
+    names  = [f"Item {c}" for c in "ABCDEFGHIJ"] + ["item a", "item b"]
+    values = {n: rng.randint(1, 50) for n in names}
+    tally  = lrt.SortedTally(mode)
+    counts = {}
+    for _ in range(300):
+        name = rng.choice(names)
+        counts[name] = counts.get(name, 0) + rng.randint(1, 4)
+        tally.update(counts, values)
+        assert tally.items() == expected(counts, mode, values)
@@ -0,0 +1,55 @@
+import json
+import os
+
+import lost_relics_tracker as lrt
+
+
+def note(dm, value: float, item: str, ts: float = 0.0):
+    with dm.lock:
+        dm.note_top_drop_locked("enj", value, ts, item, 1, "Cave", "adventure")
+
+
+def test_smallest_drop_is_evicted_past_k(dm, monkeypatch):
+    monkeypatch.setattr(lrt, "TOP_DROPS_K", 3)
+    for value, item in [(5, "a"), (1, "b"), (9, "c"), (3, "d"), (0.5, "e"), (7, "f")]:
+        note(dm, value, item)
+    kept = sorted(dm.top_drops_today("enj"), reverse=True)
+    assert [(e[0], e[2]) for e in kept] == [(9, "c"), (7, "f"), (5, "a")]
+    assert dm.top_drops_today("gold") == []
+
+
+def test_equal_value_keeps_the_later_drop(dm, monkeypatch):
+    monkeypatch.setattr(lrt, "TOP_DROPS_K", 1)
+    note(dm, 4, "old", ts=100.0)
+    note(dm, 4, "new", ts=200.0)
+    assert [e[2] for e in dm.top_drops_today("enj")] == ["new"]
+
+
+def test_range_merges_saved_days_with_today(dm, monkeypatch):
+    monkeypatch.setattr(lrt, "TOP_DROPS_K", 2)
+    past = {"runs": 1, "top_drops": {"enj": [[8, 1.0, "p1", 1, "Cave", "adventure"],
+                                             [2, 2.0, "p2", 1, "Cave", "adventure"]]}}
+    with open(os.path.join(dm.log_dir, "runs_2025-01-05.json"), "w", encoding="utf-8") as f:
+        json.dump(past, f)
+    for value, item in [(6, "t1"), (10, "t2"), (1, "t3")]:
+        note(dm, value, item)
+
+    today = dm.current_log_date.isoformat()
+    best  = dm.top_drops_range("2025-01-01", today, "enj", k=3)
+    assert [(d["value"], d["item"]) for d in best] == [(10, "t2"), (8, "p1"), (6, "t1")]
+    assert best[0]["source_kind"] == "adventure"
+    assert [d["item"] for d in dm.top_drops_range("2025-01-01", "2025-01-31", "enj")] == ["p1", "p2"]
+
+
+def test_heap_survives_a_save_and_reload(dm, monkeypatch):
+    monkeypatch.setattr(lrt, "TOP_DROPS_K", 2)
+    for value, item in [(3, "a"), (6, "b"), (1, "c"), (4, "d")]:
+        note(dm, value, item)
+    dm.save_log()
+    with open(dm.log_filepath(), encoding="utf-8") as f:
+        data = json.load(f)
+    with dm.lock:
+        dm.reset_daily_counters_locked(dm.current_log_date)
+        dm._apply_day_data_locked(data)
+    note(dm, 5, "e")
+    assert sorted(e[2] for e in dm.top_drops_today("enj")) == ["b", "e"]
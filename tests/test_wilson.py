@@ -0,0 +1,25 @@
+import pytest
+
+import lost_relics_tracker as lrt
+
+
+@pytest.mark.parametrize("hits, trials, low, high", [
+    (5,    10,   0.236590, 0.763410),
+    (0,    10,   0.0,      0.277540),
+    (10,   10,   0.722460, 1.0),
+    (1,    1000, 0.000177, 0.005643),
+])
+def test_known_intervals(hits, trials, low, high):
+    assert lrt.wilson_interval(hits, trials) == pytest.approx((low, high), abs=1e-6)
+
+
+def test_no_trials_is_an_empty_interval():
+    assert lrt.wilson_interval(0, 0) == (0.0, 0.0)
+
+
+def test_interval_brackets_the_rate_and_narrows_with_trials():
+    wide   = lrt.wilson_interval(3, 20)
+    narrow = lrt.wilson_interval(300, 2000)
+    assert wide[0] < 0.15 < wide[1]
+    assert narrow[0] < 0.15 < narrow[1]
+    assert narrow[1] - narrow[0] < wide[1] - wide[0]
@@ -0,0 +1,27 @@
+import lost_relics_tracker as lrt
+
+
+def test_one_writer_per_folder(tmp_path):
+    path   = str(tmp_path / lrt.WRITER_LOCK_FILE)
+    first  = lrt.WriterLock(path)
+    second = lrt.WriterLock(path)
+
+    assert first.acquire()
+    assert not second.acquire()
+    assert (first.held, second.held) == (True, False)
+    assert first.acquire()                             # re-entrant for the holder
+
+    first.release()
+    assert second.acquire()
+    assert not first.acquire()
+    second.release()
+    assert not second.held
+
+
+def test_leftover_lock_file_does_not_block(tmp_path):
+    path = tmp_path / "sub" / lrt.WRITER_LOCK_FILE
+    path.parent.mkdir()
+    path.write_text("12345")
+    lock = lrt.WriterLock(str(path))
+    assert lock.acquire()
+    lock.release()
@@ -0,0 +1,124 @@
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("websockets")
+
+import lost_relics_tracker as lrt
+from stub_server import StubWebSocketServer
+
+ADVENTURES = json.dumps({"type": "adventures", "data": [{"AdventureInstance": "a1", "AdventureName": "Cave"}]})
+CONTAINERS = json.dumps({"type": "containers", "data": [{"ContainerInstance": "c1", "Name": "Chest"}]})
+
+
+class Client:
+    def __init__(self, url, **cfg):
+        self.events = []
+        self.stop   = threading.Event()
+        self.ws     = lrt.make_ws_client(
+            dict({"mode": "asyncio", "ping_interval": 0.2, "ping_timeout": 0.3}, **cfg),
+            url             = url,
+            on_adventure    = self.events.append,
+            on_player       = self.events.append,
+            on_container    = self.events.append,
+            on_status       = lambda text: None,
+            stop_event      = self.stop,
+            reconnect_delay = 0.1,
+        )
+        self.thread = threading.Thread(target=self.ws.run, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop.set()
+        self.ws.close()
+        self.thread.join(5)
+        assert not self.thread.is_alive()
+
+    def wait(self, predicate, timeout: float = 5) -> bool:
+        deadline = time.monotonic() + timeout
+        while not predicate():
+            if time.monotonic() > deadline:
+                return False
+            time.sleep(0.02)
+        return True
+
+
+async def feed_then_hold(ws, n):
+    await ws.send(ADVENTURES)
+    await ws.send(CONTAINERS)
+    await ws.wait_closed()
+
+
+async def hold(ws, n):
+    await ws.wait_closed()
+
+
+def test_auto_mode_uses_asyncio_client():
+    client = lrt.make_ws_client({}, url="ws://127.0.0.1:9/", on_adventure=None, on_player=None,
+                                on_container=None, on_status=None, stop_event=threading.Event())
+    assert isinstance(client, lrt.AsyncWebSocketClient)
+    assert client.idle_timeout == 0
+    thread = lrt.make_ws_client({"mode": "thread"}, url="ws://127.0.0.1:9/", on_adventure=None, on_player=None,
+                                on_container=None, on_status=None, stop_event=threading.Event())
+    assert type(thread) is lrt.WebSocketClient
+
+
+def test_messages_are_dispatched():
+    with StubWebSocketServer(feed_then_hold) as server, Client(server.url) as client:
+        assert client.wait(lambda: len(client.events) == 2)
+        assert [e.get("AdventureInstance") or e.get("ContainerInstance") for e in client.events] == ["a1", "c1"]
+        assert client.ws.stats["connects"] == 1
+        assert client.ws.stats["messages"] == 2
+
+
+def test_silent_connection_stays_up_without_idle_timeout():
+    with StubWebSocketServer(hold) as server, Client(server.url) as client:
+        assert client.wait(lambda: client.ws.stats["connects"] == 1)
+        time.sleep(1.5)
+        assert client.ws.stats["stalls"] == 0
+        assert server.connections == 1
+
+
+def test_idle_timeout_reconnects_a_silent_connection():
+    with StubWebSocketServer(hold) as server, Client(server.url, idle_timeout=0.5) as client:
+        assert client.wait(lambda: client.ws.stats["connects"] >= 2)
+        assert client.ws.stats["stalls"] >= 1
+        assert client.ws.stats["time_to_detect"] >= 0.5
+
+
+def test_missing_pong_is_detected():
+    async def frozen(ws, n):
+        if n == 1:
+            ws.transport.pause_reading()        # pings go unanswered
+            await asyncio.sleep(5)
+        else:
+            await feed_then_hold(ws, n)
+
+    with StubWebSocketServer(frozen) as server, Client(server.url) as client:
+        assert client.wait(lambda: len(client.events) == 2)
+        stats = client.ws.stats
+        assert stats["stalls"] == 1
+        assert stats["connects"] == 2
+        assert stats["time_to_detect"] < 2
+        assert stats["time_to_recover"] is not None
+
+
+def test_reconnects_after_server_drop():
+    async def drop_first(ws, n):
+        await ws.send(ADVENTURES)
+        if n == 1:
+            await ws.close()
+        else:
+            await ws.wait_closed()
+
+    with StubWebSocketServer(drop_first) as server, Client(server.url) as client:
+        assert client.wait(lambda: len(client.events) == 2)
+        assert client.ws.stats["connects"] == 2
+        assert client.ws.stats["stalls"] == 0
+        assert client.ws.stats["time_to_recover"] is not None